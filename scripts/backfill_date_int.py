@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Allow direct script execution: `python scripts/backfill_date_int.py ...`
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="기존 청크 메타데이터에 기간 필터용 date_int 필드를 채운다")
+    parser.add_argument("--page-size", type=int, default=1000, help="한 번에 읽고 갱신할 청크 수")
+    return parser.parse_args()
+
+
+def main() -> None:
+    import chromadb
+
+    from src.config import get_settings
+    from src.logging_utils import configure_logging
+    from src.pipeline.metadata import date_to_int
+
+    args = parse_args()
+    settings = get_settings()
+    configure_logging(level=settings.log_level)
+
+    client = chromadb.PersistentClient(path=settings.chroma_persist_dir)
+    collection = client.get_collection(settings.chroma_collection_name)
+
+    scanned = updated = offset = 0
+    while True:
+        payload = collection.get(include=["metadatas"], limit=args.page_size, offset=offset)
+        ids = [str(item) for item in payload.get("ids", [])]
+        if not ids:
+            break
+        update_ids: list[str] = []
+        update_metadatas: list[dict] = []
+        for chunk_id, metadata in zip(ids, payload.get("metadatas", []), strict=False):
+            metadata = dict(metadata or {})
+            date_int = date_to_int(metadata.get("date"))
+            if date_int is None or metadata.get("date_int") == date_int:
+                continue
+            metadata["date_int"] = date_int
+            update_ids.append(chunk_id)
+            update_metadatas.append(metadata)
+        if update_ids:
+            collection.update(ids=update_ids, metadatas=update_metadatas)
+        scanned += len(ids)
+        updated += len(update_ids)
+        offset += len(ids)
+
+    print(f"scanned={scanned} updated={updated}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Allow direct script execution: `python scripts/benchmark_hnsw.py ...`
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+DEFAULT_GRID = ("16:100:10", "16:100:50", "16:100:100", "32:200:100", "48:400:200")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="HNSW 파라미터별 recall/지연시간/빌드 비용 벤치마크")
+    parser.add_argument("--params", action="append", default=[], help="M:construction_ef:search_ef (여러 번 지정 가능)")
+    parser.add_argument("--k", type=int, default=5, help="recall@k의 k")
+    parser.add_argument("--num-vectors", type=int, default=20000, help="합성 코퍼스 벡터 수")
+    parser.add_argument("--dim", type=int, default=1536, help="합성 코퍼스 차원")
+    parser.add_argument("--num-queries", type=int, default=200, help="질의 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chroma-dir", default=None, help="실제 임베딩을 읽을 Chroma 저장소 경로")
+    parser.add_argument("--collection", default=None, help="실제 임베딩을 읽을 컬렉션 이름")
+    return parser.parse_args()
+
+
+def main() -> None:
+    from src.bench.hnsw import (
+        HnswParams,
+        format_results_table,
+        load_corpus_from_chroma,
+        run_hnsw_benchmark,
+        synthetic_corpus,
+    )
+
+    args = parse_args()
+    grid = [HnswParams.parse(raw) for raw in (args.params or DEFAULT_GRID)]
+
+    if args.chroma_dir:
+        corpus, queries = load_corpus_from_chroma(
+            persist_directory=args.chroma_dir,
+            collection_name=args.collection or "securities_reports",
+            num_queries=args.num_queries,
+            seed=args.seed,
+        )
+    else:
+        corpus, queries = synthetic_corpus(
+            num_vectors=args.num_vectors,
+            dim=args.dim,
+            num_queries=args.num_queries,
+            seed=args.seed,
+        )
+
+    print(f"corpus={corpus.shape[0]}x{corpus.shape[1]} queries={queries.shape[0]} k={args.k}")
+    results = run_hnsw_benchmark(corpus, queries, grid, k=args.k)
+    print(format_results_table(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Allow direct script execution: `python scripts/benchmark_rate_limiter.py ...`
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="요청 한도 검사 1회당 오버헤드 벤치마크")
+    parser.add_argument("--checks", type=int, default=100_000, help="스레드당 검사 횟수")
+    parser.add_argument("--users", type=int, default=1_000, help="순환할 사용자 수")
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--backend", choices=["memory", "sqlite", "all"], default="all")
+    parser.add_argument("--sqlite-path", default=None, help="SQLite 파일 경로 (기본: 임시 파일)")
+    return parser.parse_args()
+
+
+def run(limiter, *, checks: int, users: int, threads: int) -> tuple[float, int]:
+    from src.metrics import percentile
+
+    user_ids = [f"U{index:06d}" for index in range(users)]
+    latencies: list[float] = []
+    allowed = [0]
+    lock = threading.Lock()
+
+    def worker(offset: int) -> None:
+        local: list[float] = []
+        local_allowed = 0
+        for index in range(checks):
+            started = time.perf_counter()
+            local_allowed += limiter.is_allowed(user_ids[(index + offset) % users])
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+            allowed[0] += local_allowed
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(index * 7,)) for index in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    total = checks * threads
+    print(
+        f"  checks={total} allowed={allowed[0]} throughput={total / elapsed:,.0f}/s "
+        f"mean={elapsed / total * 1e6:.2f}us "
+        f"p50={percentile(latencies, 50) * 1e6:.2f}us p99={percentile(latencies, 99) * 1e6:.2f}us"
+    )
+    return elapsed, total
+
+
+def main() -> None:
+    from src.security import MemoryRateLimitBackend, RateLimiter, SQLiteRateLimitBackend
+
+    args = parse_args()
+    if args.backend in {"memory", "all"}:
+        print("memory")
+        limiter = RateLimiter(max_requests=10, window_seconds=60, backend=MemoryRateLimitBackend())
+        run(limiter, checks=args.checks, users=args.users, threads=args.threads)
+    if args.backend in {"sqlite", "all"}:
+        with tempfile.TemporaryDirectory() as directory:
+            path = args.sqlite_path or str(Path(directory) / "rate_limit.sqlite3")
+            print(f"sqlite ({path})")
+            backend = SQLiteRateLimitBackend(path)
+            limiter = RateLimiter(max_requests=10, window_seconds=60, backend=backend)
+            # SQLite는 검사마다 커밋하므로 횟수를 줄여 측정한다.
+            run(limiter, checks=max(1, args.checks // 10), users=args.users, threads=args.threads)
+            backend.close()
+
+
+if __name__ == "__main__":
+    main()
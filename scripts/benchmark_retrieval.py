@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Allow direct script execution: `python scripts/benchmark_retrieval.py ...`
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="합성 코퍼스 기반 오프라인 검색 품질/지연시간 벤치마크 (API 키 불필요)"
+    )
+    parser.add_argument("--num-reports", type=int, default=200, help="합성 리포트 수")
+    parser.add_argument("--num-questions", type=int, default=100, help="골든셋 질문 수")
+    parser.add_argument("--golden", default=None, help="JSONL 골든셋 경로 (question, expected_document_ids)")
+    parser.add_argument("--k", type=int, default=5, help="recall@k의 k")
+    parser.add_argument("--score-threshold", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--lexical", action="store_true", help="BM25 하이브리드 검색 사용")
+    parser.add_argument("--metadata-index", action="store_true", help="메타데이터 사전 필터 인덱스 사용")
+    parser.add_argument("--mmr", action="store_true", help="MMR/문서당 상한/연속 청크 병합 사용")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON 경로")
+    return parser.parse_args()
+
+
+def main() -> None:
+    from src.bench.retrieval import format_report, run_retrieval_benchmark
+
+    args = parse_args()
+    retriever_kwargs: dict = {"score_threshold": args.score_threshold}
+    if args.mmr:
+        retriever_kwargs.update(mmr_enabled=True, max_chunks_per_document=2, merge_adjacent=True)
+
+    report = run_retrieval_benchmark(
+        num_reports=args.num_reports,
+        num_questions=args.num_questions,
+        k=args.k,
+        seed=args.seed,
+        golden_path=args.golden,
+        lexical=args.lexical,
+        metadata_index=args.metadata_index,
+        retriever_kwargs=retriever_kwargs,
+    )
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")) if args.baseline else None
+    print(format_report(report, baseline))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Allow direct script execution: `python scripts/build_lexical_index.py ...`
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ChromaDB 컬렉션에서 BM25 역색인을 다시 빌드")
+    parser.add_argument("--query", action="append", default=[], help="빌드 후 검색해 볼 질의 (여러 번 지정 가능)")
+    parser.add_argument("--k", type=int, default=5, help="질의당 출력할 결과 수")
+    return parser.parse_args()
+
+
+def main() -> None:
+    import chromadb
+
+    from src.config import get_settings
+    from src.logging_utils import configure_logging
+    from src.pipeline.lexical_index import build_lexical_index
+
+    args = parse_args()
+    settings = get_settings()
+    configure_logging(level=settings.log_level)
+
+    client = chromadb.PersistentClient(path=settings.chroma_persist_dir)
+    collection = client.get_collection(settings.chroma_collection_name)
+    started = time.perf_counter()
+    index = build_lexical_index(collection, settings.lexical_index_dir)
+    print(f"chunks={len(index)} elapsed={time.perf_counter() - started:.2f}s dir={settings.lexical_index_dir}")
+
+    for query in args.query:
+        started = time.perf_counter()
+        hits = index.search(query, k=args.k)
+        print(f"query={query!r} elapsed_ms={(time.perf_counter() - started) * 1000:.2f}")
+        for chunk_id, score in hits:
+            print(f"  {score:.3f} {chunk_id}")
+
+
+if __name__ == "__main__":
+    main()
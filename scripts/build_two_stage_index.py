@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Allow direct script execution: `python scripts/build_two_stage_index.py ...`
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="2단계 검색용 저차원 컬렉션/전체 벡터 memmap 빌드")
+    parser.add_argument("--dim", type=int, default=256, help="저차원 벡터 차원")
+    parser.add_argument("--method", choices=("pca", "truncate"), default="pca", help="차원 축소 방식")
+    parser.add_argument("--fit-sample-size", type=int, default=20000, help="PCA 학습 표본 수")
+    parser.add_argument("--eval-queries", type=int, default=200, help="recall 측정 질의 수 (0이면 생략)")
+    parser.add_argument("--k", type=int, default=5, help="recall@k의 k")
+    return parser.parse_args()
+
+
+def main() -> None:
+    import chromadb
+    import numpy as np
+
+    from src.config import get_settings
+    from src.logging_utils import configure_logging
+    from src.pipeline.two_stage import (
+        TwoStageVectorStore,
+        build_two_stage_index,
+        measure_two_stage_footprint,
+        measure_two_stage_recall,
+    )
+
+    args = parse_args()
+    settings = get_settings()
+    configure_logging(level=settings.log_level)
+
+    client = chromadb.PersistentClient(path=settings.chroma_persist_dir)
+    source = client.get_collection(settings.chroma_collection_name)
+    projector, full_vectors = build_two_stage_index(
+        client=client,
+        source_collection=source,
+        collection_name=settings.chroma_collection_name,
+        directory=settings.two_stage_dir,
+        reduced_dim=args.dim,
+        method=args.method,
+        fit_sample_size=args.fit_sample_size,
+    )
+
+    store = TwoStageVectorStore.open(
+        client=client,
+        collection_name=settings.chroma_collection_name,
+        directory=settings.two_stage_dir,
+        embedding_function=None,  # type: ignore[arg-type] - 벡터 질의만 사용한다.
+        candidate_k=settings.two_stage_candidate_k,
+    )
+    footprint = measure_two_stage_footprint(store, persist_directory=settings.chroma_persist_dir)
+    print(
+        f"vectors={footprint.vectors} full_dim={footprint.full_dim} reduced_dim={footprint.reduced_dim} "
+        f"full_hnsw={_megabytes(footprint.full_index_bytes)} reduced_hnsw={_megabytes(footprint.reduced_index_bytes)} "
+        f"full_vectors_memmap={_megabytes(footprint.full_vectors_bytes)} "
+        f"rescoring_per_query={_megabytes(footprint.rescoring_bytes_per_query)}"
+    )
+    # 동기화된 동안 서빙 메모리는 저차원 HNSW와 재채점한 memmap 페이지다. 전체 HNSW는 디스크에만 남는다.
+    print(
+        f"serving_index_memory={_megabytes(footprint.full_index_bytes)} -> "
+        f"{_megabytes(footprint.reduced_index_bytes)} + memmap pages, "
+        f"extra_disk={_megabytes(footprint.reduced_index_bytes)} + {_megabytes(footprint.full_vectors_bytes)}"
+    )
+
+    if args.eval_queries <= 0:
+        return
+
+    ids, vectors = full_vectors.load_all()
+    rng = np.random.default_rng(42)
+    rows = rng.choice(len(ids), size=min(args.eval_queries, len(ids)), replace=False)
+    queries = np.asarray(vectors[rows]) + rng.normal(scale=0.02, size=(len(rows), projector.input_dim))
+    recall = measure_two_stage_recall(store, queries, k=args.k)
+    print(f"recall@{args.k}={recall:.4f} candidate_k={settings.two_stage_candidate_k}")
+
+
+def _megabytes(value: int | None) -> str:
+    return "n/a" if value is None else f"{value / 1e6:.1f}MB"
+
+
+if __name__ == "__main__":
+    main()
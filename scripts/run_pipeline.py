@@ -19,6 +19,11 @@ def parse_args() -> argparse.Namespace:
         default=[],
         help="처리할 PDF 파일 경로 (여러 번 지정 가능)",
     )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="초기 대량 적재 모드 (신규 문서 청크를 모아 대용량 배치로 임베딩/적재)",
+    )
     return parser.parse_args()
 
 
@@ -34,7 +39,7 @@ def main() -> None:
 
     runner = build_default_pipeline_runner(settings)
     targets = [Path(path) for path in args.pdfs] if args.pdfs else None
-    result = runner.run(pdf_paths=targets)
+    result = runner.run(pdf_paths=targets, bulk=args.bulk)
 
     print(f"Pipeline finished: total={result.total}, success={result.success_count}, failed={result.failed_count}")
     for failed in result.failed_files:
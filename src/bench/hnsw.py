@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import logging
+import shutil
+import tempfile
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+import chromadb
+import numpy as np
+
+from src.metrics import percentile
+from src.pipeline.embedder import build_collection_metadata
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_COLLECTION_NAME = "hnsw_benchmark"
+
+
+@dataclass(frozen=True, slots=True)
+class HnswParams:
+    m: int
+    construction_ef: int
+    search_ef: int
+
+    @property
+    def label(self) -> str:
+        return f"M={self.m},cef={self.construction_ef},sef={self.search_ef}"
+
+    @classmethod
+    def parse(cls, raw: str) -> HnswParams:
+        """`M:construction_ef:search_ef` 형식 문자열을 파싱한다."""
+        parts = [int(part) for part in raw.split(":")]
+        if len(parts) != 3:
+            raise ValueError(f"HNSW params must be M:construction_ef:search_ef, got {raw!r}")
+        return cls(m=parts[0], construction_ef=parts[1], search_ef=parts[2])
+
+
+@dataclass(frozen=True, slots=True)
+class HnswBenchmarkResult:
+    params: HnswParams
+    num_vectors: int
+    num_queries: int
+    k: int
+    recall_at_k: float
+    p50_ms: float
+    p99_ms: float
+    build_seconds: float
+    disk_bytes: int
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def synthetic_corpus(
+    *,
+    num_vectors: int,
+    dim: int,
+    num_queries: int,
+    num_clusters: int = 32,
+    seed: int = 42,
+) -> tuple[np.ndarray, np.ndarray]:
+    """리포트 임베딩처럼 주제별로 뭉친 분포의 정규화 벡터와 질의 벡터를 만든다."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(num_clusters, dim))
+    assignments = rng.integers(0, num_clusters, size=num_vectors)
+    corpus = centers[assignments] + rng.normal(scale=0.6, size=(num_vectors, dim))
+
+    query_sources = rng.integers(0, num_vectors, size=num_queries)
+    queries = corpus[query_sources] + rng.normal(scale=0.4, size=(num_queries, dim))
+    return normalize_rows(corpus), normalize_rows(queries)
+
+
+def load_corpus_from_chroma(
+    *,
+    persist_directory: str,
+    collection_name: str,
+    num_queries: int,
+    limit: int | None = None,
+    seed: int = 42,
+) -> tuple[np.ndarray, np.ndarray]:
+    """운영 컬렉션의 실제 임베딩을 읽고, 일부 벡터에 노이즈를 섞어 질의로 사용한다."""
+    client = chromadb.PersistentClient(path=persist_directory)
+    collection = client.get_collection(collection_name)
+    payload = collection.get(include=["embeddings"], limit=limit)
+    embeddings = payload.get("embeddings")
+    if embeddings is None or len(embeddings) == 0:
+        raise ValueError(f"Collection {collection_name!r} has no embeddings")
+
+    corpus = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+    rng = np.random.default_rng(seed)
+    sources = rng.integers(0, len(corpus), size=num_queries)
+    queries = corpus[sources] + rng.normal(scale=0.05, size=(num_queries, corpus.shape[1]))
+    return corpus, normalize_rows(queries)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """정규화된 벡터 기준 코사인 brute-force 검색 결과(행별 인덱스)."""
+    scores = queries @ corpus.T
+    k = min(k, corpus.shape[0])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def recall_at_k(approximate: list[list[int]], exact: np.ndarray, k: int) -> float:
+    if not approximate:
+        return 0.0
+    hits = 0
+    for found, truth in zip(approximate, exact, strict=True):
+        hits += len(set(found[:k]) & set(truth[:k].tolist()))
+    return hits / (len(approximate) * k)
+
+
+def directory_size_bytes(path: Path) -> int:
+    return sum(item.stat().st_size for item in path.rglob("*") if item.is_file())
+
+
+def benchmark_params(
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    params: HnswParams,
+    *,
+    k: int = 5,
+    exact: np.ndarray | None = None,
+    insert_batch_size: int = 1000,
+    workdir: Path | None = None,
+) -> HnswBenchmarkResult:
+    exact_ids = exact if exact is not None else exact_top_k(corpus, queries, k)
+    index_dir = Path(tempfile.mkdtemp(prefix="hnsw_bench_", dir=workdir))
+    try:
+        client = chromadb.PersistentClient(path=str(index_dir))
+        collection = client.create_collection(
+            BENCHMARK_COLLECTION_NAME,
+            metadata=build_collection_metadata(
+                hnsw_m=params.m,
+                hnsw_construction_ef=params.construction_ef,
+                hnsw_search_ef=params.search_ef,
+            ),
+            embedding_function=None,
+        )
+
+        ids = [str(index) for index in range(corpus.shape[0])]
+        build_started = time.perf_counter()
+        for start in range(0, len(ids), insert_batch_size):
+            end = start + insert_batch_size
+            collection.add(ids=ids[start:end], embeddings=corpus[start:end])
+        # 첫 질의까지 포함해야 인덱스 로딩 비용이 빌드 시간에 반영된다.
+        collection.query(query_embeddings=queries[:1], n_results=k, include=[])
+        build_seconds = time.perf_counter() - build_started
+
+        latencies: list[float] = []
+        found: list[list[int]] = []
+        for query in queries:
+            started = time.perf_counter()
+            result = collection.query(query_embeddings=query[np.newaxis, :], n_results=k, include=[])
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            found.append([int(item) for item in result["ids"][0]])
+
+        disk_bytes = directory_size_bytes(index_dir)
+        del collection, client
+    finally:
+        shutil.rmtree(index_dir, ignore_errors=True)
+
+    return HnswBenchmarkResult(
+        params=params,
+        num_vectors=int(corpus.shape[0]),
+        num_queries=int(queries.shape[0]),
+        k=k,
+        recall_at_k=recall_at_k(found, exact_ids, k),
+        p50_ms=percentile(latencies, 50),
+        p99_ms=percentile(latencies, 99),
+        build_seconds=build_seconds,
+        disk_bytes=disk_bytes,
+    )
+
+
+def run_hnsw_benchmark(
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    params_grid: Iterable[HnswParams],
+    *,
+    k: int = 5,
+    workdir: Path | None = None,
+) -> list[HnswBenchmarkResult]:
+    exact = exact_top_k(corpus, queries, k)
+    results: list[HnswBenchmarkResult] = []
+    for params in params_grid:
+        logger.info("Benchmarking %s over %d vectors", params.label, corpus.shape[0])
+        results.append(benchmark_params(corpus, queries, params, k=k, exact=exact, workdir=workdir))
+    return results
+
+
+def format_results_table(results: list[HnswBenchmarkResult]) -> str:
+    header = f"{'params':<32} {'recall@k':>9} {'p50(ms)':>9} {'p99(ms)':>9} {'build(s)':>9} {'disk(MB)':>9}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            f"{result.params.label:<32} {result.recall_at_k:>9.4f} {result.p50_ms:>9.2f} {result.p99_ms:>9.2f} "
+            f"{result.build_seconds:>9.2f} {result.disk_bytes / (1024 * 1024):>9.2f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import chromadb
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.metrics import percentile
+from src.models import ReportMetadata
+from src.pipeline.chunker import ReportChunker
+from src.pipeline.embedder import build_collection_metadata, generate_chunk_id
+from src.pipeline.lexical_index import build_lexical_index, tokenize
+from src.pipeline.metadata_index import MetadataIndex
+from src.rag.retriever import ReportRetriever
+
+BENCHMARK_COLLECTION_NAME = "retrieval_benchmark"
+DEFAULT_HASHING_DIM = 256
+
+COMPANIES = (
+    ("삼성전자", "005930"),
+    ("SK하이닉스", "000660"),
+    ("NAVER", "035420"),
+    ("카카오", "035720"),
+    ("현대차", "005380"),
+    ("LG에너지솔루션", "373220"),
+    ("셀트리온", "068270"),
+    ("기아", "000270"),
+)
+BROKERS = (
+    ("mirae", "미래에셋증권"),
+    ("koreainvest", "한국투자증권"),
+    ("samsung", "삼성증권"),
+    ("kb", "KB증권"),
+    ("shinhan", "신한투자증권"),
+)
+RATINGS = ("매수", "중립", "매도")
+# (주제 키워드, 본문 문장)
+TOPICS = (
+    ("HBM", "HBM 수요 확대로 고부가 메모리 출하가 늘어나고 있다."),
+    ("파운드리", "파운드리 가동률 회복과 선단 공정 수주가 실적 개선을 이끈다."),
+    ("광고", "광고 매출이 경기 둔화 속에서도 견조한 성장세를 이어간다."),
+    ("커머스", "커머스 거래액 증가와 수수료율 인상이 이익 레버리지로 이어진다."),
+    ("전기차", "전기차 판매 믹스 개선으로 대당 판매가격이 상승했다."),
+    ("배터리", "배터리 셀 수주잔고가 확대되며 북미 공장 가동률이 높아진다."),
+    ("바이오시밀러", "바이오시밀러 신제품 출시로 유럽 점유율이 확대된다."),
+    ("배당", "주주환원 정책 강화로 배당 성향 상향이 기대된다."),
+)
+
+
+class HashingEmbeddings(Embeddings):
+    """토큰 해시 기반 결정적 임베딩. API 키 없이 같은 입력에 항상 같은 벡터를 만든다."""
+
+    def __init__(self, dim: int = DEFAULT_HASHING_DIM):
+        self.dim = dim
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+    def _embed(self, text: str) -> list[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in tokenize(text):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+
+@dataclass(frozen=True, slots=True)
+class SyntheticReport:
+    document_id: str
+    metadata: ReportMetadata
+    topics: tuple[str, ...]
+    content: str
+
+
+@dataclass(frozen=True, slots=True)
+class GoldenQuestion:
+    question: str
+    expected_document_ids: frozenset[str]
+    kind: str = "semantic"
+
+
+@dataclass(slots=True)
+class RetrievalBenchmarkReport:
+    num_documents: int
+    num_chunks: int
+    num_questions: int
+    k: int
+    recall_at_k: float
+    mrr: float
+    recall_by_kind: dict[str, float] = field(default_factory=dict)
+    stage_hit_rates: dict[str, float] = field(default_factory=dict)
+    latency_ms: dict[str, dict[str, float]] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def synthetic_reports(num_reports: int = 200, *, seed: int = 42) -> list[SyntheticReport]:
+    rng = random.Random(seed)
+    reports: list[SyntheticReport] = []
+    for index in range(num_reports):
+        company, ticker = rng.choice(COMPANIES)
+        broker_key, broker = rng.choice(BROKERS)
+        year = rng.choice((2025, 2026))
+        month = rng.randint(1, 12)
+        day = rng.randint(1, 28)
+        date = f"{year:04d}-{month:02d}-{day:02d}"
+        topics = tuple(rng.sample([name for name, _ in TOPICS], 2))
+        sentences = dict(TOPICS)
+        target_price = rng.randrange(50_000, 500_000, 5_000)
+        source_file = f"{broker_key}_{ticker}_{year:04d}{month:02d}{day:02d}_{index:04d}.pdf"
+        metadata: ReportMetadata = {
+            "ticker": ticker,
+            "company_name": company,
+            "date": date,
+            "broker": broker,
+            "analyst": f"애널리스트{index % 17:02d}",
+            "report_type": "기업분석",
+            "target_price": target_price,
+            "rating": rng.choice(RATINGS),
+            "source_file": source_file,
+        }
+        content = "\n\n".join(
+            [
+                f"# {company} ({ticker}) {topics[0]} 점검",
+                f"## 투자포인트\n{company}의 {sentences[topics[0]]} {sentences[topics[0]]}",
+                f"## 실적 전망\n{company} {topics[1]} 관련 전망: {sentences[topics[1]]} "
+                f"목표주가 {target_price:,}원 제시.",
+                "| 항목 | 2025 | 2026 |\n|---|---|---|\n"
+                f"| 매출액 | {rng.randint(10, 300)}조 | {rng.randint(10, 300)}조 |",
+            ]
+        )
+        reports.append(
+            SyntheticReport(
+                document_id=source_file.rsplit(".", maxsplit=1)[0],
+                metadata=metadata,
+                topics=topics,
+                content=content,
+            )
+        )
+    return reports
+
+
+def golden_set(
+    reports: Sequence[SyntheticReport],
+    *,
+    num_questions: int = 100,
+    seed: int = 42,
+) -> list[GoldenQuestion]:
+    """합성 리포트에서 의미 검색/필터/기간 질문과 정답 문서 집합을 만든다."""
+    rng = random.Random(seed + 1)
+    questions: list[GoldenQuestion] = []
+    for _ in range(num_questions):
+        report = rng.choice(reports)
+        metadata = report.metadata
+        topic = report.topics[0]
+        kind = rng.choice(("semantic", "filtered", "temporal"))
+        if kind == "semantic":
+            question = f"{metadata['company_name']} {topic} 전망은?"
+            expected = {
+                item.document_id
+                for item in reports
+                if item.metadata["ticker"] == metadata["ticker"] and topic in item.topics
+            }
+        elif kind == "filtered":
+            question = f"{metadata['broker']} {metadata['ticker']} {topic} 리포트"
+            expected = {
+                item.document_id
+                for item in reports
+                if item.metadata["ticker"] == metadata["ticker"]
+                and item.metadata["broker"] == metadata["broker"]
+                and topic in item.topics
+            }
+        else:
+            year, month = int(metadata["date"][:4]), int(metadata["date"][5:7])
+            quarter = (month - 1) // 3 + 1
+            question = f"{year}년 {quarter}분기 {metadata['company_name']} {topic}"
+            expected = {
+                item.document_id
+                for item in reports
+                if item.metadata["ticker"] == metadata["ticker"]
+                and topic in item.topics
+                and item.metadata["date"][:4] == str(year)
+                and (int(item.metadata["date"][5:7]) - 1) // 3 + 1 == quarter
+            }
+        questions.append(GoldenQuestion(question=question, expected_document_ids=frozenset(expected), kind=kind))
+    return questions
+
+
+def load_golden_set(path: str | Path) -> list[GoldenQuestion]:
+    """JSONL 골든셋을 읽는다. 각 줄은 `question`, `expected_document_ids`, 선택 `kind`를 가진다."""
+    questions: list[GoldenQuestion] = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        payload = json.loads(line)
+        questions.append(
+            GoldenQuestion(
+                question=payload["question"],
+                expected_document_ids=frozenset(payload["expected_document_ids"]),
+                kind=payload.get("kind", "semantic"),
+            )
+        )
+    return questions
+
+
+def build_vectorstore(
+    reports: Sequence[SyntheticReport],
+    *,
+    embeddings: Embeddings,
+    client: Any | None = None,
+    collection_name: str = BENCHMARK_COLLECTION_NAME,
+) -> tuple[Chroma, list[Document]]:
+    """실제 청커로 리포트를 나눠 결정적 임베딩으로 컬렉션을 만든다."""
+    chunker = ReportChunker(chunk_size=400, chunk_overlap=80)
+    documents = [document for report in reports for document in chunker.chunk(report.content, report.metadata)]
+    vectorstore = Chroma(
+        collection_name=collection_name,
+        embedding_function=embeddings,
+        client=client or chromadb.EphemeralClient(),
+        collection_metadata=build_collection_metadata(),
+    )
+    ids = [
+        generate_chunk_id(str(document.metadata["document_id"]), int(document.metadata["chunk_index"]))
+        for document in documents
+    ]
+    vectorstore._collection.upsert(  # type: ignore[attr-defined]
+        ids=ids,
+        documents=[document.page_content for document in documents],
+        metadatas=[dict(document.metadata) for document in documents],
+        embeddings=embeddings.embed_documents([document.page_content for document in documents]),
+    )
+    return vectorstore, documents
+
+
+def evaluate_retriever(
+    retriever: ReportRetriever,
+    questions: Sequence[GoldenQuestion],
+    *,
+    k: int,
+    num_documents: int = 0,
+    num_chunks: int = 0,
+) -> RetrievalBenchmarkReport:
+    recalls: list[float] = []
+    reciprocal_ranks: list[float] = []
+    recalls_by_kind: dict[str, list[float]] = {}
+    stages: Counter[str] = Counter()
+    latencies: dict[str, list[float]] = {}
+
+    for question in questions:
+        started = time.perf_counter()
+        documents, trace = retriever.retrieve_with_trace(question.question, k=k)
+        latencies.setdefault("wall", []).append((time.perf_counter() - started) * 1000.0)
+        for stage, elapsed_ms in trace.timings_ms.items():
+            latencies.setdefault(stage, []).append(elapsed_ms)
+        stages[trace.stage] += 1
+
+        retrieved_ids = [str((document.metadata or {}).get("document_id", "")) for document in documents[:k]]
+        expected = question.expected_document_ids
+        recall = len(expected.intersection(retrieved_ids)) / len(expected) if expected else 0.0
+        rank = next((position for position, doc_id in enumerate(retrieved_ids, start=1) if doc_id in expected), None)
+        recalls.append(recall)
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+        recalls_by_kind.setdefault(question.kind, []).append(recall)
+
+    total = max(len(questions), 1)
+    return RetrievalBenchmarkReport(
+        num_documents=num_documents,
+        num_chunks=num_chunks,
+        num_questions=len(questions),
+        k=k,
+        recall_at_k=float(np.mean(recalls)) if recalls else 0.0,
+        mrr=float(np.mean(reciprocal_ranks)) if reciprocal_ranks else 0.0,
+        recall_by_kind={kind: float(np.mean(values)) for kind, values in sorted(recalls_by_kind.items())},
+        stage_hit_rates={stage: count / total for stage, count in sorted(stages.items())},
+        latency_ms={
+            stage: {
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+            for stage, values in sorted(latencies.items())
+        },
+    )
+
+
+def run_retrieval_benchmark(
+    *,
+    num_reports: int = 200,
+    num_questions: int = 100,
+    k: int = 5,
+    seed: int = 42,
+    golden_path: str | Path | None = None,
+    lexical: bool = False,
+    metadata_index: bool = False,
+    retriever_kwargs: dict[str, Any] | None = None,
+) -> RetrievalBenchmarkReport:
+    """합성 코퍼스로 컬렉션을 만들고 골든셋으로 검색기를 평가한다. 네트워크/API 키가 필요 없다.
+
+    `lexical`/`metadata_index`를 켜면 임시 디렉터리에 BM25 색인을, 메모리에 메타데이터 인덱스를 만들어 함께 평가한다.
+    """
+    reports = synthetic_reports(num_reports, seed=seed)
+    questions = (
+        load_golden_set(golden_path) if golden_path else golden_set(reports, num_questions=num_questions, seed=seed)
+    )
+    embeddings = HashingEmbeddings()
+    vectorstore, documents = build_vectorstore(reports, embeddings=embeddings)
+    collection = vectorstore._collection  # type: ignore[attr-defined]
+    with tempfile.TemporaryDirectory(prefix="retrieval-bench-") as workdir:
+        retriever = ReportRetriever(
+            vectorstore,
+            openai_api_key="",
+            k=k,
+            self_query_enabled=False,
+            lexical_index=build_lexical_index(collection, Path(workdir) / "lexical") if lexical else None,
+            metadata_index=(
+                MetadataIndex.from_collection(collection, refresh_interval_seconds=0) if metadata_index else None
+            ),
+            **(retriever_kwargs or {}),
+        )
+        return evaluate_retriever(retriever, questions, k=k, num_documents=len(reports), num_chunks=len(documents))
+
+
+def format_report(report: RetrievalBenchmarkReport, baseline: dict[str, Any] | None = None) -> str:
+    def _delta(value: float, key: str) -> str:
+        if baseline is None or key not in baseline:
+            return ""
+        return f" ({value - float(baseline[key]):+.4f})"
+
+    lines = [
+        f"documents={report.num_documents} chunks={report.num_chunks} questions={report.num_questions} k={report.k}",
+        f"recall@{report.k}={report.recall_at_k:.4f}{_delta(report.recall_at_k, 'recall_at_k')}",
+        f"mrr={report.mrr:.4f}{_delta(report.mrr, 'mrr')}",
+        "recall by kind: " + ", ".join(f"{kind}={value:.4f}" for kind, value in report.recall_by_kind.items()),
+        "stage hit rate: " + ", ".join(f"{stage}={rate:.2%}" for stage, rate in report.stage_hit_rates.items()),
+        f"{'stage':<16} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9}",
+    ]
+    for stage, summary in report.latency_ms.items():
+        lines.append(f"{stage:<16} {summary['p50']:>9.2f} {summary['p95']:>9.2f} {summary['p99']:>9.2f}")
+    return "\n".join(lines)
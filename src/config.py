@@ -16,6 +16,19 @@ def _split_csv(raw: str | None) -> list[str]:
     return [item.strip() for item in raw.split(",") if item.strip()]
 
 
+def _env_bool(raw: str | None, default: bool = False) -> bool:
+    if raw is None or not raw.strip():
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _optional_int(raw: str | None) -> int | None:
+    if raw is None or not raw.strip():
+        return None
+    value = int(raw)
+    return value if value > 0 else None
+
+
 @dataclass(frozen=True, slots=True)
 class Settings:
     """프로젝트 전역 설정."""
@@ -26,17 +39,79 @@ class Settings:
     slack_bot_token: str | None
     slack_app_token: str | None
     slack_signing_secret: str | None
+    slack_streaming_enabled: bool
+    slack_stream_update_interval_seconds: float
+    slack_async_enabled: bool
+    slack_max_concurrent_questions: int
+    slack_question_workers: int | None
+    slack_question_queue_depth: int
+    slack_question_max_pending_per_user: int | None
+    rate_limit_max_requests: int
+    rate_limit_window_seconds: float
+    rate_limit_backend: str
+    rate_limit_sqlite_path: str
+    slack_event_dedup_enabled: bool
+    slack_event_dedup_backend: str
+    slack_event_dedup_ttl_seconds: float
+    slack_event_dedup_sqlite_path: str
+    slack_warmup_enabled: bool
+    slack_warmup_queries: list[str]
+    slack_warmup_answer_queries: int
+    slack_ready_file: str | None
+    slack_thread_replies: bool
 
     llm_model: str
     embedding_model: str
     chroma_persist_dir: str
     chroma_collection_name: str
+    chroma_hnsw_m: int
+    chroma_hnsw_construction_ef: int
+    chroma_hnsw_search_ef: int
+    two_stage_enabled: bool
+    two_stage_dir: str
+    two_stage_candidate_k: int
+    lexical_index_enabled: bool
+    lexical_index_dir: str
+    hybrid_candidate_k: int
+    hybrid_rrf_k: int
+    hybrid_min_lexical_score: float
+    metadata_index_enabled: bool
+    metadata_index_refresh_seconds: float
+    exact_scan_max_candidates: int
+    mmr_enabled: bool
+    mmr_lambda: float
+    mmr_fetch_k: int
+    max_chunks_per_document: int | None
+    merge_adjacent_chunks: bool
+    query_embedding_cache_size: int
+    query_embedding_cache_ttl_seconds: int
+    query_embedding_cache_path: str | None
+    query_embedding_batch_enabled: bool
+    query_embedding_batch_max_size: int
+    query_embedding_batch_wait_ms: float
+    context_token_budget: int | None
+    answer_cache_enabled: bool
+    question_coalescing_enabled: bool
+    conversation_cache_enabled: bool
+    conversation_cache_max_threads: int
+    conversation_cache_ttl_seconds: int
+    answer_cache_size: int
+    answer_cache_ttl_seconds: int
+    query_planner_confidence_threshold: float
+    retrieval_mode: str
+    retrieval_deadline_seconds: float
     log_level: str
     upstage_parse_mode: str
     upstage_parse_endpoint: str
     upstage_timeout_seconds: int
     upstage_max_retries: int
     upstage_retry_base_delay_seconds: float
+    embedding_batch_size: int
+    embedding_max_concurrency: int
+    embedding_max_batch_tokens: int
+    embedding_requests_per_minute: int | None
+    embedding_tokens_per_minute: int | None
+    bulk_chunk_batch_size: int
 
     allowed_channel_ids: list[str]
     allowed_user_ids: list[str]
@@ -84,10 +159,73 @@ class Settings:
             slack_bot_token=os.getenv("SLACK_BOT_TOKEN"),
             slack_app_token=os.getenv("SLACK_APP_TOKEN"),
             slack_signing_secret=os.getenv("SLACK_SIGNING_SECRET"),
+            slack_streaming_enabled=_env_bool(os.getenv("SLACK_STREAMING_ENABLED"), default=True),
+            slack_stream_update_interval_seconds=float(os.getenv("SLACK_STREAM_UPDATE_INTERVAL_SECONDS", "1.0")),
+            slack_async_enabled=_env_bool(os.getenv("SLACK_ASYNC_ENABLED")),
+            slack_max_concurrent_questions=int(os.getenv("SLACK_MAX_CONCURRENT_QUESTIONS", "32")),
+            slack_question_workers=_optional_int(os.getenv("SLACK_QUESTION_WORKERS", "4")),
+            slack_question_queue_depth=int(os.getenv("SLACK_QUESTION_QUEUE_DEPTH", "50")),
+            slack_question_max_pending_per_user=_optional_int(os.getenv("SLACK_QUESTION_MAX_PENDING_PER_USER", "3")),
+            rate_limit_max_requests=int(os.getenv("RATE_LIMIT_MAX_REQUESTS", "10")),
+            rate_limit_window_seconds=float(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "60")),
+            rate_limit_backend=os.getenv("RATE_LIMIT_BACKEND", "memory"),
+            rate_limit_sqlite_path=os.getenv("RATE_LIMIT_SQLITE_PATH", "./data/cache/slack_state.sqlite3"),
+            slack_event_dedup_enabled=_env_bool(os.getenv("SLACK_EVENT_DEDUP_ENABLED"), default=True),
+            slack_event_dedup_backend=os.getenv("SLACK_EVENT_DEDUP_BACKEND", "memory"),
+            slack_event_dedup_ttl_seconds=float(os.getenv("SLACK_EVENT_DEDUP_TTL_SECONDS", "900")),
+            slack_event_dedup_sqlite_path=os.getenv(
+                "SLACK_EVENT_DEDUP_SQLITE_PATH",
+                "./data/cache/slack_state.sqlite3",
+            ),
+            slack_warmup_enabled=_env_bool(os.getenv("SLACK_WARMUP_ENABLED"), default=True),
+            slack_warmup_queries=_split_csv(os.getenv("SLACK_WARMUP_QUERIES")),
+            slack_warmup_answer_queries=int(os.getenv("SLACK_WARMUP_ANSWER_QUERIES", "1")),
+            slack_ready_file=os.getenv("SLACK_READY_FILE", "./data/slack_bot.ready") or None,
+            slack_thread_replies=_env_bool(os.getenv("SLACK_THREAD_REPLIES"), default=True),
             llm_model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
             embedding_model=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
             chroma_persist_dir=os.getenv("CHROMA_PERSIST_DIR", "./data/chromadb"),
             chroma_collection_name=os.getenv("CHROMA_COLLECTION_NAME", "securities_reports"),
+            chroma_hnsw_m=int(os.getenv("CHROMA_HNSW_M", "16")),
+            chroma_hnsw_construction_ef=int(os.getenv("CHROMA_HNSW_CONSTRUCTION_EF", "100")),
+            chroma_hnsw_search_ef=int(os.getenv("CHROMA_HNSW_SEARCH_EF", "100")),
+            two_stage_enabled=_env_bool(os.getenv("TWO_STAGE_ENABLED")),
+            two_stage_dir=os.getenv("TWO_STAGE_DIR", "./data/two_stage"),
+            two_stage_candidate_k=int(os.getenv("TWO_STAGE_CANDIDATE_K", "50")),
+            lexical_index_enabled=_env_bool(os.getenv("LEXICAL_INDEX_ENABLED"), default=True),
+            lexical_index_dir=os.getenv("LEXICAL_INDEX_DIR", "./data/lexical_index"),
+            hybrid_candidate_k=int(os.getenv("HYBRID_CANDIDATE_K", "20")),
+            hybrid_rrf_k=int(os.getenv("HYBRID_RRF_K", "60")),
+            hybrid_min_lexical_score=float(os.getenv("HYBRID_MIN_LEXICAL_SCORE", "0")),
+            metadata_index_enabled=_env_bool(os.getenv("METADATA_INDEX_ENABLED"), default=True),
+            metadata_index_refresh_seconds=float(os.getenv("METADATA_INDEX_REFRESH_SECONDS", "300")),
+            exact_scan_max_candidates=int(os.getenv("EXACT_SCAN_MAX_CANDIDATES", "2000")),
+            mmr_enabled=_env_bool(os.getenv("MMR_ENABLED"), default=True),
+            mmr_lambda=float(os.getenv("MMR_LAMBDA", "0.7")),
+            mmr_fetch_k=int(os.getenv("MMR_FETCH_K", "20")),
+            max_chunks_per_document=_optional_int(os.getenv("MAX_CHUNKS_PER_DOCUMENT", "2")),
+            merge_adjacent_chunks=_env_bool(os.getenv("MERGE_ADJACENT_CHUNKS"), default=True),
+            query_embedding_cache_size=int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048")),
+            query_embedding_cache_ttl_seconds=int(os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", "86400")),
+            query_embedding_cache_path=os.getenv(
+                "QUERY_EMBEDDING_CACHE_PATH",
+                "./data/cache/query_embeddings.npz",
+            )
+            or None,
+            query_embedding_batch_enabled=_env_bool(os.getenv("QUERY_EMBEDDING_BATCH_ENABLED"), default=True),
+            query_embedding_batch_max_size=int(os.getenv("QUERY_EMBEDDING_BATCH_MAX_SIZE", "16")),
+            query_embedding_batch_wait_ms=float(os.getenv("QUERY_EMBEDDING_BATCH_WAIT_MS", "5")),
+            context_token_budget=_optional_int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000")),
+            answer_cache_enabled=_env_bool(os.getenv("ANSWER_CACHE_ENABLED"), default=True),
+            question_coalescing_enabled=_env_bool(os.getenv("QUESTION_COALESCING_ENABLED"), default=True),
+            conversation_cache_enabled=_env_bool(os.getenv("CONVERSATION_CACHE_ENABLED"), default=True),
+            conversation_cache_max_threads=int(os.getenv("CONVERSATION_CACHE_MAX_THREADS", "1000")),
+            conversation_cache_ttl_seconds=int(os.getenv("CONVERSATION_CACHE_TTL_SECONDS", "1800")),
+            answer_cache_size=int(os.getenv("ANSWER_CACHE_SIZE", "512")),
+            answer_cache_ttl_seconds=int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400")),
+            query_planner_confidence_threshold=float(os.getenv("QUERY_PLANNER_CONFIDENCE_THRESHOLD", "0.75")),
+            retrieval_mode=os.getenv("RETRIEVAL_MODE", "sequential"),
+            retrieval_deadline_seconds=float(os.getenv("RETRIEVAL_DEADLINE_SECONDS", "3.0")),
             log_level=os.getenv("LOG_LEVEL", "DEBUG"),
             upstage_parse_mode=os.getenv("UPSTAGE_PARSE_MODE", "auto"),
             upstage_parse_endpoint=os.getenv(
@@ -97,6 +235,12 @@ class Settings:
             upstage_timeout_seconds=int(os.getenv("UPSTAGE_TIMEOUT_SECONDS", "300")),
             upstage_max_retries=int(os.getenv("UPSTAGE_MAX_RETRIES", "3")),
             upstage_retry_base_delay_seconds=float(os.getenv("UPSTAGE_RETRY_BASE_DELAY_SECONDS", "2.0")),
+            embedding_batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "100")),
+            embedding_max_concurrency=int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4")),
+            embedding_max_batch_tokens=int(os.getenv("EMBEDDING_MAX_BATCH_TOKENS", "8000")),
+            embedding_requests_per_minute=_optional_int(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE")),
+            embedding_tokens_per_minute=_optional_int(os.getenv("EMBEDDING_TOKENS_PER_MINUTE")),
+            bulk_chunk_batch_size=int(os.getenv("BULK_CHUNK_BATCH_SIZE", "2000")),
             allowed_channel_ids=_split_csv(os.getenv("ALLOWED_CHANNEL_IDS")),
             allowed_user_ids=_split_csv(os.getenv("ALLOWED_USER_IDS")),
         )
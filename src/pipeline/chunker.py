@@ -6,6 +6,7 @@ from typing import Any
 from langchain_core.documents import Document
 
 from src.models import ReportMetadata
+from src.pipeline.metadata import date_to_int
 
 try:
     from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
@@ -167,11 +168,16 @@ class ReportChunker:
     ) -> dict[str, Any]:
         source_file = report_metadata.get("source_file", "")
         document_id = source_file.rsplit(".", maxsplit=1)[0]
-        return {
+        base_metadata: dict[str, Any] = {
             **report_metadata,
             **section_metadata,
             "document_id": document_id,
         }
+        # 기간 조건을 $gte/$lte로 비교할 수 있도록 발행일을 정수로도 저장한다.
+        date_int = date_to_int(report_metadata.get("date"))
+        if date_int is not None:
+            base_metadata["date_int"] = date_int
+        return base_metadata
 
     def _split_section_segments(self, section_text: str) -> list[tuple[str, str]]:
         lines = section_text.splitlines()
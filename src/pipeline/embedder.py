@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -8,11 +9,40 @@ from langchain_chroma import Chroma
 from langchain_core.documents import Document
 from langchain_upstage import UpstageEmbeddings
 
+from src.pipeline.embedding_executor import DEFAULT_MAX_BATCH_TOKENS, EmbeddingExecutor
+from src.pipeline.lexical_index import LexicalIndex
+from src.pipeline.metadata_index import MetadataIndex
+from src.pipeline.two_stage import TwoStageVectorStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_BATCH_SIZE = 100
+DEFAULT_EMBEDDING_MAX_CONCURRENCY = 4
+DEFAULT_UPSERT_BATCH_SIZE = 5000
+DEFAULT_HNSW_M = 16
+DEFAULT_HNSW_CONSTRUCTION_EF = 100
+DEFAULT_HNSW_SEARCH_EF = 100
+
 
 def generate_chunk_id(document_id: str, chunk_index: int) -> str:
     return f"{document_id}::chunk_{chunk_index}"
 
 
+def build_collection_metadata(
+    *,
+    hnsw_m: int = DEFAULT_HNSW_M,
+    hnsw_construction_ef: int = DEFAULT_HNSW_CONSTRUCTION_EF,
+    hnsw_search_ef: int = DEFAULT_HNSW_SEARCH_EF,
+) -> dict[str, Any]:
+    return {
+        "description": "증권사 애널리스트 리포트 청크 벡터 저장소",
+        "hnsw:space": "cosine",
+        "hnsw:M": hnsw_m,
+        "hnsw:construction_ef": hnsw_construction_ef,
+        "hnsw:search_ef": hnsw_search_ef,
+    }
+
+
 @dataclass(slots=True)
 class VectorSnapshot:
     ids: list[str]
@@ -31,11 +61,30 @@ class ReportEmbedder:
         persist_directory: str = "./data/chromadb",
         collection_name: str = "securities_reports",
         embedding_model: str = "embedding-query",
+        embedding_batch_size: int = DEFAULT_EMBEDDING_BATCH_SIZE,
+        embedding_max_concurrency: int = DEFAULT_EMBEDDING_MAX_CONCURRENCY,
+        embedding_max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        embedding_requests_per_minute: int | None = None,
+        embedding_tokens_per_minute: int | None = None,
+        upsert_batch_size: int = DEFAULT_UPSERT_BATCH_SIZE,
+        hnsw_m: int = DEFAULT_HNSW_M,
+        hnsw_construction_ef: int = DEFAULT_HNSW_CONSTRUCTION_EF,
+        hnsw_search_ef: int = DEFAULT_HNSW_SEARCH_EF,
+        lexical_index: LexicalIndex | None = None,
+        metadata_index: MetadataIndex | None = None,
+        two_stage_index: TwoStageVectorStore | None = None,
     ):
         self.persist_directory = persist_directory
+        # 벡터와 함께 갱신되는 BM25 역색인. 변경분은 `flush()`에서 디스크에 기록한다.
+        self.lexical_index = lexical_index
+        # 같은 프로세스의 검색기가 쓰는 메타데이터 사전 필터 인덱스. 적재/삭제 시 함께 갱신한다.
+        self.metadata_index = metadata_index
+        # 2단계 검색용 저차원 컬렉션과 전체 벡터 memmap. 운영 컬렉션과 같은 청크를 쓰고 지운다.
+        self.two_stage_index = two_stage_index
+        self.upsert_batch_size = max(1, upsert_batch_size)
         Path(self.persist_directory).mkdir(parents=True, exist_ok=True)
 
-        embeddings = UpstageEmbeddings(
+        self.embeddings = UpstageEmbeddings(
             api_key=api_key,
             model=embedding_model,
             dimensions=1536,
@@ -44,20 +93,34 @@ class ReportEmbedder:
         )
         self.vectorstore = Chroma(
             collection_name=collection_name,
-            embedding_function=embeddings,
+            embedding_function=self.embeddings,
             persist_directory=self.persist_directory,
-            collection_metadata={
-                "description": "증권사 애널리스트 리포트 청크 벡터 저장소",
-                "hnsw:space": "cosine",
-            },
+            collection_metadata=build_collection_metadata(
+                hnsw_m=hnsw_m,
+                hnsw_construction_ef=hnsw_construction_ef,
+                hnsw_search_ef=hnsw_search_ef,
+            ),
+        )
+        self._sync_hnsw_config(
+            hnsw_m=hnsw_m,
+            hnsw_construction_ef=hnsw_construction_ef,
+            hnsw_search_ef=hnsw_search_ef,
+        )
+        self.embedding_executor = EmbeddingExecutor(
+            self.embeddings,
+            max_batch_tokens=embedding_max_batch_tokens,
+            max_batch_size=embedding_batch_size,
+            max_concurrency=embedding_max_concurrency,
+            requests_per_minute=embedding_requests_per_minute,
+            tokens_per_minute=embedding_tokens_per_minute,
         )
 
     def embed_and_store(self, documents: list[Document]) -> int:
         if not documents:
             return 0
 
-        ids = self._build_chunk_ids(documents)
-        self.vectorstore.add_documents(documents=documents, ids=ids)
+        self._upsert_documents(documents)
+        self._index_documents(documents)
         return len(documents)
 
     def replace_document(self, *, document_id: str, documents: list[Document]) -> int:
@@ -65,11 +128,37 @@ class ReportEmbedder:
             self.delete_document(document_id)
             return 0
 
-        ids = self._build_chunk_ids(documents)
+        # 임베딩이 실패하면 기존 벡터를 지우기 전에 예외가 나도록 임베딩을 먼저 계산한다.
+        vectors = self.embed_texts([document.page_content for document in documents])
         self.delete_document(document_id)
-        self.vectorstore.add_documents(documents=documents, ids=ids)
+        self._upsert_documents(documents, vectors=vectors)
+        self._index_documents(documents)
         return len(documents)
 
+    def bulk_upsert(self, documents: list[Document]) -> int:
+        """신규 문서 청크를 대용량 배치로 임베딩해 한 번에 upsert한다.
+
+        문서 단위 snapshot/delete 없이 적재하므로 기존 벡터가 없는 문서에만 사용한다.
+        """
+        if not documents:
+            return 0
+
+        self._upsert_documents(documents)
+        self._index_documents(documents)
+        stats = self.embedding_executor.last_stats
+        logger.info(
+            "Bulk upserted chunks=%d embedding_batches=%d embedding_elapsed=%.2fs throughput=%.1f chunks/s",
+            len(documents),
+            len(stats.batches),
+            stats.elapsed_seconds,
+            stats.texts_per_second,
+        )
+        return len(documents)
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """토큰 수 기준 배치로 나눠 동시에 임베딩한다. 결과 순서는 입력 순서를 따른다."""
+        return self.embedding_executor.embed(texts)
+
     def snapshot_document(self, document_id: str) -> VectorSnapshot:
         collection = self._collection()
         payload = collection.get(
@@ -96,6 +185,10 @@ class ReportEmbedder:
         if not snapshot.ids:
             return
 
+        if self.lexical_index is not None:
+            self.lexical_index.upsert_document(document_id, list(zip(snapshot.ids, snapshot.documents, strict=False)))
+        if self.metadata_index is not None:
+            self.metadata_index.upsert(snapshot.ids, snapshot.metadatas)
         collection = self._collection()
         if snapshot.embeddings is not None and len(snapshot.embeddings) == len(snapshot.ids):
             collection.upsert(
@@ -104,6 +197,7 @@ class ReportEmbedder:
                 metadatas=snapshot.metadatas,
                 embeddings=snapshot.embeddings,
             )
+            self._sync_two_stage(snapshot.ids, snapshot.documents, snapshot.metadatas, snapshot.embeddings)
             return
 
         documents = [
@@ -111,14 +205,44 @@ class ReportEmbedder:
             for content, metadata in zip(snapshot.documents, snapshot.metadatas, strict=False)
         ]
         self.vectorstore.add_documents(documents=documents, ids=snapshot.ids)
+        if self.two_stage_index is not None:
+            stored = collection.get(ids=snapshot.ids, include=["embeddings"])
+            vectors_by_id = dict(zip(stored.get("ids", []), stored.get("embeddings", []), strict=False))
+            self._sync_two_stage(
+                snapshot.ids,
+                snapshot.documents,
+                snapshot.metadatas,
+                [vectors_by_id[chunk_id] for chunk_id in snapshot.ids],
+            )
 
     def delete_document(self, document_id: str) -> None:
+        if self.lexical_index is not None:
+            self.lexical_index.delete_document(document_id)
+        if self.metadata_index is not None:
+            self.metadata_index.delete_document(document_id)
+        self._delete_two_stage({"document_id": document_id})
         # langchain_chroma 버전에 따라 delete 시그니처가 달라 fallback을 둔다.
         try:
             self.vectorstore.delete(where={"document_id": document_id})
         except TypeError:
             self.vectorstore._collection.delete(where={"document_id": document_id})  # type: ignore[attr-defined]
 
+    def delete_documents(self, document_ids: list[str]) -> None:
+        if not document_ids:
+            return
+        for document_id in document_ids:
+            if self.lexical_index is not None:
+                self.lexical_index.delete_document(document_id)
+            if self.metadata_index is not None:
+                self.metadata_index.delete_document(document_id)
+        self._delete_two_stage({"document_id": {"$in": list(document_ids)}})
+        self._collection().delete(where={"document_id": {"$in": list(document_ids)}})
+
+    def flush(self) -> None:
+        """메모리에 쌓인 역색인 변경분을 디스크 세그먼트로 병합한다."""
+        if self.lexical_index is not None and self.lexical_index.has_pending_changes:
+            self.lexical_index.save()
+
     def get_vectorstore(self) -> Chroma:
         return self.vectorstore
 
@@ -127,6 +251,100 @@ class ReportEmbedder:
             return self.vectorstore._collection  # type: ignore[attr-defined]
         raise RuntimeError("Unable to access underlying Chroma collection")
 
+    def _sync_hnsw_config(self, *, hnsw_m: int, hnsw_construction_ef: int, hnsw_search_ef: int) -> None:
+        """기존 컬렉션에 설정값을 맞춘다.
+
+        search_ef는 생성 후에도 변경할 수 있지만 M/construction_ef는 생성 시점에만 적용되므로 경고만 남긴다.
+        """
+        try:
+            collection = self._collection()
+            hnsw_config = dict((collection.configuration or {}).get("hnsw") or {})
+        except Exception:  # noqa: BLE001 - 구버전 Chroma는 configuration을 제공하지 않는다.
+            return
+
+        if hnsw_config.get("ef_search") not in (None, hnsw_search_ef):
+            try:
+                collection.modify(configuration={"hnsw": {"ef_search": hnsw_search_ef}})
+            except Exception as error:  # noqa: BLE001
+                logger.warning("Failed to update hnsw search_ef to %d: %s", hnsw_search_ef, error)
+
+        immutable = {
+            "M": (hnsw_config.get("max_neighbors"), hnsw_m),
+            "construction_ef": (hnsw_config.get("ef_construction"), hnsw_construction_ef),
+        }
+        for name, (current, requested) in immutable.items():
+            if current is not None and current != requested:
+                logger.warning(
+                    "Existing collection uses hnsw:%s=%s (requested %s). Rebuild the collection to apply it.",
+                    name,
+                    current,
+                    requested,
+                )
+
+    def _upsert_documents(self, documents: list[Document], *, vectors: list[list[float]] | None = None) -> None:
+        ids = self._build_chunk_ids(documents)
+        texts = [document.page_content for document in documents]
+        metadatas = [dict(document.metadata or {}) for document in documents]
+        if vectors is None:
+            vectors = self.embed_texts(texts)
+
+        collection = self._collection()
+        batch_size = self._max_upsert_batch_size()
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            collection.upsert(
+                ids=ids[start:end],
+                documents=texts[start:end],
+                metadatas=metadatas[start:end],
+                embeddings=vectors[start:end],
+            )
+        self._sync_two_stage(ids, texts, metadatas, vectors)
+
+    def _sync_two_stage(
+        self,
+        ids: list[str],
+        texts: list[str],
+        metadatas: list[dict[str, Any]],
+        vectors: Any,
+    ) -> None:
+        if self.two_stage_index is None:
+            return
+        try:
+            self.two_stage_index.upsert(ids=ids, documents=texts, metadatas=metadatas, embeddings=vectors)
+        except Exception as error:  # noqa: BLE001 - 검색 쪽이 건수 차이를 감지해 전체 벡터로 검색한다.
+            logger.warning("Two-stage index update failed chunks=%d: %s", len(ids), error)
+
+    def _delete_two_stage(self, where: dict[str, Any]) -> None:
+        if self.two_stage_index is None:
+            return
+        try:
+            self.two_stage_index.delete(where=where)
+        except Exception as error:  # noqa: BLE001 - 검색 쪽이 건수 차이를 감지해 전체 벡터로 검색한다.
+            logger.warning("Two-stage index delete failed where=%s: %s", where, error)
+
+    def _index_documents(self, documents: list[Document]) -> None:
+        ids = self._build_chunk_ids(documents)
+        if self.metadata_index is not None:
+            self.metadata_index.upsert(ids, [dict(document.metadata or {}) for document in documents])
+        if self.lexical_index is None:
+            return
+        chunks_by_document: dict[str, list[tuple[str, str]]] = {}
+        for chunk_id, document in zip(ids, documents, strict=True):
+            document_id = str((document.metadata or {}).get("document_id", "unknown_document"))
+            chunks_by_document.setdefault(document_id, []).append((chunk_id, document.page_content))
+        for document_id, chunks in chunks_by_document.items():
+            self.lexical_index.upsert_document(document_id, chunks)
+
+    def _max_upsert_batch_size(self) -> int:
+        client = getattr(self.vectorstore, "_client", None)
+        get_max_batch_size = getattr(client, "get_max_batch_size", None)
+        if get_max_batch_size is None:
+            return self.upsert_batch_size
+        try:
+            return max(1, min(self.upsert_batch_size, int(get_max_batch_size())))
+        except Exception:  # noqa: BLE001 - 서버 버전에 따라 미지원일 수 있다.
+            return self.upsert_batch_size
+
     @staticmethod
     def _build_chunk_ids(documents: list[Document]) -> list[str]:
         ids: list[str] = []
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_TOKENS = 8000
+DEFAULT_MAX_BATCH_SIZE = 100
+DEFAULT_MAX_CONCURRENCY = 4
+RATE_WINDOW_SECONDS = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    """임베딩 토큰 수를 보수적으로 추정한다.
+
+    한글은 UTF-8 3바이트가 대략 1토큰, 영문/숫자는 3~4바이트가 1토큰이므로 바이트 수 / 3을 사용한다.
+    """
+    return max(1, math.ceil(len(text.encode("utf-8")) / 3))
+
+
+@dataclass(frozen=True, slots=True)
+class EmbeddingBatchMetrics:
+    batch_index: int
+    size: int
+    tokens: int
+    latency_seconds: float
+
+
+@dataclass(slots=True)
+class EmbeddingRunStats:
+    """`EmbeddingExecutor.embed` 한 번의 실행 통계."""
+
+    total_texts: int = 0
+    total_tokens: int = 0
+    elapsed_seconds: float = 0.0
+    batches: list[EmbeddingBatchMetrics] = field(default_factory=list)
+
+    @property
+    def texts_per_second(self) -> float:
+        return self.total_texts / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.total_tokens / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    @property
+    def max_batch_latency_seconds(self) -> float:
+        return max((batch.latency_seconds for batch in self.batches), default=0.0)
+
+    @property
+    def mean_batch_latency_seconds(self) -> float:
+        if not self.batches:
+            return 0.0
+        return sum(batch.latency_seconds for batch in self.batches) / len(self.batches)
+
+
+class _RateWindow:
+    """최근 60초 동안의 요청 수/토큰 수를 제한하는 슬라이딩 윈도우."""
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: int | None,
+        tokens_per_minute: int | None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.requests_per_minute = requests_per_minute or None
+        self.tokens_per_minute = tokens_per_minute or None
+        self._clock = clock
+        self._sleep = sleep
+        self._events: deque[tuple[float, int]] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> None:
+        if self.requests_per_minute is None and self.tokens_per_minute is None:
+            return
+
+        while True:
+            with self._lock:
+                now = self._clock()
+                while self._events and now - self._events[0][0] >= RATE_WINDOW_SECONDS:
+                    self._events.popleft()
+
+                used_tokens = sum(item_tokens for _, item_tokens in self._events)
+                over_requests = self.requests_per_minute is not None and len(self._events) >= self.requests_per_minute
+                # 단일 배치가 분당 토큰 한도보다 큰 경우에도 빈 윈도우에서는 통과시켜 교착을 막는다.
+                over_tokens = (
+                    self.tokens_per_minute is not None
+                    and self._events
+                    and used_tokens + tokens > self.tokens_per_minute
+                )
+                if not over_requests and not over_tokens:
+                    self._events.append((now, tokens))
+                    return
+                wait_seconds = RATE_WINDOW_SECONDS - (now - self._events[0][0])
+
+            self._sleep(max(wait_seconds, 0.01))
+
+
+class EmbeddingExecutor:
+    """청크 텍스트를 토큰 수 기준 배치로 나눠 동시에 임베딩한다.
+
+    여러 배치를 스레드 풀에서 동시에 요청하되 분당 요청/토큰 한도를 지키고,
+    결과는 입력 순서대로 돌려주므로 호출자가 만든 청크 ID와 그대로 짝지을 수 있다.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        *,
+        max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        token_counter: Callable[[str], int] = estimate_tokens,
+    ):
+        self.embeddings = embeddings
+        self.max_batch_tokens = max(1, max_batch_tokens)
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.token_counter = token_counter
+        self._rate_window = _RateWindow(
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+        )
+        self.last_stats = EmbeddingRunStats()
+        self._totals_lock = threading.Lock()
+        self._total_batches = 0
+        self._total_texts = 0
+        self._total_tokens = 0
+        self._total_latency_seconds = 0.0
+
+    def plan_batches(self, texts: Sequence[str]) -> list[tuple[list[int], int]]:
+        """입력 인덱스 묶음과 추정 토큰 수 목록을 반환한다."""
+        batches: list[tuple[list[int], int]] = []
+        current: list[int] = []
+        current_tokens = 0
+        for index, text in enumerate(texts):
+            tokens = self.token_counter(text)
+            if current and (current_tokens + tokens > self.max_batch_tokens or len(current) >= self.max_batch_size):
+                batches.append((current, current_tokens))
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            batches.append((current, current_tokens))
+        return batches
+
+    def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        started = time.perf_counter()
+        batches = self.plan_batches(texts)
+        results: list[list[float] | None] = [None] * len(texts)
+        stats = EmbeddingRunStats(total_texts=len(texts))
+
+        def _run(batch_index: int, indices: list[int], tokens: int) -> EmbeddingBatchMetrics:
+            self._rate_window.acquire(tokens)
+            batch_started = time.perf_counter()
+            vectors = self.embeddings.embed_documents([texts[index] for index in indices])
+            latency = time.perf_counter() - batch_started
+            if len(vectors) != len(indices):
+                raise RuntimeError(f"Embedding count mismatch: expected {len(indices)}, got {len(vectors)}")
+            for index, vector in zip(indices, vectors, strict=True):
+                results[index] = list(vector)
+            return EmbeddingBatchMetrics(
+                batch_index=batch_index,
+                size=len(indices),
+                tokens=tokens,
+                latency_seconds=latency,
+            )
+
+        if len(batches) <= 1 or self.max_concurrency == 1:
+            metrics = [_run(batch_index, indices, tokens) for batch_index, (indices, tokens) in enumerate(batches)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                futures = [
+                    executor.submit(_run, batch_index, indices, tokens)
+                    for batch_index, (indices, tokens) in enumerate(batches)
+                ]
+                metrics = [future.result() for future in futures]
+
+        stats.batches = metrics
+        stats.total_tokens = sum(item.tokens for item in metrics)
+        stats.elapsed_seconds = time.perf_counter() - started
+        self.last_stats = stats
+        self._record_totals(stats)
+        if metrics:
+            logger.debug(
+                "Embedded texts=%d batches=%d tokens=%d elapsed=%.2fs throughput=%.1f texts/s",
+                stats.total_texts,
+                len(metrics),
+                stats.total_tokens,
+                stats.elapsed_seconds,
+                stats.texts_per_second,
+            )
+        return [vector for vector in results if vector is not None]
+
+    def metrics(self) -> dict[str, float]:
+        """프로세스 시작 이후 누적 지표."""
+        with self._totals_lock:
+            mean_latency = self._total_latency_seconds / self._total_batches if self._total_batches else 0.0
+            return {
+                "batches": float(self._total_batches),
+                "texts": float(self._total_texts),
+                "tokens": float(self._total_tokens),
+                "mean_batch_latency_seconds": mean_latency,
+            }
+
+    def _record_totals(self, stats: EmbeddingRunStats) -> None:
+        with self._totals_lock:
+            self._total_batches += len(stats.batches)
+            self._total_texts += stats.total_texts
+            self._total_tokens += stats.total_tokens
+            self._total_latency_seconds += sum(batch.latency_seconds for batch in stats.batches)
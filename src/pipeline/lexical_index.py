@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from collections.abc import Collection, Iterable, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+MAX_TERM_FREQUENCY = np.iinfo(np.uint16).max
+
+_TOKEN_RUN_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+(?:[.,][0-9]+)*")
+
+
+def tokenize(text: str) -> list[str]:
+    """한글은 음절 bigram, 영문/숫자는 단어 단위로 토큰화한다.
+
+    형태소 분석기 없이도 조사/어미가 붙은 한글 명사(`삼성전자의`, `목표주가를`)가 같은 bigram을 공유하게 되고,
+    종목코드·영문 약어·숫자(`005930`, `hbm`, `85,000`)는 통째로 일치시킨다.
+    """
+    normalized = unicodedata.normalize("NFKC", text).lower()
+    tokens: list[str] = []
+    for run in _TOKEN_RUN_PATTERN.findall(normalized):
+        if "가" <= run[0] <= "힣":
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[index : index + 2] for index in range(len(run) - 1))
+        else:
+            tokens.append(run.replace(",", ""))
+    return tokens
+
+
+class LexicalIndex:
+    """청크 단위 BM25 역색인.
+
+    디스크에는 버전별 세그먼트(term → (offset, df) 사전 + uint32 row / uint16 tf postings 배열 + 문서 길이 배열)를 두고
+    memory-map으로 읽는다. 문서 단위 갱신은 메모리 delta와 삭제 표시로 처리하고 `save()`에서 새 세그먼트로 병합한다.
+    """
+
+    def __init__(self, directory: str | Path, *, k1: float = DEFAULT_K1, b: float = DEFAULT_B):
+        self.directory = Path(directory)
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._version = 0
+        self._manifest_mtime: float | None = None
+        self._reset_base()
+        self._reset_delta()
+        self._load()
+
+    # ------------------------------------------------------------------ 갱신
+
+    def upsert_document(self, document_id: str, chunks: Sequence[tuple[str, str]]) -> None:
+        """문서의 기존 청크를 삭제 표시하고 새 청크를 delta에 추가한다. chunks는 (chunk_id, text) 목록이다."""
+        with self._lock:
+            self._delete_rows(document_id)
+            for chunk_id, text in chunks:
+                row = self._base_count + len(self._delta_chunk_ids)
+                counts = Counter(tokenize(text))
+                self._delta_chunk_ids.append(chunk_id)
+                self._delta_document_ids.append(document_id)
+                self._delta_lengths.append(sum(counts.values()))
+                for term, frequency in counts.items():
+                    self._delta_postings.setdefault(term, []).append((row, min(frequency, MAX_TERM_FREQUENCY)))
+                self._rows_by_document.setdefault(document_id, []).append(row)
+            self._invalidate_stats()
+
+    def delete_document(self, document_id: str) -> None:
+        with self._lock:
+            self._delete_rows(document_id)
+            self._invalidate_stats()
+
+    def clear(self) -> None:
+        """모든 청크를 삭제 표시한다. 다음 `save()`에서 빈 세그먼트로 병합된다."""
+        with self._lock:
+            for document_id in list(self._rows_by_document):
+                self._delete_rows(document_id)
+            self._invalidate_stats()
+
+    @property
+    def has_pending_changes(self) -> bool:
+        with self._lock:
+            return bool(self._delta_chunk_ids or self._deleted_rows)
+
+    def save(self) -> None:
+        """base와 delta를 병합해 새 버전 세그먼트를 기록한다. 삭제된 청크는 이때 제거된다."""
+        with self._lock:
+            chunk_ids, document_ids, lengths, postings = self._merged_segment()
+            version = self._version + 1
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            terms: dict[str, list[int]] = {}
+            row_parts: list[np.ndarray] = []
+            tf_parts: list[np.ndarray] = []
+            offset = 0
+            for term in sorted(postings):
+                entries = postings[term]
+                rows = np.fromiter((row for row, _ in entries), dtype=np.uint32, count=len(entries))
+                tfs = np.fromiter((tf for _, tf in entries), dtype=np.uint16, count=len(entries))
+                terms[term] = [offset, len(entries)]
+                row_parts.append(rows)
+                tf_parts.append(tfs)
+                offset += len(entries)
+
+            self._write_array(f"postings_rows.{version}.u32", _concat(row_parts, np.uint32))
+            self._write_array(f"postings_tfs.{version}.u16", _concat(tf_parts, np.uint16))
+            self._write_array(f"doc_lengths.{version}.u32", np.asarray(lengths, dtype=np.uint32))
+            manifest = {
+                "version": version,
+                "num_chunks": len(chunk_ids),
+                "num_postings": offset,
+                "chunk_ids": chunk_ids,
+                "document_ids": document_ids,
+                "terms": terms,
+            }
+            manifest_tmp = self.directory / f"{MANIFEST_FILE}.tmp"
+            manifest_tmp.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+            os.replace(manifest_tmp, self.directory / MANIFEST_FILE)
+            self._remove_old_segments(keep_version=version)
+            self._load()
+            logger.info("Saved lexical index version=%d chunks=%d terms=%d", version, len(chunk_ids), len(terms))
+
+    def refresh_if_changed(self) -> bool:
+        """다른 프로세스(배치 파이프라인)가 새 세그먼트를 기록했으면 다시 연다."""
+        manifest_path = self.directory / MANIFEST_FILE
+        if not manifest_path.exists():
+            return False
+        mtime = manifest_path.stat().st_mtime
+        with self._lock:
+            if self._manifest_mtime == mtime:
+                return False
+            if self._delta_chunk_ids or self._deleted_rows:
+                logger.warning("Lexical index has unsaved changes. Skipped reloading the newer segment.")
+                return False
+            self._load()
+            return True
+
+    # ------------------------------------------------------------------ 검색
+
+    def search(
+        self,
+        query: str,
+        k: int = 20,
+        *,
+        allowed_ids: Collection[str] | None = None,
+    ) -> list[tuple[str, float]]:
+        """BM25 상위 k개 (chunk_id, 점수). `allowed_ids`가 있으면 그 청크 안에서만 순위를 매긴다."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            total_rows = self._base_count + len(self._delta_chunk_ids)
+            if total_rows == 0:
+                return []
+            live_count, norms = self._length_norms()
+            scores = np.zeros(total_rows, dtype=np.float32)
+            for term in terms:
+                rows, tfs = self._postings(term)
+                if rows.size == 0:
+                    continue
+                df = rows.size
+                idf = math.log(1.0 + (live_count - df + 0.5) / (df + 0.5))
+                tf_values = tfs.astype(np.float32)
+                scores[rows] += idf * tf_values * (self.k1 + 1.0) / (tf_values + norms[rows])
+
+            if self._deleted_rows:
+                scores[list(self._deleted_rows)] = 0.0
+            candidates = np.flatnonzero(scores > 0)
+            if allowed_ids is not None:
+                allowed = allowed_ids if isinstance(allowed_ids, set | frozenset) else set(allowed_ids)
+                candidates = np.fromiter(
+                    (row for row in candidates.tolist() if self._chunk_id(row) in allowed),
+                    dtype=np.int64,
+                )
+            if candidates.size == 0:
+                return []
+            if candidates.size > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            ordered = candidates[np.argsort(-scores[candidates])]
+            return [(self._chunk_id(int(row)), float(scores[row])) for row in ordered]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._base_count + len(self._delta_chunk_ids) - len(self._deleted_rows)
+
+    # ------------------------------------------------------------------ 내부 구현
+
+    def _reset_base(self) -> None:
+        self._base_count = 0
+        self._base_chunk_ids: list[str] = []
+        self._base_document_ids: list[str] = []
+        self._terms: dict[str, list[int]] = {}
+        self._base_rows: np.ndarray = np.empty(0, dtype=np.uint32)
+        self._base_tfs: np.ndarray = np.empty(0, dtype=np.uint16)
+        self._base_lengths: np.ndarray = np.empty(0, dtype=np.uint32)
+
+    def _reset_delta(self) -> None:
+        self._delta_chunk_ids: list[str] = []
+        self._delta_document_ids: list[str] = []
+        self._delta_lengths: list[int] = []
+        self._delta_postings: dict[str, list[tuple[int, int]]] = {}
+        self._deleted_rows: set[int] = set()
+        self._rows_by_document: dict[str, list[int]] = {}
+        self._norm_cache: tuple[int, np.ndarray] | None = None
+
+    def _load(self) -> None:
+        manifest_path = self.directory / MANIFEST_FILE
+        self._reset_base()
+        self._reset_delta()
+        if not manifest_path.exists():
+            self._version = 0
+            self._manifest_mtime = None
+            return
+
+        self._manifest_mtime = manifest_path.stat().st_mtime
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        version = int(manifest["version"])
+        self._version = version
+        self._base_count = int(manifest["num_chunks"])
+        self._base_chunk_ids = list(manifest["chunk_ids"])
+        self._base_document_ids = list(manifest["document_ids"])
+        self._terms = dict(manifest["terms"])
+        num_postings = int(manifest["num_postings"])
+        self._base_rows = self._open_array(f"postings_rows.{version}.u32", np.uint32, num_postings)
+        self._base_tfs = self._open_array(f"postings_tfs.{version}.u16", np.uint16, num_postings)
+        self._base_lengths = self._open_array(f"doc_lengths.{version}.u32", np.uint32, self._base_count)
+        for row, document_id in enumerate(self._base_document_ids):
+            self._rows_by_document.setdefault(document_id, []).append(row)
+
+    def _open_array(self, name: str, dtype: Any, count: int) -> np.ndarray:
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self.directory / name, dtype=dtype, mode="r", shape=(count,))
+
+    def _write_array(self, name: str, values: np.ndarray) -> None:
+        temp_path = self.directory / f"{name}.tmp"
+        values.tofile(temp_path)
+        os.replace(temp_path, self.directory / name)
+
+    def _remove_old_segments(self, *, keep_version: int) -> None:
+        suffix = f".{keep_version}."
+        for path in self.directory.iterdir():
+            if path.name.startswith(("postings_rows.", "postings_tfs.", "doc_lengths.")) and suffix not in path.name:
+                # 다른 프로세스가 이전 버전을 memmap 중이어도 unlink된 파일 매핑은 유지된다.
+                path.unlink(missing_ok=True)
+
+    def _delete_rows(self, document_id: str) -> None:
+        for row in self._rows_by_document.pop(document_id, []):
+            self._deleted_rows.add(row)
+
+    def _invalidate_stats(self) -> None:
+        self._norm_cache = None
+
+    def _postings(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        base = self._terms.get(term)
+        delta = self._delta_postings.get(term)
+        if base is None and not delta:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint16)
+
+        row_parts: list[np.ndarray] = []
+        tf_parts: list[np.ndarray] = []
+        if base is not None:
+            offset, df = base
+            row_parts.append(np.asarray(self._base_rows[offset : offset + df], dtype=np.int64))
+            tf_parts.append(np.asarray(self._base_tfs[offset : offset + df]))
+        if delta:
+            row_parts.append(np.fromiter((row for row, _ in delta), dtype=np.int64, count=len(delta)))
+            tf_parts.append(np.fromiter((tf for _, tf in delta), dtype=np.uint16, count=len(delta)))
+        return np.concatenate(row_parts), np.concatenate(tf_parts)
+
+    def _length_norms(self) -> tuple[int, np.ndarray]:
+        if self._norm_cache is None:
+            lengths = np.concatenate(
+                [np.asarray(self._base_lengths, dtype=np.float32), np.asarray(self._delta_lengths, dtype=np.float32)]
+            )
+            live_mask = np.ones(lengths.size, dtype=bool)
+            if self._deleted_rows:
+                live_mask[list(self._deleted_rows)] = False
+            live_count = int(live_mask.sum())
+            average = float(lengths[live_mask].mean()) if live_count else 1.0
+            norms = self.k1 * (1.0 - self.b + self.b * lengths / max(average, 1.0))
+            self._norm_cache = (live_count, norms)
+        return self._norm_cache
+
+    def _chunk_id(self, row: int) -> str:
+        if row < self._base_count:
+            return self._base_chunk_ids[row]
+        return self._delta_chunk_ids[row - self._base_count]
+
+    def _merged_segment(self) -> tuple[list[str], list[str], list[int], dict[str, list[tuple[int, int]]]]:
+        total_rows = self._base_count + len(self._delta_chunk_ids)
+        remap: dict[int, int] = {}
+        chunk_ids: list[str] = []
+        document_ids: list[str] = []
+        lengths: list[int] = []
+        for row in range(total_rows):
+            if row in self._deleted_rows:
+                continue
+            remap[row] = len(chunk_ids)
+            chunk_ids.append(self._chunk_id(row))
+            if row < self._base_count:
+                document_ids.append(self._base_document_ids[row])
+                lengths.append(int(self._base_lengths[row]))
+            else:
+                document_ids.append(self._delta_document_ids[row - self._base_count])
+                lengths.append(self._delta_lengths[row - self._base_count])
+
+        postings: dict[str, list[tuple[int, int]]] = {}
+        for term in set(self._terms) | set(self._delta_postings):
+            rows, tfs = self._postings(term)
+            entries = [
+                (remap[int(row)], int(tf)) for row, tf in zip(rows.tolist(), tfs.tolist(), strict=True) if row in remap
+            ]
+            if entries:
+                postings[term] = entries
+        return chunk_ids, document_ids, lengths, postings
+
+
+def _concat(parts: Iterable[np.ndarray], dtype: Any) -> np.ndarray:
+    arrays = list(parts)
+    if not arrays:
+        return np.empty(0, dtype=dtype)
+    return np.concatenate(arrays).astype(dtype, copy=False)
+
+
+def build_lexical_index(collection: Any, directory: str | Path, *, page_size: int = 1000) -> LexicalIndex:
+    """Chroma 컬렉션 전체를 읽어 역색인을 새로 만든다. 기존 컬렉션에 처음 적용하거나 복구할 때 사용한다."""
+    index = LexicalIndex(directory)
+    index.clear()
+
+    chunks_by_document: dict[str, list[tuple[str, str]]] = {}
+    offset = 0
+    while True:
+        payload = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+        ids = [str(item) for item in payload.get("ids", [])]
+        if not ids:
+            break
+        for chunk_id, content, metadata in zip(
+            ids, payload.get("documents", []), payload.get("metadatas", []), strict=False
+        ):
+            document_id = str((metadata or {}).get("document_id", "unknown_document"))
+            chunks_by_document.setdefault(document_id, []).append((chunk_id, str(content or "")))
+        offset += len(ids)
+
+    for document_id, chunks in chunks_by_document.items():
+        index.upsert_document(document_id, chunks)
+    index.save()
+    return index
@@ -38,6 +38,14 @@ REPORT_TYPE_KEYWORDS: list[tuple[list[str], str]] = [
 ]
 
 
+def date_to_int(value: str | None) -> int | None:
+    """`YYYY-MM-DD` 날짜를 범위 필터용 정수(YYYYMMDD)로 바꾼다."""
+    match = re.fullmatch(r"(\d{4})-(\d{2})-(\d{2})", value or "")
+    if not match:
+        return None
+    return int("".join(match.groups()))
+
+
 class MetadataExtractor:
     """증권사 리포트 메타데이터 추출기."""
 
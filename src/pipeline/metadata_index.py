@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CATEGORICAL_FIELDS = ("ticker", "broker", "rating", "report_type", "chunk_type", "document_id")
+NUMERIC_FIELDS = ("date_int", "target_price")
+MISSING_CODE = -1
+MISSING_NUMBER = np.iinfo(np.int64).min
+DEFAULT_REFRESH_INTERVAL_SECONDS = 300.0
+READ_PAGE_SIZE = 1000
+
+_NUMERIC_OPERATORS: dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    "$eq": lambda column, value: column == value,
+    "$ne": lambda column, value: column != value,
+    "$gt": lambda column, value: column > value,
+    "$gte": lambda column, value: column >= value,
+    "$lt": lambda column, value: column < value,
+    "$lte": lambda column, value: column <= value,
+}
+
+
+class MetadataIndex:
+    """청크 메타데이터를 열 단위 numpy 배열로 보관하는 사전 필터 인덱스.
+
+    문자열 필드는 사전 코드(int32), 날짜/목표주가는 int64 열로 저장하고, where 식을 행 bitmap(bool 배열)의
+    AND/OR로 풀어 후보 청크 ID 집합을 만든다. 해석할 수 없는 조건이 있으면 None을 반환해 호출자가 ANN 검색을 쓰게 한다.
+    """
+
+    def __init__(
+        self,
+        *,
+        collection: Any | None = None,
+        refresh_interval_seconds: float = DEFAULT_REFRESH_INTERVAL_SECONDS,
+        initial_capacity: int = 1024,
+    ):
+        self.collection = collection
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._lock = threading.RLock()
+        self._refreshing = False
+        self._refreshed_at = 0.0
+        self._reset(initial_capacity)
+
+    @classmethod
+    def from_collection(cls, collection: Any, **kwargs: Any) -> MetadataIndex:
+        index = cls(collection=collection, **kwargs)
+        index.refresh()
+        return index
+
+    # ------------------------------------------------------------------ 갱신
+
+    def refresh(self) -> int:
+        """컬렉션 전체 메타데이터를 다시 읽어 인덱스를 교체한다."""
+        if self.collection is None:
+            return len(self)
+        started = time.perf_counter()
+        rebuilt = MetadataIndex(refresh_interval_seconds=self.refresh_interval_seconds)
+        offset = 0
+        while True:
+            payload = self.collection.get(include=["metadatas"], limit=READ_PAGE_SIZE, offset=offset)
+            ids = [str(item) for item in payload.get("ids", [])]
+            if not ids:
+                break
+            rebuilt.upsert(ids, [dict(item or {}) for item in payload.get("metadatas", [])])
+            offset += len(ids)
+
+        with self._lock:
+            self._adopt(rebuilt)
+            self._refreshed_at = time.monotonic()
+        logger.info("Refreshed metadata index chunks=%d elapsed=%.2fs", len(self), time.perf_counter() - started)
+        return len(self)
+
+    def maybe_refresh(self) -> None:
+        """갱신 주기가 지났으면 백그라운드 스레드에서 다시 읽는다. 다른 프로세스(배치 파이프라인)의 적재를 반영한다."""
+        if self.collection is None or self.refresh_interval_seconds <= 0:
+            return
+        with self._lock:
+            if self._refreshing or time.monotonic() - self._refreshed_at < self.refresh_interval_seconds:
+                return
+            self._refreshing = True
+
+        def _run() -> None:
+            try:
+                self.refresh()
+            except Exception as error:  # noqa: BLE001 - 갱신 실패 시 기존 인덱스를 유지한다.
+                logger.warning("Metadata index refresh failed: %s", error)
+                with self._lock:
+                    self._refreshed_at = time.monotonic()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="metadata-index-refresh", daemon=True).start()
+
+    def is_stale(self) -> bool:
+        """마지막 갱신 후 갱신 주기가 지났는지. 그동안 다른 프로세스가 적재한 청크가 빠져 있을 수 있다."""
+        if self.collection is None or self.refresh_interval_seconds <= 0:
+            return False
+        with self._lock:
+            return time.monotonic() - self._refreshed_at >= self.refresh_interval_seconds
+
+    def upsert(self, ids: Sequence[str], metadatas: Sequence[dict[str, Any]]) -> None:
+        with self._lock:
+            for chunk_id, metadata in zip(ids, metadatas, strict=True):
+                row = self._row_by_id.get(chunk_id)
+                if row is None:
+                    row = self._append_row(chunk_id)
+                else:
+                    self._remove_from_document(row)
+                self._write_row(row, metadata)
+
+    def delete_document(self, document_id: str) -> None:
+        with self._lock:
+            for row in self._rows_by_document.pop(document_id, set()):
+                self._kill_row(row)
+
+    # ------------------------------------------------------------------ 조회
+
+    def candidate_ids(self, where: dict[str, Any]) -> list[str] | None:
+        with self._lock:
+            mask = self._mask(where)
+            if mask is None:
+                return None
+            rows = np.flatnonzero(mask & self._alive[: self._size])
+            return [self._ids[int(row)] for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._alive[: self._size].sum())
+
+    # ------------------------------------------------------------------ 내부 구현
+
+    def _reset(self, capacity: int) -> None:
+        self._ids: list[str] = []
+        self._row_by_id: dict[str, int] = {}
+        self._rows_by_document: dict[str, set[int]] = {}
+        self._size = 0
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._codes = {name: np.full(capacity, MISSING_CODE, dtype=np.int32) for name in CATEGORICAL_FIELDS}
+        self._vocab: dict[str, dict[str, int]] = {name: {} for name in CATEGORICAL_FIELDS}
+        self._labels: dict[str, list[str]] = {name: [] for name in CATEGORICAL_FIELDS}
+        self._numbers = {name: np.full(capacity, MISSING_NUMBER, dtype=np.int64) for name in NUMERIC_FIELDS}
+
+    def _adopt(self, other: MetadataIndex) -> None:
+        self._ids = other._ids
+        self._row_by_id = other._row_by_id
+        self._rows_by_document = other._rows_by_document
+        self._size = other._size
+        self._alive = other._alive
+        self._codes = other._codes
+        self._vocab = other._vocab
+        self._labels = other._labels
+        self._numbers = other._numbers
+
+    def _append_row(self, chunk_id: str) -> int:
+        if self._size == self._alive.size:
+            self._grow(max(1024, self._alive.size * 2))
+        row = self._size
+        self._size += 1
+        self._ids.append(chunk_id)
+        self._row_by_id[chunk_id] = row
+        return row
+
+    def _grow(self, capacity: int) -> None:
+        def _extend(array: np.ndarray, fill: Any) -> np.ndarray:
+            grown = np.full(capacity, fill, dtype=array.dtype)
+            grown[: array.size] = array
+            return grown
+
+        self._alive = _extend(self._alive, False)
+        self._codes = {name: _extend(column, MISSING_CODE) for name, column in self._codes.items()}
+        self._numbers = {name: _extend(column, MISSING_NUMBER) for name, column in self._numbers.items()}
+
+    def _write_row(self, row: int, metadata: dict[str, Any]) -> None:
+        self._alive[row] = True
+        for name in CATEGORICAL_FIELDS:
+            value = metadata.get(name)
+            if value is None:
+                self._codes[name][row] = MISSING_CODE
+                continue
+            label = str(value)
+            code = self._vocab[name].get(label)
+            if code is None:
+                code = len(self._labels[name])
+                self._vocab[name][label] = code
+                self._labels[name].append(label)
+            self._codes[name][row] = code
+        for name in NUMERIC_FIELDS:
+            value = metadata.get(name)
+            self._numbers[name][row] = int(value) if isinstance(value, int | float) else MISSING_NUMBER
+        document_id = metadata.get("document_id")
+        if document_id is not None:
+            self._rows_by_document.setdefault(str(document_id), set()).add(row)
+
+    def _remove_from_document(self, row: int) -> None:
+        code = int(self._codes["document_id"][row])
+        if code != MISSING_CODE:
+            self._rows_by_document.get(self._labels["document_id"][code], set()).discard(row)
+
+    def _kill_row(self, row: int) -> None:
+        self._alive[row] = False
+        self._row_by_id.pop(self._ids[row], None)
+
+    def _mask(self, where: dict[str, Any]) -> np.ndarray | None:
+        if len(where) != 1:
+            # 여러 키를 가진 평면 dict는 Chroma 규칙상 `$and`와 같게 취급한다.
+            return self._mask({"$and": [{key: value} for key, value in where.items()]}) if where else None
+
+        key, condition = next(iter(where.items()))
+        if key in {"$and", "$or"}:
+            masks = [self._mask(clause) for clause in condition]
+            if not masks or any(mask is None for mask in masks):
+                return None
+            combine = np.logical_and if key == "$and" else np.logical_or
+            return combine.reduce(masks)
+
+        if isinstance(condition, dict):
+            if len(condition) != 1:
+                return None
+            operator, value = next(iter(condition.items()))
+        else:
+            operator, value = "$eq", condition
+
+        if key in self._codes:
+            return self._categorical_mask(key, operator, value)
+        if key in self._numbers:
+            return self._numeric_mask(key, operator, value)
+        return None
+
+    def _categorical_mask(self, name: str, operator: str, value: Any) -> np.ndarray | None:
+        column = self._codes[name][: self._size]
+        vocab = self._vocab[name]
+        if operator in {"$eq", "$ne"} and isinstance(value, str):
+            mask = column == vocab.get(value, -2)
+            return mask if operator == "$eq" else ~mask & (column != MISSING_CODE)
+        if operator in {"$in", "$nin"} and isinstance(value, list) and all(isinstance(item, str) for item in value):
+            codes = [vocab[item] for item in value if item in vocab]
+            mask = np.isin(column, codes)
+            return mask if operator == "$in" else ~mask & (column != MISSING_CODE)
+        return None
+
+    def _numeric_mask(self, name: str, operator: str, value: Any) -> np.ndarray | None:
+        column = self._numbers[name][: self._size]
+        present = column != MISSING_NUMBER
+        if operator in _NUMERIC_OPERATORS and isinstance(value, int | float) and not isinstance(value, bool):
+            return present & _NUMERIC_OPERATORS[operator](column, value)
+        if operator in {"$in", "$nin"} and isinstance(value, list) and all(isinstance(item, int) for item in value):
+            mask = np.isin(column, value)
+            return present & (mask if operator == "$in" else ~mask)
+        return None
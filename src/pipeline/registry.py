@@ -3,6 +3,8 @@ from __future__ import annotations
 import copy
 import hashlib
 import json
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
@@ -42,8 +44,11 @@ class MetadataRegistry:
 
     def __init__(self, path: str | Path = "data/metadata.json"):
         self.path = Path(path)
+        self._deferred: dict[str, Any] | None = None
 
     def load(self) -> dict[str, Any]:
+        if self._deferred is not None:
+            return self._deferred
         if not self.path.exists():
             return self._empty_registry()
 
@@ -52,6 +57,34 @@ class MetadataRegistry:
         return data
 
     def save(self, data: dict[str, Any]) -> None:
+        if self._deferred is not None:
+            self._deferred = data
+            return
+        self._write(data)
+
+    @contextmanager
+    def deferred_save(self) -> Iterator[None]:
+        """블록 안의 변경을 메모리에서 누적하고 종료 시 한 번만 파일에 기록한다.
+
+        대량 적재 시 문서 단계마다 전체 JSON을 다시 읽고 쓰는 비용을 없애기 위해 사용한다.
+        """
+        if self._deferred is not None:
+            yield
+            return
+
+        self._deferred = self.load()
+        try:
+            yield
+        finally:
+            data, self._deferred = self._deferred, None
+            self._write(data)
+
+    def flush(self) -> None:
+        """`deferred_save` 블록 안에서 지금까지의 변경을 중간 저장한다."""
+        if self._deferred is not None:
+            self._write(self._deferred)
+
+    def _write(self, data: dict[str, Any]) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
         data["last_updated"] = now_iso8601()
         self.path.write_text(
@@ -105,12 +138,27 @@ class MetadataRegistry:
         document = data["documents"].setdefault(document_id, {})
         document["status"] = "indexed"
         document["indexed_file_hash"] = file_hash
+        # 재색인될 때마다 올려 이전 청크로 만든 답변 캐시 항목을 무효화한다.
+        document["index_generation"] = int(document.get("index_generation", 0)) + 1
         document.pop("reprocess_reason", None)
         document.pop("last_error", None)
         if vector_count is not None:
             document["vector_count"] = vector_count
         self.save(data)
 
+    def index_generations(self) -> dict[str, int]:
+        data = self.load()
+        return {
+            document_id: int(document.get("index_generation", 0))
+            for document_id, document in data.get("documents", {}).items()
+        }
+
+    def company_names(self) -> set[str]:
+        data = self.load()
+        documents = data.get("documents", {}).values()
+        names = ((document.get("metadata") or {}).get("company_name") for document in documents)
+        return {str(name) for name in names if name}
+
     def update_status(self, document_id: str, status: PipelineStatus) -> None:
         data = self.load()
         document = data["documents"].setdefault(document_id, {})
@@ -6,16 +6,22 @@ from collections.abc import Iterable
 from dataclasses import dataclass
 from pathlib import Path
 
+from langchain_core.documents import Document
+
 from src.config import Settings, get_settings
 from src.models import ParseResult, PipelineResult
 from src.pipeline.chunker import ReportChunker
-from src.pipeline.embedder import ReportEmbedder
+from src.pipeline.embedder import ReportEmbedder, VectorSnapshot
+from src.pipeline.lexical_index import LexicalIndex
 from src.pipeline.metadata import MetadataExtractor
 from src.pipeline.parser import DocumentParser
 from src.pipeline.registry import DocumentProcessingPlan, MetadataRegistry, compute_file_hash
+from src.pipeline.two_stage import TwoStageVectorStore
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BULK_CHUNK_BATCH_SIZE = 2000
+
 
 @dataclass(slots=True)
 class _ProcessContext:
@@ -23,6 +29,14 @@ class _ProcessContext:
     file_hash: str
     reprocess_reason: str
     registry_snapshot: dict | None
+    current_stage: str = "parsing"
+
+
+@dataclass(slots=True)
+class _StagedDocument:
+    pdf_path: Path
+    process: _ProcessContext
+    documents: list[Document]
 
 
 class PipelineRunner:
@@ -37,6 +51,7 @@ class PipelineRunner:
         embedder: ReportEmbedder,
         registry: MetadataRegistry,
         parsed_dir: str | Path = "data/parsed",
+        bulk_chunk_batch_size: int = DEFAULT_BULK_CHUNK_BATCH_SIZE,
     ):
         self.parser = parser
         self.metadata_extractor = metadata_extractor
@@ -45,9 +60,13 @@ class PipelineRunner:
         self.registry = registry
         self.parsed_dir = Path(parsed_dir)
         self.parsed_dir.mkdir(parents=True, exist_ok=True)
+        self.bulk_chunk_batch_size = max(1, bulk_chunk_batch_size)
 
-    def run(self, pdf_paths: Iterable[str | Path] | None = None) -> PipelineResult:
+    def run(self, pdf_paths: Iterable[str | Path] | None = None, *, bulk: bool = False) -> PipelineResult:
         plans = self._build_plans(pdf_paths=pdf_paths)
+        if bulk:
+            return self._run_bulk(plans)
+
         success_count = 0
         failures: list[dict[str, str]] = []
 
@@ -64,6 +83,7 @@ class PipelineRunner:
                 logger.exception("Pipeline failed for %s (%s)", pdf_path.name, plan.reason)
                 failures.append({"file": pdf_path.name, "error": str(error)})
 
+        self.embedder.flush()
         return PipelineResult(
             total=len(plans),
             success_count=success_count,
@@ -71,6 +91,102 @@ class PipelineRunner:
             failed_files=failures,
         )
 
+    def _run_bulk(self, plans: list[DocumentProcessingPlan]) -> PipelineResult:
+        """초기 적재용 대량 모드.
+
+        레지스트리에 없는 신규 문서는 snapshot/delete 없이 청크를 모아 대용량 배치로 임베딩/upsert하고,
+        레지스트리 저장은 배치 flush 단위로만 수행한다. 기존 문서는 일반 경로로 처리한다.
+        """
+        success_count = 0
+        failures: list[dict[str, str]] = []
+        pending: list[_StagedDocument] = []
+        pending_chunks = 0
+
+        with self.registry.deferred_save():
+            for plan in plans:
+                pdf_path = plan.pdf_path
+                if not pdf_path.exists():
+                    failures.append({"file": str(pdf_path), "error": "File does not exist"})
+                    continue
+
+                try:
+                    process = self._prepare_process_context(plan)
+                    if process.registry_snapshot is not None:
+                        self._process_one(plan)
+                        success_count += 1
+                        continue
+
+                    staged = self._stage_document(plan, process)
+                except Exception as error:  # noqa: BLE001 - 배치 파이프라인은 개별 실패를 수집한다.
+                    logger.exception("Pipeline failed for %s (%s)", pdf_path.name, plan.reason)
+                    failures.append({"file": pdf_path.name, "error": str(error)})
+                    continue
+
+                pending.append(staged)
+                pending_chunks += len(staged.documents)
+                if pending_chunks >= self.bulk_chunk_batch_size:
+                    success_count += self._flush_bulk(pending, failures)
+                    pending, pending_chunks = [], 0
+
+            if pending:
+                success_count += self._flush_bulk(pending, failures)
+            self.embedder.flush()
+
+        return PipelineResult(
+            total=len(plans),
+            success_count=success_count,
+            failed_count=len(failures),
+            failed_files=failures,
+        )
+
+    def _stage_document(self, plan: DocumentProcessingPlan, process: _ProcessContext) -> _StagedDocument:
+        self.registry.register_source_file(
+            plan.pdf_path,
+            file_hash=process.file_hash,
+            reprocess_reason=process.reprocess_reason,
+        )
+        try:
+            documents = self._parse_and_chunk(plan.pdf_path, process)
+        except Exception as error:  # noqa: BLE001
+            self._handle_failure(process, error, vector_snapshot=None)
+            raise
+        return _StagedDocument(pdf_path=plan.pdf_path, process=process, documents=documents)
+
+    def _flush_bulk(self, staged: list[_StagedDocument], failures: list[dict[str, str]]) -> int:
+        documents = [document for item in staged for document in item.documents]
+        for item in staged:
+            item.process.current_stage = "indexing"
+            self.registry.update_status(item.process.document_id, "indexing")
+
+        try:
+            self.embedder.bulk_upsert(documents)
+        except Exception as error:  # noqa: BLE001 - 배치 단위 실패는 포함된 문서 모두의 실패로 기록한다.
+            logger.exception("Bulk indexing failed for %d documents (%d chunks)", len(staged), len(documents))
+            # 일부 배치만 upsert된 상태일 수 있으므로 이번 flush에 포함된 문서 벡터를 모두 정리한다.
+            self.embedder.delete_documents([item.process.document_id for item in staged])
+            for item in staged:
+                self._handle_failure(item.process, error, vector_snapshot=None)
+                failures.append({"file": item.pdf_path.name, "error": str(error)})
+            self.registry.flush()
+            return 0
+
+        for item in staged:
+            self.registry.append_history(
+                item.process.document_id,
+                stage="indexed",
+                success=True,
+                vector_count=len(item.documents),
+            )
+            self.registry.mark_indexed(
+                item.process.document_id,
+                file_hash=item.process.file_hash,
+                vector_count=len(item.documents),
+            )
+        self.embedder.flush()
+        self.registry.flush()
+        logger.info("Bulk indexed documents=%d chunks=%d", len(staged), len(documents))
+        return len(staged)
+
     def _process_one(self, plan: DocumentProcessingPlan) -> None:
         pdf_path = plan.pdf_path
         process = self._prepare_process_context(plan)
@@ -79,30 +195,12 @@ class PipelineRunner:
             file_hash=process.file_hash,
             reprocess_reason=process.reprocess_reason,
         )
-        current_stage = "parsing"
         vector_snapshot = None
 
         try:
-            self.registry.update_status(document_id, "parsing")
-            parse_result = self._load_or_parse(pdf_path=pdf_path, document_id=document_id)
-            self.registry.append_history(document_id, stage="parsed", success=True)
-            self.registry.update_status(document_id, "parsed")
-
-            metadata = self.metadata_extractor.extract(parse_result.content, pdf_path.name)
-            self.registry.set_report_metadata(document_id, metadata)
+            documents = self._parse_and_chunk(pdf_path, process)
 
-            current_stage = "chunking"
-            self.registry.update_status(document_id, "chunking")
-            documents = self.chunker.chunk(parse_result.content, metadata)
-            self.registry.append_history(
-                document_id,
-                stage="chunked",
-                success=True,
-                chunk_count=len(documents),
-            )
-            self.registry.update_status(document_id, "chunked")
-
-            current_stage = "indexing"
+            process.current_stage = "indexing"
             self.registry.update_status(document_id, "indexing")
             vector_snapshot = self.embedder.snapshot_document(document_id)
             vector_count = self.embedder.replace_document(document_id=document_id, documents=documents)
@@ -114,28 +212,61 @@ class PipelineRunner:
             )
             self.registry.mark_indexed(document_id, file_hash=process.file_hash, vector_count=vector_count)
         except Exception as error:  # noqa: BLE001
-            if current_stage == "indexing" and vector_snapshot is not None:
-                self.embedder.restore_snapshot(document_id=document_id, snapshot=vector_snapshot)
-            if current_stage == "parsing":
-                self._cleanup_parsing_cache(document_id)
-
-            if process.registry_snapshot and process.registry_snapshot.get("status") == "indexed":
-                self.registry.rollback_document(
-                    document_id,
-                    snapshot=process.registry_snapshot,
-                    stage=current_stage,
-                    error_message=str(error),
-                )
-            else:
-                self.registry.mark_failed(
-                    document_id,
-                    stage=current_stage,
-                    error_message=str(error),
-                    rolled_back=False,
-                )
-
+            self._handle_failure(process, error, vector_snapshot=vector_snapshot)
             raise
 
+    def _parse_and_chunk(self, pdf_path: Path, process: _ProcessContext) -> list[Document]:
+        document_id = process.document_id
+        process.current_stage = "parsing"
+        self.registry.update_status(document_id, "parsing")
+        parse_result = self._load_or_parse(pdf_path=pdf_path, document_id=document_id)
+        self.registry.append_history(document_id, stage="parsed", success=True)
+        self.registry.update_status(document_id, "parsed")
+
+        metadata = self.metadata_extractor.extract(parse_result.content, pdf_path.name)
+        self.registry.set_report_metadata(document_id, metadata)
+
+        process.current_stage = "chunking"
+        self.registry.update_status(document_id, "chunking")
+        documents = self.chunker.chunk(parse_result.content, metadata)
+        self.registry.append_history(
+            document_id,
+            stage="chunked",
+            success=True,
+            chunk_count=len(documents),
+        )
+        self.registry.update_status(document_id, "chunked")
+        return documents
+
+    def _handle_failure(
+        self,
+        process: _ProcessContext,
+        error: Exception,
+        *,
+        vector_snapshot: VectorSnapshot | None,
+    ) -> None:
+        document_id = process.document_id
+        current_stage = process.current_stage
+        if current_stage == "indexing" and vector_snapshot is not None:
+            self.embedder.restore_snapshot(document_id=document_id, snapshot=vector_snapshot)
+        if current_stage == "parsing":
+            self._cleanup_parsing_cache(document_id)
+
+        if process.registry_snapshot and process.registry_snapshot.get("status") == "indexed":
+            self.registry.rollback_document(
+                document_id,
+                snapshot=process.registry_snapshot,
+                stage=current_stage,
+                error_message=str(error),
+            )
+        else:
+            self.registry.mark_failed(
+                document_id,
+                stage=current_stage,
+                error_message=str(error),
+                rolled_back=False,
+            )
+
     def _build_plans(self, pdf_paths: Iterable[str | Path] | None) -> list[DocumentProcessingPlan]:
         if pdf_paths is None:
             return self.registry.plan_documents_to_process()
@@ -221,7 +352,18 @@ def build_default_pipeline_runner(settings: Settings | None = None) -> PipelineR
         persist_directory=app_settings.chroma_persist_dir,
         collection_name=app_settings.chroma_collection_name,
         embedding_model=app_settings.embedding_model,
+        embedding_batch_size=app_settings.embedding_batch_size,
+        embedding_max_concurrency=app_settings.embedding_max_concurrency,
+        embedding_max_batch_tokens=app_settings.embedding_max_batch_tokens,
+        embedding_requests_per_minute=app_settings.embedding_requests_per_minute,
+        embedding_tokens_per_minute=app_settings.embedding_tokens_per_minute,
+        hnsw_m=app_settings.chroma_hnsw_m,
+        hnsw_construction_ef=app_settings.chroma_hnsw_construction_ef,
+        hnsw_search_ef=app_settings.chroma_hnsw_search_ef,
+        lexical_index=LexicalIndex(app_settings.lexical_index_dir) if app_settings.lexical_index_enabled else None,
     )
+    if app_settings.two_stage_enabled:
+        embedder.two_stage_index = _open_two_stage_index(app_settings, embedder)
     registry = MetadataRegistry(path="data/metadata.json")
 
     return PipelineRunner(
@@ -231,4 +373,19 @@ def build_default_pipeline_runner(settings: Settings | None = None) -> PipelineR
         embedder=embedder,
         registry=registry,
         parsed_dir="data/parsed",
+        bulk_chunk_batch_size=app_settings.bulk_chunk_batch_size,
     )
+
+
+def _open_two_stage_index(settings: Settings, embedder: ReportEmbedder) -> TwoStageVectorStore | None:
+    try:
+        return TwoStageVectorStore.open(
+            client=embedder.vectorstore._client,  # type: ignore[attr-defined]
+            collection_name=settings.chroma_collection_name,
+            directory=settings.two_stage_dir,
+            embedding_function=embedder.embeddings,
+            candidate_k=settings.two_stage_candidate_k,
+        )
+    except Exception as error:  # noqa: BLE001 - 인덱스를 아직 빌드하지 않았으면 운영 컬렉션만 갱신한다.
+        logger.warning("Two-stage index unavailable. It is not updated during ingestion: %s", error)
+        return None
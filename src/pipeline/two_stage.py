@@ -0,0 +1,646 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+PROJECTOR_FILE = "projector.npz"
+FULL_VECTORS_FILE = "full_vectors.f32"
+FULL_VECTOR_IDS_FILE = "full_vector_ids.json"
+DEFAULT_REDUCED_DIM = 256
+DEFAULT_CANDIDATE_K = 50
+DEFAULT_SYNC_CHECK_INTERVAL_SECONDS = 30.0
+DEFAULT_COMPACT_TOMBSTONE_RATIO = 0.2
+READ_PAGE_SIZE = 1000
+
+
+def reduced_collection_name(collection_name: str, dim: int) -> str:
+    return f"{collection_name}__reduced{dim}"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+@dataclass(slots=True)
+class VectorProjector:
+    """전체 차원 벡터를 저차원으로 사영한다. PCA 또는 앞쪽 차원 절단(truncate)을 지원한다."""
+
+    mean: np.ndarray
+    components: np.ndarray
+    method: str
+
+    @property
+    def input_dim(self) -> int:
+        return int(self.components.shape[1])
+
+    @property
+    def output_dim(self) -> int:
+        return int(self.components.shape[0])
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, dim: int, *, method: str = "pca") -> VectorProjector:
+        data = np.asarray(vectors, dtype=np.float32)
+        full_dim = data.shape[1]
+        dim = min(dim, full_dim)
+        if method == "truncate":
+            return cls(
+                mean=np.zeros(full_dim, dtype=np.float32),
+                components=np.eye(full_dim, dtype=np.float32)[:dim],
+                method=method,
+            )
+        if method != "pca":
+            raise ValueError(f"Unsupported projection method: {method}")
+
+        mean = data.mean(axis=0)
+        # 표본 수가 차원보다 작으면 가능한 성분 수까지만 사용한다.
+        _, _, vt = np.linalg.svd(data - mean, full_matrices=False)
+        return cls(mean=mean.astype(np.float32), components=vt[:dim].astype(np.float32), method=method)
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        data = np.asarray(vectors, dtype=np.float32)
+        return _normalize((data - self.mean) @ self.components.T)
+
+    def save(self, path: Path) -> None:
+        np.savez(path, mean=self.mean, components=self.components, method=np.array(self.method))
+
+    @classmethod
+    def load(cls, path: Path) -> VectorProjector:
+        with np.load(path) as payload:
+            return cls(
+                mean=payload["mean"],
+                components=payload["components"],
+                method=str(payload["method"]),
+            )
+
+
+class FullVectorStore:
+    """전체 차원 벡터를 memory-mapped 파일로 보관하고 ID로 지연 조회한다.
+
+    적재 파이프라인이 행을 덧붙이거나 지우면 ID 파일을 원자적으로 바꿔 쓰고, 조회 쪽은 ID 파일 mtime이 바뀌면 다시 연다.
+    삭제된 행은 ID를 비워 두고(tombstone), 비율이 `compact_tombstone_ratio`를 넘으면 살아 있는 행만 새 파일로 옮긴다.
+    ID 파일이 벡터 파일 이름을 가리키므로 압축 중에도 조회 쪽은 항상 짝이 맞는 파일을 연다.
+    """
+
+    def __init__(self, directory: str | Path, *, compact_tombstone_ratio: float = DEFAULT_COMPACT_TOMBSTONE_RATIO):
+        self.directory = Path(directory)
+        self.compact_tombstone_ratio = compact_tombstone_ratio
+        self._row_by_id: dict[str, int] | None = None
+        self._vectors: np.memmap | None = None
+        self._ids_mtime_ns = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def write(cls, directory: str | Path, ids: Sequence[str], vectors: np.ndarray) -> FullVectorStore:
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        data = _normalize(np.asarray(vectors, dtype=np.float32))
+        previous = _read_meta(path)[2] if (path / FULL_VECTOR_IDS_FILE).exists() else None
+        # 서빙 중인 프로세스가 기존 파일을 열고 있을 수 있으므로 새 이름으로 쓰고 ID 파일을 바꾼다.
+        vectors_file = _new_vectors_file_name()
+        _write_vectors(path / vectors_file, data)
+        _write_meta(path, int(data.shape[1]), list(ids), vectors_file)
+        _remove_stale_vectors(path, previous, vectors_file)
+        return cls(path)
+
+    def get(self, ids: Sequence[str]) -> tuple[list[str], np.ndarray]:
+        """존재하는 ID와 해당 벡터 행렬을 반환한다. 모르는 ID는 건너뛴다."""
+        row_by_id, vectors = self._open()
+        found = [item for item in ids if item in row_by_id]
+        rows = [row_by_id[item] for item in found]
+        return found, np.asarray(vectors[rows]) if rows else np.empty((0, vectors.shape[1]), dtype=np.float32)
+
+    def upsert(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """있는 ID는 행을 덮어쓰고, 없는 ID는 파일 끝에 덧붙인다."""
+        if not len(ids):
+            return
+        data = _normalize(np.asarray(vectors, dtype=np.float32))
+        with self._lock:
+            dim, all_ids, vectors_file = _read_meta(self.directory)
+            row_by_id = {item: row for row, item in enumerate(all_ids) if item is not None}
+            existing = [(row_by_id[item], index) for index, item in enumerate(ids) if item in row_by_id]
+            appended = [index for index, item in enumerate(ids) if item not in row_by_id]
+            if existing:
+                mapped = np.memmap(
+                    self.directory / vectors_file,
+                    dtype=np.float32,
+                    mode="r+",
+                    shape=(len(all_ids), dim),
+                )
+                for row, index in existing:
+                    mapped[row] = data[index]
+                mapped.flush()
+                del mapped
+            if appended:
+                with (self.directory / vectors_file).open("ab") as file:
+                    file.write(np.ascontiguousarray(data[appended]).tobytes())
+                all_ids.extend(ids[index] for index in appended)
+            # 벡터를 먼저 쓰고 ID 파일을 바꿔야 조회 쪽이 아직 쓰지 않은 행을 읽지 않는다.
+            _write_meta(self.directory, dim, all_ids, vectors_file)
+
+    def delete(self, ids: Sequence[str]) -> int:
+        doomed = set(ids)
+        if not doomed:
+            return 0
+        with self._lock:
+            dim, all_ids, vectors_file = _read_meta(self.directory)
+            removed = sum(1 for item in all_ids if item in doomed)
+            if removed:
+                all_ids = [None if item in doomed else item for item in all_ids]
+                _write_meta(self.directory, dim, all_ids, vectors_file)
+                if all_ids.count(None) > len(all_ids) * self.compact_tombstone_ratio:
+                    self._compact_locked()
+            return removed
+
+    def compact(self) -> int:
+        """삭제 표시된 행을 뺀 새 벡터 파일을 쓰고, 정리한 행 수를 반환한다."""
+        with self._lock:
+            return self._compact_locked()
+
+    def _compact_locked(self) -> int:
+        dim, all_ids, vectors_file = _read_meta(self.directory)
+        live_rows = [row for row, item in enumerate(all_ids) if item is not None]
+        removed = len(all_ids) - len(live_rows)
+        if not removed:
+            return 0
+        source = np.memmap(self.directory / vectors_file, dtype=np.float32, mode="r", shape=(len(all_ids), dim))
+        compacted_file = _new_vectors_file_name()
+        _write_vectors(self.directory / compacted_file, np.asarray(source[live_rows]).reshape(len(live_rows), dim))
+        del source
+        _write_meta(self.directory, dim, [all_ids[row] for row in live_rows], compacted_file)
+        # 이미 열린 memmap은 파일을 지워도 유지되므로 조회 쪽은 다음 mtime 확인 때 새 파일로 옮겨 간다.
+        _remove_stale_vectors(self.directory, vectors_file, compacted_file)
+        logger.info("Compacted full vectors removed=%d remaining=%d", removed, len(live_rows))
+        return removed
+
+    @property
+    def file_bytes(self) -> int:
+        return (self.directory / _read_meta(self.directory)[2]).stat().st_size
+
+    def __len__(self) -> int:
+        row_by_id, _ = self._open()
+        return len(row_by_id)
+
+    def load_all(self) -> tuple[list[str], np.ndarray]:
+        row_by_id, vectors = self._open()
+        rows = sorted(row_by_id.values())
+        ids = sorted(row_by_id, key=row_by_id.__getitem__)
+        return ids, np.asarray(vectors[rows])
+
+    def _open(self) -> tuple[dict[str, int], np.memmap]:
+        mtime_ns = (self.directory / FULL_VECTOR_IDS_FILE).stat().st_mtime_ns
+        if self._row_by_id is None or self._vectors is None or mtime_ns != self._ids_mtime_ns:
+            dim, ids, vectors_file = _read_meta(self.directory)
+            # 빈 파일은 memmap으로 열 수 없다. 모든 행이 삭제돼 압축된 경우다.
+            self._vectors = (
+                np.memmap(self.directory / vectors_file, dtype=np.float32, mode="r", shape=(len(ids), dim))
+                if ids
+                else np.empty((0, dim), dtype=np.float32)
+            )
+            self._row_by_id = {item: row for row, item in enumerate(ids) if item is not None}
+            self._ids_mtime_ns = mtime_ns
+        return self._row_by_id, self._vectors
+
+
+def _read_meta(directory: Path) -> tuple[int, list[str | None], str]:
+    meta = json.loads((directory / FULL_VECTOR_IDS_FILE).read_text(encoding="utf-8"))
+    # vectors_file이 없으면 압축 도입 전 빌드이므로 고정 파일 이름을 쓴다.
+    return int(meta["dim"]), list(meta["ids"]), str(meta.get("vectors_file", FULL_VECTORS_FILE))
+
+
+def _write_meta(directory: Path, dim: int, ids: Sequence[str | None], vectors_file: str) -> None:
+    temp_path = directory / f"{FULL_VECTOR_IDS_FILE}.tmp"
+    payload = {"dim": dim, "ids": list(ids), "vectors_file": vectors_file}
+    temp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    temp_path.replace(directory / FULL_VECTOR_IDS_FILE)
+
+
+def _new_vectors_file_name() -> str:
+    return f"{Path(FULL_VECTORS_FILE).stem}.{time.time_ns()}.f32"
+
+
+def _write_vectors(path: Path, data: np.ndarray) -> None:
+    with path.open("wb") as file:
+        file.write(np.ascontiguousarray(data, dtype=np.float32).tobytes())
+
+
+def _remove_stale_vectors(directory: Path, previous: str | None, current: str) -> None:
+    if previous is not None and previous != current:
+        (directory / previous).unlink(missing_ok=True)
+
+
+class TwoStageVectorStore:
+    """저차원 벡터로 후보 top-N을 찾고, memmap 전체 벡터로 정확히 재채점하는 검색기.
+
+    Chroma와 같은 검색/`get` 시그니처를 제공하므로 `ReportRetriever`의 `search_store`로 그대로 쓸 수 있다.
+    적재 파이프라인은 `upsert`/`delete`로 함께 갱신한다. 운영 컬렉션과 건수가 어긋나면(재빌드 전 적재 등)
+    `fallback` 벡터스토어로 검색해 새 리포트가 누락되지 않게 한다.
+
+    Chroma는 컬렉션을 처음 질의할 때 HNSW를 메모리에 올리므로, 동기화된 동안에는 저차원 HNSW와
+    재채점한 후보 행의 memmap 페이지만 메모리에 있다. 전체 벡터는 디스크에 한 벌 더 저장된다.
+    실제 크기는 `measure_two_stage_footprint`로 잰다.
+    """
+
+    def __init__(
+        self,
+        *,
+        reduced_collection: Any,
+        projector: VectorProjector,
+        full_vectors: FullVectorStore,
+        embedding_function: Embeddings,
+        candidate_k: int = DEFAULT_CANDIDATE_K,
+        source_collection: Any | None = None,
+        fallback: Any | None = None,
+        sync_check_interval_seconds: float = DEFAULT_SYNC_CHECK_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.reduced_collection = reduced_collection
+        self.projector = projector
+        self.full_vectors = full_vectors
+        self.embedding_function = embedding_function
+        self.candidate_k = candidate_k
+        # 건수 비교 기준이 되는 운영 컬렉션과, 어긋났을 때 대신 검색할 전체 차원 벡터스토어.
+        self.source_collection = source_collection
+        self.fallback = fallback
+        self.sync_check_interval_seconds = sync_check_interval_seconds
+        self._clock = clock
+        self._in_sync = True
+        self._next_sync_check = 0.0
+
+    @classmethod
+    def open(
+        cls,
+        *,
+        client: Any,
+        collection_name: str,
+        directory: str | Path,
+        embedding_function: Embeddings,
+        candidate_k: int = DEFAULT_CANDIDATE_K,
+        fallback: Any | None = None,
+        sync_check_interval_seconds: float = DEFAULT_SYNC_CHECK_INTERVAL_SECONDS,
+    ) -> TwoStageVectorStore:
+        path = Path(directory)
+        projector = VectorProjector.load(path / PROJECTOR_FILE)
+        reduced = client.get_collection(reduced_collection_name(collection_name, projector.output_dim))
+        try:
+            source = client.get_collection(collection_name)
+        except Exception:  # noqa: BLE001 - 운영 컬렉션이 없으면 건수 비교를 건너뛴다.
+            source = None
+        return cls(
+            reduced_collection=reduced,
+            projector=projector,
+            full_vectors=FullVectorStore(path),
+            embedding_function=embedding_function,
+            candidate_k=candidate_k,
+            source_collection=source,
+            fallback=fallback,
+            sync_check_interval_seconds=sync_check_interval_seconds,
+        )
+
+    def in_sync(self) -> bool:
+        """저차원 컬렉션, 전체 벡터, 운영 컬렉션의 건수가 같은지. 매 검색마다 세지 않도록 간격을 두고 확인한다."""
+        now = self._clock()
+        if now < self._next_sync_check:
+            return self._in_sync
+        self._next_sync_check = now + self.sync_check_interval_seconds
+        try:
+            reduced_count = int(self.reduced_collection.count())
+            full_count = len(self.full_vectors)
+            source_count = int(self.source_collection.count()) if self.source_collection is not None else reduced_count
+        except Exception as error:  # noqa: BLE001 - 건수를 못 세면 전체 벡터 검색으로 안전하게 동작한다.
+            logger.warning("Two-stage index sync check failed: %s", error)
+            in_sync = False
+        else:
+            in_sync = reduced_count == full_count == source_count
+            if not in_sync:
+                logger.warning(
+                    "Two-stage index is out of sync reduced=%d full=%d source=%d. Rebuild the index.",
+                    reduced_count,
+                    full_count,
+                    source_count,
+                )
+        if in_sync != self._in_sync:
+            logger.info("Two-stage index sync state changed in_sync=%s", in_sync)
+        self._in_sync = in_sync
+        return in_sync
+
+    def upsert(
+        self,
+        *,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[dict[str, Any]],
+        embeddings: Sequence[Sequence[float]] | np.ndarray,
+    ) -> None:
+        """운영 컬렉션과 같은 청크를 쓴다. 전체 벡터를 먼저 써야 후보가 재채점에서 빠지지 않는다."""
+        if not len(ids):
+            return
+        full = np.asarray(embeddings, dtype=np.float32)
+        self.full_vectors.upsert(list(ids), full)
+        self.reduced_collection.upsert(
+            ids=list(ids),
+            documents=list(documents),
+            metadatas=[dict(metadata or {}) for metadata in metadatas],
+            embeddings=self.projector.project(full),
+        )
+        self._next_sync_check = 0.0
+
+    def delete(self, *, where: dict[str, Any]) -> None:
+        payload = self.reduced_collection.get(where=where, include=[])
+        ids = [str(item) for item in payload.get("ids", [])]
+        if ids:
+            self.reduced_collection.delete(ids=ids)
+            self.full_vectors.delete(ids)
+        self._next_sync_check = 0.0
+
+    def get(
+        self,
+        ids: Sequence[str] | None = None,
+        where: dict[str, Any] | None = None,
+        include: Sequence[str] = ("documents", "metadatas"),
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        """Chroma `get`과 같은 형태. 임베딩은 전체 차원 memmap에서 읽는다."""
+        if not self.in_sync() and self.fallback is not None:
+            return self.fallback.get(ids=ids, where=where, include=list(include), **kwargs)
+        payload_include = [item for item in include if item in ("documents", "metadatas")]
+        payload = self.reduced_collection.get(
+            ids=list(ids) if ids is not None else None,
+            where=where,
+            include=payload_include,
+        )
+        found_ids = [str(item) for item in payload.get("ids", [])]
+        result: dict[str, Any] = {"ids": found_ids}
+        for item in payload_include:
+            result[item] = payload.get(item)
+        if "embeddings" in include:
+            with_vectors, vectors = self.full_vectors.get(found_ids)
+            if len(with_vectors) != len(found_ids):
+                missing = len(found_ids) - len(with_vectors)
+                raise KeyError(f"{missing} chunk(s) have no full-dimension vector. Rebuild the two-stage index.")
+            result["embeddings"] = vectors
+        return result
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding_function
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self,
+        embedding: list[float],
+        k: int = 4,
+        filter: dict[str, Any] | None = None,  # noqa: A002 - Chroma 시그니처와 맞춘다.
+        **kwargs: Any,
+    ) -> list[tuple[Document, float]]:
+        """Chroma와 같이 (문서, 코사인 거리) 목록을 반환한다. 값이 작을수록 유사하다."""
+        if not self.in_sync() and self.fallback is not None:
+            return self.fallback.similarity_search_by_vector_with_relevance_scores(embedding, k=k, filter=filter)
+        query = np.asarray(embedding, dtype=np.float32)
+        reduced_query = self.projector.project(query[np.newaxis, :])
+        n_results = max(k, self.candidate_k)
+        result = self.reduced_collection.query(
+            query_embeddings=reduced_query,
+            n_results=n_results,
+            where=filter or None,
+            include=["documents", "metadatas"],
+        )
+        candidate_ids = [str(item) for item in result["ids"][0]]
+        if not candidate_ids:
+            return []
+
+        payload_by_id = {
+            item: (content, metadata or {})
+            for item, content, metadata in zip(
+                candidate_ids, result["documents"][0], result["metadatas"][0], strict=False
+            )
+        }
+        found_ids, full = self.full_vectors.get(candidate_ids)
+        if len(found_ids) != len(candidate_ids):
+            # 저차원 컬렉션에만 있는 청크는 재채점할 수 없다. 조용히 빼지 않고 다음 확인 때까지 전체 벡터로 검색한다.
+            logger.warning(
+                "Two-stage candidates missing full vectors missing=%d",
+                len(candidate_ids) - len(found_ids),
+            )
+            self._in_sync = False
+            self._next_sync_check = self._clock() + self.sync_check_interval_seconds
+            if self.fallback is not None:
+                return self.fallback.similarity_search_by_vector_with_relevance_scores(embedding, k=k, filter=filter)
+        if not found_ids:
+            return []
+
+        similarities = full @ _normalize(query)
+        order = np.argsort(-similarities)[:k]
+        scored: list[tuple[Document, float]] = []
+        for row in order:
+            chunk_id = found_ids[int(row)]
+            content, metadata = payload_by_id[chunk_id]
+            document = Document(id=chunk_id, page_content=content, metadata=metadata)
+            scored.append((document, 1.0 - float(similarities[row])))
+        return scored
+
+    def similarity_search_with_relevance_scores(
+        self,
+        query: str,
+        k: int = 4,
+        filter: dict[str, Any] | None = None,  # noqa: A002
+        **kwargs: Any,
+    ) -> list[tuple[Document, float]]:
+        embedding = self.embedding_function.embed_query(query)
+        relevance = self._select_relevance_score_fn()
+        return [
+            (document, relevance(distance))
+            for document, distance in self.similarity_search_by_vector_with_relevance_scores(
+                embedding, k=k, filter=filter
+            )
+        ]
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        filter: dict[str, Any] | None = None,  # noqa: A002
+        **kwargs: Any,
+    ) -> list[Document]:
+        return [document for document, _ in self.similarity_search_with_relevance_scores(query, k=k, filter=filter)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return lambda distance: 1.0 - distance
+
+
+def read_collection(
+    collection: Any,
+    *,
+    page_size: int = READ_PAGE_SIZE,
+) -> tuple[list[str], list[str], list[dict[str, Any]], np.ndarray]:
+    ids: list[str] = []
+    documents: list[str] = []
+    metadatas: list[dict[str, Any]] = []
+    vectors: list[np.ndarray] = []
+    offset = 0
+    while True:
+        payload = collection.get(
+            include=["documents", "metadatas", "embeddings"],
+            limit=page_size,
+            offset=offset,
+        )
+        page_ids = [str(item) for item in payload.get("ids", [])]
+        if not page_ids:
+            break
+        ids.extend(page_ids)
+        documents.extend(str(item) for item in payload.get("documents", []))
+        metadatas.extend(dict(item or {}) for item in payload.get("metadatas", []))
+        vectors.append(np.asarray(payload.get("embeddings"), dtype=np.float32))
+        offset += len(page_ids)
+    matrix = np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+    return ids, documents, metadatas, matrix
+
+
+def build_two_stage_index(
+    *,
+    client: Any,
+    source_collection: Any,
+    collection_name: str,
+    directory: str | Path,
+    reduced_dim: int = DEFAULT_REDUCED_DIM,
+    method: str = "pca",
+    fit_sample_size: int = 20000,
+    upsert_batch_size: int = 1000,
+    seed: int = 42,
+) -> tuple[VectorProjector, FullVectorStore]:
+    """운영 컬렉션에서 projector를 학습하고 저차원 컬렉션과 전체 벡터 memmap을 만든다."""
+    from src.pipeline.embedder import build_collection_metadata
+
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    ids, documents, metadatas, full = read_collection(source_collection)
+    if not ids:
+        raise ValueError("Source collection is empty")
+
+    rng = np.random.default_rng(seed)
+    sample_rows = rng.choice(len(ids), size=min(fit_sample_size, len(ids)), replace=False)
+    projector = VectorProjector.fit(full[sample_rows], reduced_dim, method=method)
+    projector.save(path / PROJECTOR_FILE)
+    full_store = FullVectorStore.write(path, ids, full)
+
+    name = reduced_collection_name(collection_name, projector.output_dim)
+    try:
+        client.delete_collection(name)
+    except Exception:  # noqa: BLE001 - 최초 빌드 시에는 컬렉션이 없다.
+        pass
+    reduced = client.create_collection(name, metadata=build_collection_metadata(), embedding_function=None)
+    reduced_vectors = projector.project(full)
+    for start in range(0, len(ids), upsert_batch_size):
+        end = start + upsert_batch_size
+        reduced.upsert(
+            ids=ids[start:end],
+            documents=documents[start:end],
+            metadatas=metadatas[start:end],
+            embeddings=reduced_vectors[start:end],
+        )
+    logger.info(
+        "Built two-stage index vectors=%d full_dim=%d reduced_dim=%d",
+        len(ids),
+        full.shape[1],
+        projector.output_dim,
+    )
+    return projector, full_store
+
+
+@dataclass(frozen=True, slots=True)
+class TwoStageFootprint:
+    vectors: int
+    full_dim: int
+    reduced_dim: int
+    full_index_bytes: int | None
+    reduced_index_bytes: int | None
+    full_vectors_bytes: int
+    rescoring_bytes_per_query: int
+
+    def to_dict(self) -> dict[str, int | None]:
+        return {
+            "vectors": self.vectors,
+            "full_dim": self.full_dim,
+            "reduced_dim": self.reduced_dim,
+            "full_index_bytes": self.full_index_bytes,
+            "reduced_index_bytes": self.reduced_index_bytes,
+            "full_vectors_bytes": self.full_vectors_bytes,
+            "rescoring_bytes_per_query": self.rescoring_bytes_per_query,
+        }
+
+
+def measure_two_stage_footprint(
+    store: TwoStageVectorStore,
+    *,
+    persist_directory: str | Path | None = None,
+) -> TwoStageFootprint:
+    """HNSW 세그먼트 파일과 전체 벡터 memmap 파일의 실제 크기를 잰다.
+
+    `persist_directory`가 없거나 세그먼트를 찾지 못하면 인덱스 크기는 None이다.
+    """
+    reduced_index_bytes = full_index_bytes = None
+    if persist_directory is not None:
+        reduced_index_bytes = _hnsw_segment_bytes(persist_directory, getattr(store.reduced_collection, "id", None))
+        full_index_bytes = _hnsw_segment_bytes(persist_directory, getattr(store.source_collection, "id", None))
+    full_dim = store.projector.input_dim
+    return TwoStageFootprint(
+        vectors=len(store.full_vectors),
+        full_dim=full_dim,
+        reduced_dim=store.projector.output_dim,
+        full_index_bytes=full_index_bytes,
+        reduced_index_bytes=reduced_index_bytes,
+        full_vectors_bytes=store.full_vectors.file_bytes,
+        rescoring_bytes_per_query=store.candidate_k * full_dim * 4,
+    )
+
+
+def _hnsw_segment_bytes(persist_directory: str | Path, collection_id: Any) -> int | None:
+    if collection_id is None:
+        return None
+    root = Path(persist_directory)
+    try:
+        with sqlite3.connect(f"file:{root / 'chroma.sqlite3'}?mode=ro", uri=True) as connection:
+            rows = connection.execute(
+                "SELECT id FROM segments WHERE collection = ? AND scope = 'VECTOR'",
+                (str(collection_id),),
+            ).fetchall()
+    except sqlite3.Error as error:
+        logger.warning("Failed to read Chroma segments: %s", error)
+        return None
+    segment_dirs = [root / str(row[0]) for row in rows if (root / str(row[0])).is_dir()]
+    if not segment_dirs:
+        return None
+    return sum(file.stat().st_size for directory in segment_dirs for file in directory.iterdir() if file.is_file())
+
+
+def measure_two_stage_recall(
+    store: TwoStageVectorStore,
+    queries: np.ndarray,
+    *,
+    k: int = 5,
+) -> float:
+    """전체 벡터 brute-force 결과 대비 2단계 검색의 recall@k."""
+    ids, vectors = store.full_vectors.load_all()
+    normalized = _normalize(np.asarray(queries, dtype=np.float32))
+    exact_scores = normalized @ np.asarray(vectors).T
+    hits = 0
+    for query, scores in zip(normalized, exact_scores, strict=True):
+        truth = {ids[int(row)] for row in np.argsort(-scores)[:k]}
+        found = {
+            document.id for document, _ in store.similarity_search_by_vector_with_relevance_scores(query.tolist(), k=k)
+        }
+        hits += len(truth & found)
+    return hits / (len(normalized) * k) if len(normalized) else 0.0
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Mapping, Sequence
+
+from langchain_core.documents import Document
+
+from src.models import QAResult
+from src.pipeline.registry import MetadataRegistry
+from src.rag.cache import CacheStats, LRUTTLCache, normalize_question
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_CHECK_INTERVAL_SECONDS = 5.0
+
+AnswerKey = tuple[str, tuple[str, ...], tuple[tuple[str, int], ...]]
+
+
+class RegistryGenerations:
+    """레지스트리 파일의 문서별 `index_generation`을 읽는다.
+
+    적재 파이프라인은 별도 프로세스이므로 `check_interval_seconds`마다 파일 mtime만 확인하고, 바뀌었을 때만 다시 읽는다.
+    """
+
+    def __init__(
+        self,
+        registry: MetadataRegistry,
+        *,
+        check_interval_seconds: float = DEFAULT_CHECK_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.registry = registry
+        self.check_interval_seconds = check_interval_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._generations: dict[str, int] = {}
+        self._mtime: float | None = None
+        self._checked_at: float | None = None
+
+    def __call__(self) -> Mapping[str, int]:
+        with self._lock:
+            now = self._clock()
+            if self._checked_at is not None and now - self._checked_at < self.check_interval_seconds:
+                return self._generations
+            self._checked_at = now
+            try:
+                mtime = self.registry.path.stat().st_mtime
+            except OSError:
+                return self._generations
+            if mtime != self._mtime:
+                try:
+                    self._generations = self.registry.index_generations()
+                    self._mtime = mtime
+                except (OSError, ValueError) as error:
+                    logger.warning("Failed to read registry generations: %s", error)
+            return self._generations
+
+
+class AnswerCache:
+    """정규화 질문 + 검색된 청크 ID 집합 + 문서 색인 세대를 키로 완성된 `QAResult`를 보관하는 캐시.
+
+    문서가 재색인되면 세대가 바뀌어 키가 달라지고, 세대 변화를 감지하면 해당 문서를 포함한 항목을 바로 지운다.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+        generations: Callable[[], Mapping[str, int]] | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._cache: LRUTTLCache[AnswerKey, QAResult] = LRUTTLCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            clock=clock,
+        )
+        self._generations = generations
+        self._seen_generations: Mapping[str, int] = {}
+
+    def get(self, question: str, documents: Sequence[Document]) -> QAResult | None:
+        return self._cache.get(self._key(question, documents))
+
+    def put(self, question: str, documents: Sequence[Document], result: QAResult) -> None:
+        self._cache.put(self._key(question, documents), result)
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def _key(self, question: str, documents: Sequence[Document]) -> AnswerKey:
+        generations = self._current_generations()
+        chunk_ids: set[str] = set()
+        document_ids: set[str] = set()
+        for document in documents:
+            metadata = document.metadata or {}
+            document_id = str(metadata.get("document_id", ""))
+            document_ids.add(document_id)
+            chunk_ids.add(document.id or f"{document_id}::{metadata.get('chunk_index', '')}")
+        return (
+            normalize_question(question),
+            tuple(sorted(chunk_ids)),
+            tuple((document_id, generations.get(document_id, 0)) for document_id in sorted(document_ids)),
+        )
+
+    def _current_generations(self) -> Mapping[str, int]:
+        if self._generations is None:
+            return {}
+        generations = self._generations()
+        if generations is not self._seen_generations:
+            changed = {
+                document_id
+                for document_id, generation in generations.items()
+                if self._seen_generations.get(document_id, generation) != generation
+            }
+            self._seen_generations = generations
+            if changed:
+                removed = self._cache.discard_where(
+                    lambda key, _: any(document_id in changed for document_id, _generation in key[2])
+                )
+                logger.info("Invalidated answer cache entries=%d reindexed_documents=%d", removed, len(changed))
+        return generations
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_TRAILING_PUNCTUATION_PATTERN = re.compile(r"[\s?!.~。？！]+$")
+
+
+def normalize_question(text: str) -> str:
+    """캐시 키용 질문 정규화. 전각/반각, 대소문자, 공백, 끝 문장부호 차이를 없앤다."""
+    normalized = unicodedata.normalize("NFKC", text).lower()
+    normalized = _WHITESPACE_PATTERN.sub(" ", normalized).strip()
+    return _TRAILING_PUNCTUATION_PATTERN.sub("", normalized)
+
+
+@dataclass(frozen=True, slots=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+    max_entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUTTLCache(Generic[K, V]):
+    """크기 제한(LRU)과 만료 시간(TTL)을 가진 스레드 안전 캐시."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl_seconds: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[V, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: K, value: V, *, expires_at: float | None = None) -> None:
+        with self._lock:
+            if expires_at is None and self.ttl_seconds is not None:
+                expires_at = self._clock() + self.ttl_seconds
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return None if entry is None else entry[0]
+
+    def discard_where(self, predicate: Callable[[K, V], bool]) -> int:
+        with self._lock:
+            doomed = [key for key, (value, _) in self._entries.items() if predicate(key, value)]
+            for key in doomed:
+                del self._entries[key]
+            return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def items(self) -> list[tuple[K, V, float | None]]:
+        """만료되지 않은 항목을 오래된 순서대로 반환한다. 영속화 용도."""
+        with self._lock:
+            now = self._clock()
+            return [
+                (key, value, expires_at)
+                for key, (value, expires_at) in self._entries.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                size=len(self._entries),
+                max_entries=self.max_entries,
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import inspect
 import logging
+from collections.abc import Awaitable, Callable
 
 from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
 from langchain_openai import ChatOpenAI
 
 from src.models import QAResult
+from src.rag.answer_cache import AnswerCache
+from src.rag.cache import normalize_question
+from src.rag.context import ContextBuilder
+from src.rag.conversation import ConversationCache, FollowUp
 from src.rag.prompts import build_qa_prompt
 from src.rag.retriever import ReportRetriever
+from src.rag.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -52,8 +59,16 @@ class ReportQAChain:
         *,
         openai_api_key: str,
         llm_model: str = "gpt-4o-mini",
+        answer_cache: AnswerCache | None = None,
+        context_builder: ContextBuilder | None = None,
+        coalescer: SingleFlight[str, QAResult] | None = None,
+        conversations: ConversationCache | None = None,
     ):
         self.retriever = retriever
+        self.conversations = conversations
+        self.coalescer = coalescer
+        self.answer_cache = answer_cache
+        self.context_builder = context_builder
         self.prompt = build_qa_prompt()
         self.llm = ChatOpenAI(
             base_url="https://api.bizrouter.ai/v1",
@@ -65,30 +80,234 @@ class ReportQAChain:
         )
         self.chain = self.prompt | self.llm | StrOutputParser()
 
-    def ask(self, question: str) -> QAResult:
-        documents = self.retriever.retrieve(question)
-        if not documents:
-            return QAResult(
-                answer=(
-                    "관련 증권사 리포트를 찾을 수 없습니다. "
-                    "종목명이나 키워드를 바꿔 다시 질문해 주세요."
-                ),
-                sources=[],
-                retrieved_documents=[],
+    def ask(
+        self,
+        question: str,
+        *,
+        on_partial_answer: Callable[[str], None] | None = None,
+        thread_key: str | None = None,
+    ) -> QAResult:
+        """질문에 답한다. `on_partial_answer`를 주면 LLM 토큰 스트림을 받아 누적 답변으로 호출한다.
+
+        `coalescer`가 있으면 정규화 질문이 같은 진행 중 요청의 결과를 함께 받는다. 스트리밍은 먼저 온 요청만 받는다.
+        `thread_key`와 `conversations`가 있으면 같은 스레드의 후속 질문은 직전 턴 문맥 안에서 검색한다.
+        """
+        planned = self._plan_follow_up(thread_key, question)
+        if self.coalescer is None:
+            result, follow_up = self._ask(question, on_partial_answer, planned)
+        else:
+            (result, follow_up), shared = self.coalescer.do(
+                _coalescing_key(question, thread_key, planned),
+                lambda: self._ask(question, on_partial_answer, planned),
             )
+            if shared:
+                logger.info("Coalesced in-flight question documents=%d", len(result.retrieved_documents))
+        self._remember(thread_key, question, follow_up, result)
+        return result
+
+    async def aask(
+        self,
+        question: str,
+        *,
+        on_partial_answer: Callable[[str], Awaitable[None] | None] | None = None,
+        thread_key: str | None = None,
+    ) -> QAResult:
+        """`ask`의 비동기 버전. 질의 임베딩과 LLM 호출을 이벤트 루프에서 기다려 스레드를 점유하지 않는다."""
+        planned = self._plan_follow_up(thread_key, question)
+        if self.coalescer is None:
+            result, follow_up = await self._aask(question, on_partial_answer, planned)
+        else:
+            (result, follow_up), shared = await self.coalescer.ado(
+                _coalescing_key(question, thread_key, planned),
+                lambda: self._aask(question, on_partial_answer, planned),
+            )
+            if shared:
+                logger.info("Coalesced in-flight question documents=%d", len(result.retrieved_documents))
+        self._remember(thread_key, question, follow_up, result)
+        return result
+
+    def _ask(
+        self,
+        question: str,
+        on_partial_answer: Callable[[str], None] | None,
+        follow_up: FollowUp | None = None,
+    ) -> tuple[QAResult, FollowUp | None]:
+        """답변과 실제로 쓴 후속 질문 계획을 반환한다. 범위 검색이 비어 전체 검색으로 돌아가면 계획은 None이다."""
+        documents: list[Document] = []
+        if follow_up is not None:
+            documents = self.retriever.retrieve(follow_up.query, scope=follow_up.metadata_filter)
+            follow_up = _accept_follow_up(follow_up, documents)
+        if follow_up is None:
+            documents = self.retriever.retrieve(question)
+        else:
+            question = follow_up.prompt_question
+        return self._answer(question, documents, on_partial_answer), follow_up
+
+    def _answer(
+        self,
+        question: str,
+        documents: list[Document],
+        on_partial_answer: Callable[[str], None] | None,
+    ) -> QAResult:
+        if not documents:
+            return _no_documents_result()
+
+        cached = self._cached_answer(question, documents)
+        if cached is not None:
+            if on_partial_answer is not None:
+                on_partial_answer(cached.answer)
+            return cached
 
         try:
-            context = format_documents_for_prompt(documents)
-            answer = self.chain.invoke({"context": context, "question": question})
+            inputs, cited_documents = self._prepare_inputs(question, documents)
+            if on_partial_answer is None:
+                answer = self.chain.invoke(inputs)
+            else:
+                answer = ""
+                for delta in self.chain.stream(inputs):
+                    answer += delta
+                    on_partial_answer(answer)
         except Exception as error:  # noqa: BLE001 - 외부 API 실패는 사용자 메시지로 변환한다.
             logger.exception("Failed to generate QA answer: %s", error)
-            return QAResult(
-                answer="답변 생성 중 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.",
-                sources=[],
-                retrieved_documents=documents,
-            )
-        return QAResult(
+            return _generation_failed_result(documents)
+        return self._store_answer(question, documents, answer, cited_documents)
+
+    async def _aask(
+        self,
+        question: str,
+        on_partial_answer: Callable[[str], Awaitable[None] | None] | None,
+        follow_up: FollowUp | None = None,
+    ) -> tuple[QAResult, FollowUp | None]:
+        documents: list[Document] = []
+        if follow_up is not None:
+            documents = await self.retriever.aretrieve(follow_up.query, scope=follow_up.metadata_filter)
+            follow_up = _accept_follow_up(follow_up, documents)
+        if follow_up is None:
+            documents = await self.retriever.aretrieve(question)
+        else:
+            question = follow_up.prompt_question
+        return await self._aanswer(question, documents, on_partial_answer), follow_up
+
+    async def _aanswer(
+        self,
+        question: str,
+        documents: list[Document],
+        on_partial_answer: Callable[[str], Awaitable[None] | None] | None,
+    ) -> QAResult:
+        if not documents:
+            return _no_documents_result()
+
+        cached = self._cached_answer(question, documents)
+        if cached is not None:
+            if on_partial_answer is not None:
+                await _maybe_await(on_partial_answer(cached.answer))
+            return cached
+
+        try:
+            inputs, cited_documents = self._prepare_inputs(question, documents)
+            if on_partial_answer is None:
+                answer = await self.chain.ainvoke(inputs)
+            else:
+                answer = ""
+                async for delta in self.chain.astream(inputs):
+                    answer += delta
+                    await _maybe_await(on_partial_answer(answer))
+        except Exception as error:  # noqa: BLE001 - 외부 API 실패는 사용자 메시지로 변환한다.
+            logger.exception("Failed to generate QA answer: %s", error)
+            return _generation_failed_result(documents)
+        return self._store_answer(question, documents, answer, cited_documents)
+
+    def _plan_follow_up(self, thread_key: str | None, question: str) -> FollowUp | None:
+        if self.conversations is None:
+            return None
+        return self.conversations.plan(thread_key, question)
+
+    def _remember(
+        self,
+        thread_key: str | None,
+        question: str,
+        follow_up: FollowUp | None,
+        result: QAResult,
+    ) -> None:
+        if self.conversations is None or thread_key is None:
+            return
+        # 범위 검색으로 답한 경우에만 이전 종목명을 붙인 질의를 기록한다. 전체 검색으로 돌아갔다면 새 주제다.
+        remembered = follow_up.query if follow_up is not None else question
+        self.conversations.remember(thread_key, remembered, result.retrieved_documents)
+
+    def _cached_answer(self, question: str, documents: list[Document]) -> QAResult | None:
+        if self.answer_cache is None:
+            return None
+        cached = self.answer_cache.get(question, documents)
+        if cached is not None:
+            logger.info("Answer cache hit documents=%d", len(documents))
+        return cached
+
+    def _prepare_inputs(self, question: str, documents: list[Document]) -> tuple[dict[str, str], list[Document]]:
+        if self.context_builder is None:
+            return {"context": format_documents_for_prompt(documents), "question": question}, documents
+
+        built = self.context_builder.build(documents)
+        logger.info(
+            "Prompt context built tokens=%d question_tokens=%d chunks=%d/%d merged=%d trimmed=%d dropped=%d",
+            built.tokens,
+            self.context_builder.counter.count(question),
+            len(built.documents),
+            len(documents),
+            built.merged,
+            built.trimmed,
+            built.dropped,
+        )
+        return {"context": built.text, "question": question}, built.documents
+
+    def _store_answer(
+        self,
+        question: str,
+        documents: list[Document],
+        answer: str,
+        cited_documents: list[Document],
+    ) -> QAResult:
+        result = QAResult(
             answer=answer,
-            sources=extract_sources(documents),
+            sources=extract_sources(cited_documents),
             retrieved_documents=documents,
         )
+        if self.answer_cache is not None:
+            self.answer_cache.put(question, documents, result)
+        return result
+
+
+def _coalescing_key(question: str, thread_key: str | None, follow_up: FollowUp | None) -> str:
+    # 후속 질문은 스레드 문맥에 따라 답이 달라지므로 같은 스레드 안에서만 합친다.
+    normalized = normalize_question(question)
+    return normalized if follow_up is None else f"{thread_key}\x00{normalized}"
+
+
+def _accept_follow_up(follow_up: FollowUp, documents: list[Document]) -> FollowUp | None:
+    """범위 검색 결과를 기록하고, 결과가 없으면 전체 검색으로 돌아가도록 None을 반환한다."""
+    if not documents:
+        logger.info("Follow-up scope found nothing. Full retrieval is used scope=%s", follow_up.scope)
+        return None
+    logger.info("Follow-up retrieval scope=%s documents=%d", follow_up.scope, len(documents))
+    return follow_up
+
+
+def _no_documents_result() -> QAResult:
+    return QAResult(
+        answer="관련 증권사 리포트를 찾을 수 없습니다. 종목명이나 키워드를 바꿔 다시 질문해 주세요.",
+        sources=[],
+        retrieved_documents=[],
+    )
+
+
+def _generation_failed_result(documents: list[Document]) -> QAResult:
+    return QAResult(
+        answer="답변 생성 중 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.",
+        sources=[],
+        retrieved_documents=documents,
+    )
+
+
+async def _maybe_await(value: Awaitable[None] | None) -> None:
+    if inspect.isawaitable(value):
+        await value
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from langchain_core.documents import Document
+
+from src.pipeline.embedding_executor import estimate_tokens
+from src.rag.cache import LRUTTLCache
+from src.rag.diversify import merge_adjacent_chunks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTEXT_TOKEN_BUDGET = 3000
+DEFAULT_TOKENIZER_MODEL = "gpt-4o-mini"
+FALLBACK_ENCODING = "o200k_base"
+# 남은 예산이 이보다 작으면 청크를 잘라 넣지 않고 버린다.
+MIN_TRIMMED_TOKENS = 80
+TRIMMED_MARKER = " …(생략)"
+DOCUMENT_SEPARATOR = "\n\n---\n\n"
+HEADER_FIELDS = ("broker", "analyst", "company_name", "date", "source_file")
+
+
+class TokenCounter:
+    """텍스트별 토큰 수를 LRU로 캐시하는 카운터.
+
+    tiktoken 인코딩을 쓸 수 없으면(미설치, 오프라인에서 BPE 파일 다운로드 실패 등) 바이트 기반 추정으로 대신한다.
+    """
+
+    def __init__(self, model: str = DEFAULT_TOKENIZER_MODEL, *, max_entries: int = 4096):
+        self.model = model
+        self._cache: LRUTTLCache[str, int] = LRUTTLCache(max_entries=max_entries)
+        self._lock = threading.Lock()
+        self._encoding: Any | None = None
+        self._loaded = False
+
+    def count(self, text: str) -> int:
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+        encoding = self._get_encoding()
+        tokens = len(encoding.encode(text)) if encoding is not None else estimate_tokens(text)
+        self._cache.put(text, tokens)
+        return tokens
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        encoding = self._get_encoding()
+        if encoding is not None:
+            token_ids = encoding.encode(text)
+            return text if len(token_ids) <= max_tokens else encoding.decode(token_ids[:max_tokens])
+        # estimate_tokens와 같은 비율(3바이트 ≈ 1토큰)로 자른다.
+        return text.encode("utf-8")[: max_tokens * 3].decode("utf-8", errors="ignore")
+
+    def _get_encoding(self) -> Any | None:
+        if self._loaded:
+            return self._encoding
+        with self._lock:
+            if self._loaded:
+                return self._encoding
+            try:
+                import tiktoken
+
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding(FALLBACK_ENCODING)
+            except Exception as error:  # noqa: BLE001 - 토크나이저가 없으면 추정치로 예산을 계산한다.
+                logger.warning("tiktoken encoding unavailable. Estimated token counts are used: %s", error)
+                self._encoding = None
+            self._loaded = True
+            return self._encoding
+
+
+@dataclass(slots=True)
+class PromptContext:
+    text: str
+    tokens: int
+    documents: list[Document] = field(default_factory=list)
+    dropped: int = 0
+    trimmed: int = 0
+    merged: int = 0
+
+
+class ContextBuilder:
+    """토큰 예산 안에서 QA 프롬프트 컨텍스트를 만든다.
+
+    같은 문서의 연속 청크는 overlap을 제거해 합치고, 같은 문서의 청크는 출처 헤더를 한 번만 쓴다.
+    검색 순위대로 채우다 예산이 모자라면 남은 예산만큼 잘라 넣거나, 그보다 낮은 순위 청크는 버린다.
+    """
+
+    def __init__(
+        self,
+        *,
+        token_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET,
+        counter: TokenCounter | None = None,
+        merge_adjacent: bool = True,
+    ):
+        self.token_budget = token_budget
+        self.counter = counter or TokenCounter()
+        self.merge_adjacent = merge_adjacent
+
+    def build(self, documents: Sequence[Document]) -> PromptContext:
+        candidates = merge_adjacent_chunks(documents) if self.merge_adjacent else list(documents)
+        separator_tokens = self.counter.count(DOCUMENT_SEPARATOR)
+
+        groups: dict[str, tuple[str, list[str]]] = {}
+        included: list[Document] = []
+        remaining = self.token_budget
+        dropped = 0
+        trimmed = 0
+        for document in candidates:
+            source_key = _source_key(document)
+            header = None if source_key in groups else f"[출처 {len(groups) + 1}] {_compact_header(document)}"
+            overhead = separator_tokens + (self.counter.count(header) if header else 0)
+            body = document.page_content
+            body_tokens = self.counter.count(body)
+
+            if overhead + body_tokens > remaining:
+                available = remaining - overhead - self.counter.count(TRIMMED_MARKER)
+                # 첫 청크는 예산이 작아도 잘라서라도 넣는다.
+                if available < MIN_TRIMMED_TOKENS and included:
+                    dropped += 1
+                    continue
+                body = self.counter.truncate(body, max(available, 1)) + TRIMMED_MARKER
+                body_tokens = self.counter.count(body)
+                trimmed += 1
+
+            if header is not None:
+                groups[source_key] = (header, [])
+            groups[source_key][1].append(body)
+            included.append(document)
+            remaining -= overhead + body_tokens
+
+        text = DOCUMENT_SEPARATOR.join(f"{header}\n" + "\n\n".join(bodies) for header, bodies in groups.values())
+        return PromptContext(
+            text=text,
+            tokens=self.token_budget - remaining,
+            documents=included,
+            dropped=dropped,
+            trimmed=trimmed,
+            merged=len(documents) - len(candidates),
+        )
+
+
+def _source_key(document: Document) -> str:
+    metadata = document.metadata or {}
+    return str(metadata.get("document_id") or metadata.get("source_file") or id(document))
+
+
+def _compact_header(document: Document) -> str:
+    metadata = document.metadata or {}
+    values = [str(metadata[name]) for name in HEADER_FIELDS if metadata.get(name) not in (None, "")]
+    return " | ".join(values) or "출처 미상"
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections.abc import Callable, Collection, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.documents import Document
+
+from src.pipeline.registry import MetadataRegistry
+from src.rag.cache import CacheStats, LRUTTLCache
+from src.rag.filters import extract_constraints
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_THREADS = 1000
+DEFAULT_TTL_SECONDS = 30 * 60
+DEFAULT_MAX_DOCUMENTS = 8
+# 이보다 짧은 질문은 그 자체로 검색하기엔 단서가 부족하다고 보고 이전 턴 문맥에 이어 붙인다.
+SHORT_FOLLOW_UP_CHARS = 20
+DEFAULT_COMPANY_CHECK_INTERVAL_SECONDS = 60.0
+
+SCOPE_SAME_DOCUMENTS = "same_documents"
+SCOPE_SAME_COMPANY = "same_company"
+SCOPE_OTHER_BROKERS = "other_brokers"
+
+_ANAPHORA_PATTERN = re.compile(r"^(?:그럼|그러면|그리고|그래서|그건|그게|그\s|이\s|거기|또|추가로|혹시)")
+_OTHER_BROKER_PATTERN = re.compile(r"다른\s*(?:증권사|하우스|곳|리포트|의견)")
+
+
+@dataclass(frozen=True, slots=True)
+class ThreadContext:
+    """스레드의 직전 턴에서 검색한 청크와 그 청크에서 모은 엔티티."""
+
+    question: str
+    documents: tuple[Document, ...]
+    tickers: tuple[str, ...] = ()
+    company_names: tuple[str, ...] = ()
+    brokers: tuple[str, ...] = ()
+    dates: tuple[str, ...] = ()
+    document_ids: tuple[str, ...] = ()
+
+    @classmethod
+    def from_documents(
+        cls,
+        question: str,
+        documents: Sequence[Document],
+        *,
+        max_documents: int = DEFAULT_MAX_DOCUMENTS,
+    ) -> ThreadContext:
+        kept = tuple(documents[: max(1, max_documents)])
+        return cls(
+            question=question,
+            documents=kept,
+            tickers=_distinct(kept, "ticker"),
+            company_names=_distinct(kept, "company_name"),
+            brokers=_distinct(kept, "broker"),
+            dates=_distinct(kept, "date"),
+            document_ids=_distinct(kept, "document_id"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class FollowUp:
+    """후속 질문을 이전 턴 문맥 안에서 검색하기 위한 계획."""
+
+    scope: str
+    query: str
+    prompt_question: str
+    metadata_filter: dict[str, Any]
+
+
+def plan_follow_up(
+    question: str,
+    context: ThreadContext,
+    *,
+    known_companies: Collection[str] = (),
+) -> FollowUp | None:
+    """후속 질문이면 검색 범위를 정하고, 새 주제로 보이면 None을 반환한다.
+
+    질문에 직전 턴에 없던 종목코드나 종목명(`known_companies`)이 있으면 짧은 질문이라도 새 주제로 본다.
+    - "다른 증권사 의견은?"처럼 다른 출처를 묻는 질문은 같은 종목에서 이전 증권사를 뺀 범위로 넓힌다.
+    - 질문에 증권사/기간 조건이 새로 있으면 같은 종목 전체에서 찾는다(조건은 검색기가 추가로 건다).
+    - 그 밖에는 직전 턴의 리포트 안에서만 찾는다.
+    """
+    constraints = extract_constraints(question)
+    if constraints.tickers and not set(constraints.tickers) <= set(context.tickers):
+        return None
+    if _mentions_new_company(question, context, known_companies):
+        return None
+    mentions_context = any(name in question for name in context.company_names)
+    if not (
+        mentions_context
+        or len(question) <= SHORT_FOLLOW_UP_CHARS
+        or _ANAPHORA_PATTERN.search(question)
+        or _OTHER_BROKER_PATTERN.search(question)
+    ):
+        return None
+
+    company_filter = _company_filter(context)
+    if _OTHER_BROKER_PATTERN.search(question) and company_filter:
+        scope = SCOPE_OTHER_BROKERS
+        metadata_filter = (
+            {"$and": [company_filter, {"broker": {"$nin": list(context.brokers)}}]}
+            if context.brokers
+            else company_filter
+        )
+    elif (constraints.brokers or constraints.resolves("date")) and company_filter:
+        scope = SCOPE_SAME_COMPANY
+        metadata_filter = company_filter
+    elif context.document_ids:
+        scope = SCOPE_SAME_DOCUMENTS
+        metadata_filter = _in_filter("document_id", context.document_ids)
+    else:
+        return None
+
+    # 대명사만 있는 질문은 임베딩/BM25 단서가 없으므로 이전 턴의 종목명을 붙여 검색한다.
+    query = question if mentions_context or not context.company_names else f"{context.company_names[0]} {question}"
+    return FollowUp(
+        scope=scope,
+        query=query,
+        prompt_question=f"(이전 질문: {context.question}) {question}",
+        metadata_filter=metadata_filter,
+    )
+
+
+class RegistryCompanyNames:
+    """레지스트리에 적재된 리포트의 종목명 집합.
+
+    적재 파이프라인은 별도 프로세스이므로 `check_interval_seconds`마다 파일 mtime만 확인하고, 바뀌었을 때만 다시 읽는다.
+    """
+
+    def __init__(
+        self,
+        registry: MetadataRegistry,
+        *,
+        check_interval_seconds: float = DEFAULT_COMPANY_CHECK_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.registry = registry
+        self.check_interval_seconds = check_interval_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._names: frozenset[str] = frozenset()
+        self._mtime: float | None = None
+        self._checked_at: float | None = None
+
+    def __call__(self) -> frozenset[str]:
+        with self._lock:
+            now = self._clock()
+            if self._checked_at is not None and now - self._checked_at < self.check_interval_seconds:
+                return self._names
+            self._checked_at = now
+            try:
+                mtime = self.registry.path.stat().st_mtime
+            except OSError:
+                return self._names
+            if mtime != self._mtime:
+                try:
+                    self._names = frozenset(self.registry.company_names())
+                    self._mtime = mtime
+                except (OSError, ValueError) as error:
+                    logger.warning("Failed to read company names from registry: %s", error)
+            return self._names
+
+
+class ConversationCache:
+    """Slack 스레드(`thread_ts`)별 직전 턴 문맥을 보관한다. 스레드 수(LRU)와 TTL로 메모리를 제한한다."""
+
+    def __init__(
+        self,
+        *,
+        max_threads: int = DEFAULT_MAX_THREADS,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_documents: int = DEFAULT_MAX_DOCUMENTS,
+        known_companies: Callable[[], Collection[str]] | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_documents = max_documents
+        # 새 종목을 묻는 짧은 질문을 후속 질문으로 오인하지 않도록 적재된 종목명 목록을 받는다.
+        self.known_companies = known_companies
+        self._cache: LRUTTLCache[str, ThreadContext] = LRUTTLCache(
+            max_entries=max_threads,
+            ttl_seconds=ttl_seconds,
+            clock=clock,
+        )
+
+    def get(self, thread_key: str) -> ThreadContext | None:
+        return self._cache.get(thread_key)
+
+    def remember(self, thread_key: str, question: str, documents: Sequence[Document]) -> None:
+        if not documents:
+            return
+        self._cache.put(
+            thread_key,
+            ThreadContext.from_documents(question, documents, max_documents=self.max_documents),
+        )
+
+    def plan(self, thread_key: str | None, question: str) -> FollowUp | None:
+        if thread_key is None:
+            return None
+        context = self.get(thread_key)
+        if context is None:
+            return None
+        known = self.known_companies() if self.known_companies is not None else ()
+        follow_up = plan_follow_up(question, context, known_companies=known)
+        if follow_up is None:
+            logger.info("Thread question treated as a new topic thread=%s", thread_key)
+        return follow_up
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
+
+
+def _mentions_new_company(question: str, context: ThreadContext, known_companies: Collection[str]) -> bool:
+    # "삼성"처럼 직전 종목명의 일부인 이름은 같은 종목을 가리키는 것으로 본다.
+    return any(
+        name in question and not any(name in current or current in name for current in context.company_names)
+        for name in known_companies
+    )
+
+
+def _company_filter(context: ThreadContext) -> dict[str, Any] | None:
+    if context.tickers:
+        return _in_filter("ticker", context.tickers)
+    if context.company_names:
+        return _in_filter("company_name", context.company_names)
+    return None
+
+
+def _in_filter(field: str, values: Sequence[str]) -> dict[str, Any]:
+    return {field: values[0]} if len(values) == 1 else {field: {"$in": list(values)}}
+
+
+def _distinct(documents: Sequence[Document], field: str) -> tuple[str, ...]:
+    values = ((document.metadata or {}).get(field) for document in documents)
+    return tuple(dict.fromkeys(str(value) for value in values if value not in (None, "")))
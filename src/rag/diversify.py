@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+from langchain_core.documents import Document
+
+DEFAULT_MMR_LAMBDA = 0.7
+MAX_OVERLAP_CHARS = 400
+# 우연히 같은 글자로 끝나고 시작하는 경우를 overlap으로 오인하지 않도록 최소 길이를 둔다.
+MIN_OVERLAP_CHARS = 20
+
+
+def maximal_marginal_relevance(
+    query_vector: Sequence[float] | np.ndarray,
+    candidate_vectors: Sequence[Sequence[float]] | np.ndarray,
+    *,
+    k: int,
+    lambda_mult: float = DEFAULT_MMR_LAMBDA,
+    groups: Sequence[Any] | None = None,
+    max_per_group: int | None = None,
+) -> list[int]:
+    """MMR로 k개 후보의 인덱스를 고른다.
+
+    유사도 행렬을 한 번만 계산하고, 선택할 때마다 "이미 고른 후보와의 최대 유사도" 배열을 벡터 연산으로 갱신한다.
+    `groups`와 `max_per_group`을 주면 같은 그룹(문서)에서 그 수를 넘게 고르지 않는다.
+    """
+    vectors = np.asarray(candidate_vectors, dtype=np.float32)
+    if vectors.ndim != 2 or vectors.shape[0] == 0 or k <= 0:
+        return []
+
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    query = np.asarray(query_vector, dtype=np.float32)
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+    query_similarity = vectors @ query
+    pairwise = vectors @ vectors.T
+
+    group_codes: np.ndarray | None = None
+    group_counts: np.ndarray | None = None
+    if groups is not None and max_per_group is not None:
+        _, group_codes = np.unique(np.asarray([str(group) for group in groups]), return_inverse=True)
+        group_counts = np.zeros(int(group_codes.max()) + 1, dtype=np.int64)
+
+    available = np.ones(vectors.shape[0], dtype=bool)
+    redundancy = np.full(vectors.shape[0], -np.inf, dtype=np.float32)
+    selected: list[int] = []
+    while len(selected) < k and available.any():
+        penalty = np.where(np.isfinite(redundancy), redundancy, 0.0)
+        scores = lambda_mult * query_similarity - (1.0 - lambda_mult) * penalty
+        scores = np.where(available, scores, -np.inf)
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, pairwise[best])
+        if group_codes is not None and group_counts is not None:
+            group = group_codes[best]
+            group_counts[group] += 1
+            if group_counts[group] >= max_per_group:
+                available &= group_codes != group
+    return selected
+
+
+def cap_per_document(documents: Sequence[Document], max_per_document: int) -> list[Document]:
+    counts: dict[str, int] = {}
+    capped: list[Document] = []
+    for document in documents:
+        document_id = str((document.metadata or {}).get("document_id", ""))
+        if counts.get(document_id, 0) >= max_per_document:
+            continue
+        counts[document_id] = counts.get(document_id, 0) + 1
+        capped.append(document)
+    return capped
+
+
+def merge_adjacent_chunks(documents: Sequence[Document]) -> list[Document]:
+    """같은 문서의 연속된 `chunk_index` 청크를 하나로 합치고, 청킹 overlap으로 겹친 텍스트는 한 번만 남긴다.
+
+    합쳐진 청크는 그 중 가장 순위가 높은 청크 자리에 놓인다.
+    """
+    positions: dict[tuple[str, int], int] = {}
+    for position, document in enumerate(documents):
+        metadata = document.metadata or {}
+        chunk_index = metadata.get("chunk_index")
+        if metadata.get("document_id") is None or not isinstance(chunk_index, int):
+            continue
+        positions.setdefault((str(metadata["document_id"]), chunk_index), position)
+
+    consumed: set[int] = set()
+    merged: list[tuple[int, Document]] = []
+    for position, document in enumerate(documents):
+        if position in consumed:
+            continue
+        metadata = document.metadata or {}
+        chunk_index = metadata.get("chunk_index")
+        if metadata.get("document_id") is None or not isinstance(chunk_index, int):
+            merged.append((position, document))
+            continue
+
+        document_id = str(metadata["document_id"])
+        start = chunk_index
+        while (document_id, start - 1) in positions and positions[(document_id, start - 1)] not in consumed:
+            start -= 1
+        run: list[int] = []
+        cursor = start
+        while (document_id, cursor) in positions and positions[(document_id, cursor)] not in consumed:
+            run.append(positions[(document_id, cursor)])
+            cursor += 1
+
+        consumed.update(run)
+        if len(run) == 1:
+            merged.append((position, document))
+            continue
+
+        text = documents[run[0]].page_content
+        for member in run[1:]:
+            text = _join_with_overlap(text, documents[member].page_content)
+        first = documents[run[0]]
+        merged.append(
+            (
+                min(run),
+                Document(
+                    id=first.id,
+                    page_content=text,
+                    metadata={**(first.metadata or {}), "merged_chunk_indexes": list(range(start, cursor))},
+                ),
+            )
+        )
+
+    merged.sort(key=lambda item: item[0])
+    return [document for _, document in merged]
+
+
+def _join_with_overlap(left: str, right: str, *, max_overlap: int = MAX_OVERLAP_CHARS) -> str:
+    limit = min(len(left), len(right), max_overlap)
+    for size in range(limit, MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return f"{left}\n{right}"
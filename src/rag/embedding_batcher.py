@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from langchain_core.embeddings import Embeddings
+
+from src.rag.embedding_cache import embed_query_batch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 16
+DEFAULT_MAX_WAIT_MS = 5.0
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+@dataclass(frozen=True, slots=True)
+class BatcherStats:
+    requests: int
+    batches: int
+    embedded_texts: int
+    max_batch_size: int
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.requests / self.batches if self.batches else 0.0
+
+
+class QueryEmbeddingBatcher(Embeddings):
+    """동시 요청의 질의 임베딩을 짧은 시간 창 동안 모아 한 번의 배치 호출로 보내는 래퍼.
+
+    첫 요청 후 `max_wait_ms`가 지나거나 `max_batch_size`개가 모이면 배치를 보내고, 호출자는 Future로 벡터를 받는다.
+    배치 호출은 별도 스레드 풀에서 실행되므로 API 응답을 기다리는 동안에도 다음 배치를 모은다.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        *,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        self.embeddings = embeddings
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max(0.0, max_wait_ms) / 1000.0
+        self._queue: queue.SimpleQueue[tuple[str, Future[list[float]]] | None] = queue.SimpleQueue()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="query-embed")
+        self._lock = threading.Lock()
+        self._closed = False
+        self._requests = 0
+        self._batches = 0
+        self._embedded_texts = 0
+        self._max_batch = 0
+        self._collector = threading.Thread(target=self._collect, name="query-embed-batcher", daemon=True)
+        self._collector.start()
+
+    def submit(self, text: str) -> Future[list[float]]:
+        future: Future[list[float]] = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("QueryEmbeddingBatcher is closed")
+            self._requests += 1
+            # 종료 표시와 같은 잠금 안에서 넣어야 요청이 종료 신호(None) 뒤에 들어가 영영 처리되지 않는 일이 없다.
+            self._queue.put((text, future))
+        return future
+
+    def embed_query(self, text: str) -> list[float]:
+        try:
+            future = self.submit(text)
+        except RuntimeError:
+            # 종료 이후 호출은 배치 없이 바로 임베딩한다.
+            return self.embeddings.embed_query(text)
+        return future.result()
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """여러 질의를 한꺼번에 큐에 넣어 다른 호출자의 질의와 함께 배치로 임베딩한다."""
+        try:
+            futures = [self.submit(text) for text in texts]
+        except RuntimeError:
+            return embed_query_batch(self.embeddings, texts)
+        return [future.result() for future in futures]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        try:
+            future = self.submit(text)
+        except RuntimeError:
+            return await self.embeddings.aembed_query(text)
+        return await asyncio.wrap_future(future)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def stats(self) -> BatcherStats:
+        with self._lock:
+            return BatcherStats(
+                requests=self._requests,
+                batches=self._batches,
+                embedded_texts=self._embedded_texts,
+                max_batch_size=self._max_batch,
+            )
+
+    def close(self) -> None:
+        """대기 중인 요청을 마저 처리하고 수집 스레드를 멈춘다."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._collector.join()
+        self._executor.shutdown(wait=True)
+        stats = self.stats()
+        logger.info(
+            "Query embedding batcher requests=%d batches=%d mean_batch=%.2f max_batch=%d",
+            stats.requests,
+            stats.batches,
+            stats.mean_batch_size,
+            stats.max_batch_size,
+        )
+
+    def _collect(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait_seconds
+            closing = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            self._executor.submit(self._dispatch, batch)
+            if closing:
+                return
+
+    def _dispatch(self, batch: list[tuple[str, Future[list[float]]]]) -> None:
+        # 같은 배치 안의 동일 질의는 한 번만 임베딩한다.
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        with self._lock:
+            self._batches += 1
+            self._embedded_texts += len(texts)
+            self._max_batch = max(self._max_batch, len(batch))
+
+        try:
+            if len(texts) == 1:
+                vectors = [self.embeddings.embed_query(texts[0])]
+            else:
+                # 질문은 반드시 질의 모델로 임베딩한다. embed_documents는 Upstage에서 "-passage" 모델이다.
+                vectors = embed_query_batch(self.embeddings, texts)
+            by_text = dict(zip(texts, (list(vector) for vector in vectors), strict=True))
+        except Exception as error:  # noqa: BLE001 - 배치 실패는 배치에 속한 모든 호출자에게 그대로 전달한다.
+            logger.warning("Batched query embedding failed size=%d: %s", len(texts), error)
+            for _, future in batch:
+                future.set_exception(error)
+            return
+
+        for text, future in batch:
+            future.set_result(by_text[text])
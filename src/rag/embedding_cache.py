@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_upstage import UpstageEmbeddings
+
+from src.rag.cache import CacheStats, LRUTTLCache, normalize_question
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_AUTOSAVE_INTERVAL_SECONDS = 300.0
+
+
+def embed_query_batch(embeddings: Embeddings, texts: list[str]) -> list[list[float]]:
+    """여러 질의를 질의 모델로 임베딩한다.
+
+    Upstage의 `embed_documents`는 "-passage" 모델을 쓰므로 질문에는 쓰지 않는다.
+    `embed_queries`를 제공하는 래퍼는 그대로 쓰고, Upstage는 "-query" 모델 엔드포인트에 배치로 보내며,
+    그 외에는 질의마다 `embed_query`를 호출한다.
+    """
+    if not texts:
+        return []
+    embed_queries = getattr(embeddings, "embed_queries", None)
+    if embed_queries is not None:
+        return embed_queries(texts)
+    if isinstance(embeddings, UpstageEmbeddings):
+        params = embeddings._invocation_params
+        params["model"] = params["model"] + "-query"
+        batch_size = max(1, min(embeddings.embed_batch_size, len(texts)))
+        vectors: list[list[float]] = []
+        for start in range(0, len(texts), batch_size):
+            data = embeddings.client.create(input=texts[start : start + batch_size], **params).data
+            vectors.extend(record.embedding for record in data)
+        return vectors
+    return [embeddings.embed_query(text) for text in texts]
+
+
+class QueryEmbeddingCache:
+    """정규화 질문 + 임베딩 모델을 키로 질의 임베딩을 보관하는 LRU/TTL 캐시.
+
+    `path`를 주면 시작 시 디스크에서 읽고, 일정 간격과 `save()` 호출 시 저장해 재시작 후에도 재사용한다.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+        path: str | Path | None = None,
+        autosave_interval_seconds: float = DEFAULT_AUTOSAVE_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._cache: LRUTTLCache[tuple[str, str], list[float]] = LRUTTLCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            clock=clock,
+        )
+        self.path = Path(path) if path else None
+        self.autosave_interval_seconds = autosave_interval_seconds
+        self._clock = clock
+        self._dirty = False
+        self._last_saved_at = clock()
+        self._save_lock = threading.Lock()
+        if self.path is not None:
+            self.load()
+
+    def get_or_embed(self, text: str, embed: Callable[[str], list[float]], *, model: str) -> list[float]:
+        key = (model, normalize_question(text))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        vector = list(embed(text))
+        self._cache.put(key, vector)
+        self._dirty = True
+        self._maybe_autosave()
+        return vector
+
+    async def aget_or_embed(
+        self,
+        text: str,
+        aembed: Callable[[str], Awaitable[list[float]]],
+        *,
+        model: str,
+    ) -> list[float]:
+        key = (model, normalize_question(text))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        vector = list(await aembed(text))
+        self._cache.put(key, vector)
+        self._dirty = True
+        self._maybe_autosave()
+        return vector
+
+    def get_many_or_embed(
+        self,
+        texts: list[str],
+        embed_many: Callable[[list[str]], list[list[float]]],
+        *,
+        model: str,
+    ) -> list[list[float]]:
+        """캐시에 없는 텍스트만 모아 한 번의 배치 호출로 임베딩한다."""
+        vectors: list[list[float] | None] = []
+        misses: dict[str, list[int]] = {}
+        for position, text in enumerate(texts):
+            cached = self._cache.get((model, normalize_question(text)))
+            vectors.append(cached)
+            if cached is None:
+                misses.setdefault(text, []).append(position)
+
+        if misses:
+            miss_texts = list(misses)
+            for text, vector in zip(miss_texts, embed_many(miss_texts), strict=True):
+                vector = list(vector)
+                self._cache.put((model, normalize_question(text)), vector)
+                for position in misses[text]:
+                    vectors[position] = vector
+            self._dirty = True
+            self._maybe_autosave()
+        return [vector for vector in vectors if vector is not None]
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._save_lock:
+            items = self._cache.items()
+            keys = [[model, text, expires_at] for (model, text), _, expires_at in items]
+            lengths = np.array([len(vector) for _, vector, _ in items], dtype=np.int64)
+            vectors = (
+                np.concatenate([np.asarray(vector, dtype=np.float32) for _, vector, _ in items])
+                if items
+                else np.empty(0, dtype=np.float32)
+            )
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_name(f"{self.path.name}.tmp")
+            with temp_path.open("wb") as file:
+                np.savez(file, keys=np.array(json.dumps(keys, ensure_ascii=False)), lengths=lengths, vectors=vectors)
+            os.replace(temp_path, self.path)
+            self._dirty = False
+            self._last_saved_at = self._clock()
+        logger.debug("Saved query embedding cache entries=%d path=%s", len(items), self.path)
+
+    def load(self) -> int:
+        if self.path is None or not self.path.exists():
+            return 0
+        try:
+            with np.load(self.path) as payload:
+                keys = json.loads(str(payload["keys"]))
+                lengths = payload["lengths"]
+                vectors = payload["vectors"]
+        except Exception as error:  # noqa: BLE001 - 손상된 캐시는 버리고 새로 만든다.
+            logger.warning("Failed to load query embedding cache from %s: %s", self.path, error)
+            return 0
+
+        now = self._clock()
+        loaded = 0
+        offset = 0
+        for (model, text, expires_at), length in zip(keys, lengths, strict=True):
+            vector = vectors[offset : offset + int(length)]
+            offset += int(length)
+            if expires_at is not None and expires_at <= now:
+                continue
+            self._cache.put((model, text), vector.tolist(), expires_at=expires_at)
+            loaded += 1
+        logger.info("Loaded query embedding cache entries=%d path=%s", loaded, self.path)
+        return loaded
+
+    def _maybe_autosave(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        if self._clock() - self._last_saved_at < self.autosave_interval_seconds:
+            return
+        try:
+            self.save()
+        except OSError as error:
+            logger.warning("Failed to save query embedding cache: %s", error)
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """`embed_query`만 캐시를 거치는 임베딩 래퍼. 문서 임베딩은 그대로 위임한다."""
+
+    def __init__(self, embeddings: Embeddings, cache: QueryEmbeddingCache, *, model: str):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.cache.get_or_embed(text, self.embeddings.embed_query, model=self.model)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await self.cache.aget_or_embed(text, self.embeddings.aembed_query, model=self.model)
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """여러 질의를 캐시를 거쳐 임베딩한다. 캐시 미스만 질의 모델로 계산한다."""
+        return self.cache.get_many_or_embed(
+            texts,
+            lambda misses: embed_query_batch(self.embeddings, misses),
+            model=self.model,
+        )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import calendar
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+BROKER_KEYWORDS = (
+    "미래에셋증권",
+    "한국투자증권",
+    "삼성증권",
+    "NH투자증권",
+    "KB증권",
+    "신한투자증권",
+    "하나증권",
+    "키움증권",
+)
+
+RATING_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "매수": ("매수", "buy", "overweight", "비중확대"),
+    "중립": ("중립", "hold", "neutral", "시장수익률"),
+    "매도": ("매도", "sell", "underweight", "비중축소"),
+}
+
+# 리포트 유형은 질문이 유형을 직접 말할 때만 필터로 건다. "목표주가", "실적" 같은 주제어는 여러 유형의 리포트에
+# 함께 나오므로 필터로 걸면 후속 질문("그럼 목표주가는?")이 직전 리포트와 다른 유형이라는 이유로 빈 결과가 된다.
+REPORT_TYPE_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "실적분석": ("실적분석", "실적 분석", "실적 리뷰", "실적리뷰"),
+    "기업분석": ("기업분석", "기업 분석", "기업 리포트"),
+    "업종분석": ("업종분석", "업종 분석", "산업분석", "산업 분석", "섹터 리포트"),
+}
+
+_TICKER_PATTERN = re.compile(r"\b(\d{6})\b")
+_EXACT_DATE_PATTERN = re.compile(r"(20\d{2})[.\-/](\d{1,2})[.\-/](\d{1,2})")
+_QUARTER_PATTERN = re.compile(r"(20\d{2})\s*년\s*([1-4])\s*분기|([1-4])\s*[Qq]\s*'?(\d{2})\b")
+_HALF_PATTERN = re.compile(r"(20\d{2})\s*년\s*(상|하)반기")
+_MONTH_PATTERN = re.compile(r"(20\d{2})\s*년\s*(\d{1,2})\s*월")
+_YEAR_PATTERN = re.compile(r"(20\d{2})\s*년")
+_RECENT_PATTERN = re.compile(r"(?:최근|지난)\s*(\d+)\s*(개월|달|주|일|년)")
+_TARGET_PRICE_PATTERN = re.compile(
+    r"목표\s*주?가\s*(?:가|는|를)?\s*(\d[\d,]*)\s*(만)?\s*원?\s*(이상|이하|초과|미만|넘는|넘은)"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class QueryConstraints:
+    """질문에서 규칙으로 추출한 검색 조건. 날짜는 양 끝을 포함하는 구간이다."""
+
+    tickers: tuple[str, ...] = ()
+    brokers: tuple[str, ...] = ()
+    ratings: tuple[str, ...] = ()
+    report_types: tuple[str, ...] = ()
+    date_from: date | None = None
+    date_to: date | None = None
+    target_price_min: int | None = None
+    target_price_max: int | None = None
+
+    def resolves(self, key: str) -> bool:
+        """플래너의 단서 해소 키(`ticker`, `broker`, `date`, `target_price` 등)가 조건으로 추출됐는지 여부."""
+        if key == "date":
+            return self.date_from is not None or self.date_to is not None
+        if key == "target_price":
+            return self.target_price_min is not None or self.target_price_max is not None
+        return bool(getattr(self, f"{key}s", ()))
+
+
+def extract_constraints(query: str, *, today: date | None = None) -> QueryConstraints:
+    date_from, date_to, date_text = _extract_date_range(query, today=today or date.today())
+    price_min, price_max = _extract_target_price_range(query)
+    # "4분기" 같은 기간 표현이 리포트 유형 키워드("분기")로 다시 잡히지 않도록 제외하고 매칭한다.
+    lowered = query.replace(date_text, " ").lower() if date_text else query.lower()
+    return QueryConstraints(
+        tickers=tuple(dict.fromkeys(_TICKER_PATTERN.findall(query))),
+        brokers=tuple(broker for broker in BROKER_KEYWORDS if broker in query),
+        ratings=_first_match(lowered, RATING_KEYWORDS),
+        report_types=_first_match(lowered, REPORT_TYPE_KEYWORDS),
+        date_from=date_from,
+        date_to=date_to,
+        target_price_min=price_min,
+        target_price_max=price_max,
+    )
+
+
+def compile_filter(constraints: QueryConstraints) -> dict[str, Any]:
+    """조건을 Chroma where 식으로 변환한다. 조건이 둘 이상이면 `$and`로 묶는다.
+
+    날짜 구간은 적재 시 저장한 정수 필드(`date_int`, YYYYMMDD)로 비교해 벡터 검색 전에 후보를 줄인다.
+    """
+    clauses: list[dict[str, Any]] = []
+    for field, values in (
+        ("ticker", constraints.tickers),
+        ("broker", constraints.brokers),
+        ("rating", constraints.ratings),
+        ("report_type", constraints.report_types),
+    ):
+        if len(values) == 1:
+            clauses.append({field: values[0]})
+        elif values:
+            clauses.append({field: {"$in": list(values)}})
+
+    if constraints.date_from is not None and constraints.date_from == constraints.date_to:
+        clauses.append({"date_int": _date_int(constraints.date_from)})
+    else:
+        if constraints.date_from is not None:
+            clauses.append({"date_int": {"$gte": _date_int(constraints.date_from)}})
+        if constraints.date_to is not None:
+            clauses.append({"date_int": {"$lte": _date_int(constraints.date_to)}})
+
+    if constraints.target_price_min is not None:
+        clauses.append({"target_price": {"$gte": constraints.target_price_min}})
+    if constraints.target_price_max is not None:
+        clauses.append({"target_price": {"$lte": constraints.target_price_max}})
+
+    if not clauses:
+        return {}
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+def _first_match(lowered: str, table: dict[str, tuple[str, ...]]) -> tuple[str, ...]:
+    for value, keywords in table.items():
+        if any(keyword in lowered for keyword in keywords):
+            return (value,)
+    return ()
+
+
+def _extract_date_range(query: str, *, today: date) -> tuple[date | None, date | None, str]:
+    """기간 조건과 그 조건을 만든 원문 표현을 반환한다."""
+    match = _EXACT_DATE_PATTERN.search(query)
+    if match:
+        year, month, day = (int(part) for part in match.groups())
+        try:
+            exact = date(year, month, day)
+        except ValueError:
+            return None, None, ""
+        return exact, exact, match.group(0)
+
+    match = _QUARTER_PATTERN.search(query)
+    if match:
+        if match.group(1):
+            year, quarter = int(match.group(1)), int(match.group(2))
+        else:
+            year, quarter = 2000 + int(match.group(4)), int(match.group(3))
+        return (*_month_range(year, quarter * 3 - 2, quarter * 3), match.group(0))
+
+    match = _HALF_PATTERN.search(query)
+    if match:
+        year = int(match.group(1))
+        first_month, last_month = (1, 6) if match.group(2) == "상" else (7, 12)
+        return (*_month_range(year, first_month, last_month), match.group(0))
+
+    match = _MONTH_PATTERN.search(query)
+    if match and 1 <= int(match.group(2)) <= 12:
+        year, month = int(match.group(1)), int(match.group(2))
+        return (*_month_range(year, month, month), match.group(0))
+
+    match = _YEAR_PATTERN.search(query)
+    if match:
+        return (*_month_range(int(match.group(1)), 1, 12), match.group(0))
+
+    match = _RECENT_PATTERN.search(query)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        if unit in {"개월", "달"}:
+            start = _shift_months(today, -amount)
+        elif unit == "주":
+            start = today - timedelta(weeks=amount)
+        elif unit == "년":
+            start = _shift_months(today, -12 * amount)
+        else:
+            start = today - timedelta(days=amount)
+        return start, today, match.group(0)
+
+    for keyword in ("이번 달", "이번달"):
+        if keyword in query:
+            return today.replace(day=1), today, keyword
+    if "올해" in query:
+        return date(today.year, 1, 1), today, "올해"
+    for keyword in ("작년", "전년"):
+        if keyword in query:
+            return (*_month_range(today.year - 1, 1, 12), keyword)
+    return None, None, ""
+
+
+def _extract_target_price_range(query: str) -> tuple[int | None, int | None]:
+    match = _TARGET_PRICE_PATTERN.search(query)
+    if not match:
+        return None, None
+    amount = int(match.group(1).replace(",", ""))
+    if match.group(2):
+        amount *= 10_000
+    operator = match.group(3)
+    if operator == "이상":
+        return amount, None
+    if operator in {"초과", "넘는", "넘은"}:
+        return amount + 1, None
+    if operator == "미만":
+        return None, amount - 1
+    return None, amount
+
+
+def _month_range(year: int, first_month: int, last_month: int) -> tuple[date, date]:
+    return date(year, first_month, 1), date(year, last_month, calendar.monthrange(year, last_month)[1])
+
+
+def _shift_months(value: date, months: int) -> date:
+    month_index = value.year * 12 + value.month - 1 + months
+    year, month = divmod(month_index, 12)
+    day = min(value.day, calendar.monthrange(year, month + 1)[1])
+    return date(year, month + 1, day)
+
+
+def _date_int(value: date) -> int:
+    return value.year * 10_000 + value.month * 100 + value.day
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+DEFAULT_RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], *, k: int = DEFAULT_RRF_K) -> list[tuple[str, float]]:
+    """여러 순위 목록을 RRF(1 / (k + rank))로 합친다.
+
+    BM25 점수와 코사인 유사도는 척도가 달라 직접 더할 수 없으므로 순위만 사용한다.
+    """
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
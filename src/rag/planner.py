@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.rag.filters import QueryConstraints, compile_filter
+
+DEFAULT_CONFIDENCE_THRESHOLD = 0.75
+# 조건 단서가 전혀 없는 순수 의미 검색 질문. SelfQuery가 만들 필터도 없으므로 규칙 경로로 충분하다.
+NO_HINT_CONFIDENCE = 0.8
+
+STRATEGY_RULE_FILTER = "rule_filter"
+STRATEGY_SELF_QUERY = "self_query"
+
+# (단서 이름, 단서 패턴, 규칙 필터에서 이 단서를 해소하는 키)
+# 해소 키가 None인 단서는 규칙 추출기가 처리하지 못하므로 LLM 질의 생성이 필요하다.
+CONSTRAINT_HINTS: tuple[tuple[str, re.Pattern[str], str | None], ...] = (
+    ("ticker", re.compile(r"\d{6}"), "ticker"),
+    ("broker", re.compile(r"[가-힣A-Za-z]+증권"), "broker"),
+    ("absolute_date", re.compile(r"20\d{2}[.\-/년]\s*\d{1,2}"), "date"),
+    (
+        "relative_date",
+        re.compile(r"최근|지난|이번\s*(?:주|달|분기)|올해|작년|전년|어제|오늘|분기|상반기|하반기"),
+        "date",
+    ),
+    ("analyst", re.compile(r"애널리스트|연구원"), None),
+    ("numeric_range", re.compile(r"이상|이하|초과|미만|넘는|넘은|보다\s*(?:높|낮)"), "target_price"),
+    ("comparison", re.compile(r"비교|차이|증권사별|각\s*증권사"), None),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class QueryPlan:
+    strategy: str
+    metadata_filter: dict[str, Any]
+    confidence: float
+    constraints: QueryConstraints = field(default_factory=QueryConstraints)
+    resolved_hints: tuple[str, ...] = ()
+    unresolved_hints: tuple[str, ...] = ()
+
+    @property
+    def uses_self_query(self) -> bool:
+        return self.strategy == STRATEGY_SELF_QUERY
+
+
+@dataclass(slots=True)
+class RetrievalTrace:
+    """요청 하나의 검색 경로와 단계별 소요 시간."""
+
+    plan: QueryPlan | None = None
+    stage: str = "none"
+    timings_ms: dict[str, float] = field(default_factory=dict)
+    structured_query_cache_hit: bool = False
+    estimated_saved_ms: float = 0.0
+
+
+class QueryPlanner:
+    """규칙 기반 메타데이터 추출이 질문의 조건을 얼마나 해소했는지 점수화해 검색 경로를 고른다."""
+
+    def __init__(
+        self,
+        extract_constraints: Callable[[str], QueryConstraints],
+        *,
+        confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+    ):
+        self.extract_constraints = extract_constraints
+        self.confidence_threshold = confidence_threshold
+
+    def plan(self, query: str) -> QueryPlan:
+        constraints = self.extract_constraints(query)
+        resolved: list[str] = []
+        unresolved: list[str] = []
+        for name, pattern, filter_key in CONSTRAINT_HINTS:
+            if not pattern.search(query):
+                continue
+            if filter_key is not None and constraints.resolves(filter_key):
+                resolved.append(name)
+            else:
+                unresolved.append(name)
+
+        hint_count = len(resolved) + len(unresolved)
+        confidence = NO_HINT_CONFIDENCE if hint_count == 0 else len(resolved) / hint_count
+        strategy = STRATEGY_RULE_FILTER if confidence >= self.confidence_threshold else STRATEGY_SELF_QUERY
+        return QueryPlan(
+            strategy=strategy,
+            metadata_filter=compile_filter(constraints),
+            confidence=confidence,
+            constraints=constraints,
+            resolved_hints=tuple(resolved),
+            unresolved_hints=tuple(unresolved),
+        )
@@ -1,13 +1,29 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-import re
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from typing import Any
 
+import numpy as np
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_openai import ChatOpenAI
 
+from src.pipeline.embedder import generate_chunk_id
+from src.pipeline.lexical_index import LexicalIndex
+from src.pipeline.metadata_index import MetadataIndex
+from src.rag.cache import LRUTTLCache, normalize_question
+from src.rag.diversify import DEFAULT_MMR_LAMBDA, cap_per_document, maximal_marginal_relevance, merge_adjacent_chunks
+from src.rag.embedding_cache import embed_query_batch
+from src.rag.filters import compile_filter, extract_constraints
+from src.rag.hybrid import DEFAULT_RRF_K, reciprocal_rank_fusion
+from src.rag.planner import DEFAULT_CONFIDENCE_THRESHOLD, QueryPlan, QueryPlanner, RetrievalTrace
+
 try:
     from langchain.chains.query_constructor.schema import AttributeInfo
     from langchain.retrievers.self_query.base import SelfQueryRetriever
@@ -21,28 +37,62 @@ DOCUMENT_CONTENT_DESCRIPTION = (
     "증권사 애널리스트 리포트 텍스트. 실적 분석, 목표주가, 투자의견, 밸류에이션, 업종 전망을 포함한다."
 )
 
-BROKER_KEYWORDS = (
-    "미래에셋증권",
-    "한국투자증권",
-    "삼성증권",
-    "NH투자증권",
-    "KB증권",
-    "신한투자증권",
-    "하나증권",
-    "키움증권",
-)
+SELF_QUERY_LATENCY_SMOOTHING = 0.2
+RETRIEVAL_MODE_SEQUENTIAL = "sequential"
+RETRIEVAL_MODE_HEDGED = "hedged"
+DEFAULT_DEADLINE_SECONDS = 3.0
+DEFAULT_HEDGE_MAX_WORKERS = 16
+DEFAULT_HYBRID_CANDIDATE_K = 20
+# 메타데이터 인덱스로 사전 필터를 못 할 때 BM25 결과를 넉넉히 뽑아 필터 조회 후 남는 후보를 확보한다.
+LEXICAL_OVERFETCH = 5
+DEFAULT_EXACT_SCAN_MAX_CANDIDATES = 2000
+DEFAULT_MMR_FETCH_K = 20
+DEFAULT_BATCH_MAX_WORKERS = 8
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000.0
+
+
+def _cosine_relevance(distance: float) -> float:
+    return 1.0 - distance
+
+
+def _document_chunk_id(document: Document) -> str:
+    if document.id:
+        return str(document.id)
+    metadata = document.metadata or {}
+    return generate_chunk_id(str(metadata.get("document_id", "unknown_document")), int(metadata.get("chunk_index", 0)))
+
+
+class _QueryVectorMemo:
+    """요청 하나에서 같은 텍스트를 두 번 임베딩하지 않도록 결과를 보관한다.
+
+    hedged 모드에서는 여러 검색 경로가 동시에 접근하므로, 먼저 도착한 쪽이 임베딩하는 동안 나머지는 기다린다.
+    """
 
-RATING_KEYWORDS: dict[str, tuple[str, ...]] = {
-    "매수": ("매수", "buy", "overweight", "비중확대"),
-    "중립": ("중립", "hold", "neutral", "시장수익률"),
-    "매도": ("매도", "sell", "underweight", "비중축소"),
-}
+    def __init__(
+        self,
+        embed_query: Callable[[str], list[float]] | None,
+        *,
+        vectors: dict[str, list[float]] | None = None,
+    ):
+        self._embed_query = embed_query
+        # 일괄 검색에서는 미리 배치 임베딩한 벡터를 넣어 둔다.
+        self._vectors: dict[str, list[float]] = dict(vectors or {})
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return self._embed_query is not None
 
-REPORT_TYPE_KEYWORDS: dict[str, tuple[str, ...]] = {
-    "실적분석": ("실적", "분기", "컨센서스"),
-    "기업분석": ("기업", "밸류에이션", "목표주가"),
-    "업종분석": ("업종", "섹터", "산업"),
-}
+    def get(self, text: str) -> list[float]:
+        if self._embed_query is None:
+            raise RuntimeError("Query embedding function is not available")
+        with self._lock:
+            if text not in self._vectors:
+                self._vectors[text] = self._embed_query(text)
+            return self._vectors[text]
 
 
 def _metadata_field_info() -> list[Any]:
@@ -52,6 +102,7 @@ def _metadata_field_info() -> list[Any]:
         AttributeInfo(name="company_name", description="종목명", type="string"),
         AttributeInfo(name="ticker", description="종목코드(6자리)", type="string"),
         AttributeInfo(name="date", description="리포트 발행일(YYYY-MM-DD)", type="string"),
+        AttributeInfo(name="date_int", description="리포트 발행일 정수(YYYYMMDD), 기간 비교용", type="integer"),
         AttributeInfo(name="broker", description="증권사명", type="string"),
         AttributeInfo(name="analyst", description="애널리스트명", type="string"),
         AttributeInfo(name="report_type", description="리포트 유형", type="string"),
@@ -72,11 +123,70 @@ class ReportRetriever:
         llm_model: str = "gpt-4o-mini",
         k: int = 5,
         score_threshold: float = 0.3,
+        search_store: Any | None = None,
+        query_embeddings: Embeddings | None = None,
+        planner_confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+        structured_query_cache_size: int = 1024,
+        structured_query_cache_ttl_seconds: float | None = 3600,
+        retrieval_mode: str = RETRIEVAL_MODE_SEQUENTIAL,
+        deadline_seconds: float = DEFAULT_DEADLINE_SECONDS,
+        hedge_max_workers: int = DEFAULT_HEDGE_MAX_WORKERS,
+        lexical_index: LexicalIndex | None = None,
+        hybrid_candidate_k: int = DEFAULT_HYBRID_CANDIDATE_K,
+        hybrid_rrf_k: int = DEFAULT_RRF_K,
+        hybrid_min_lexical_score: float = 0.0,
+        metadata_index: MetadataIndex | None = None,
+        exact_scan_max_candidates: int = DEFAULT_EXACT_SCAN_MAX_CANDIDATES,
+        mmr_enabled: bool = False,
+        mmr_lambda: float = DEFAULT_MMR_LAMBDA,
+        mmr_fetch_k: int = DEFAULT_MMR_FETCH_K,
+        max_chunks_per_document: int | None = None,
+        merge_adjacent: bool = False,
+        self_query_enabled: bool = True,
     ):
         self.vectorstore = vectorstore
+        # 유사도 검색과 청크 조회(`get`) 대상. 2단계 검색 모드에서는 TwoStageVectorStore가 주입된다.
+        self.search_store = search_store or vectorstore
+        # 질의 임베딩 전용 함수. 캐시 래퍼가 주입되면 벡터스토어 임베딩 대신 사용한다.
+        self.query_embeddings = query_embeddings
         self.k = k
         self.score_threshold = score_threshold
         self.retriever: Any | None = None
+        self._relevance_fn: Callable[[float], float] | None = None
+        self.planner = QueryPlanner(extract_constraints, confidence_threshold=planner_confidence_threshold)
+        self._structured_query_cache: LRUTTLCache[str, tuple[str, dict[str, Any]]] = LRUTTLCache(
+            max_entries=structured_query_cache_size,
+            ttl_seconds=structured_query_cache_ttl_seconds,
+        )
+        self._self_query_constructor_ms = 0.0
+        if retrieval_mode not in {RETRIEVAL_MODE_SEQUENTIAL, RETRIEVAL_MODE_HEDGED}:
+            raise ValueError(f"Unsupported retrieval mode: {retrieval_mode}")
+        self.retrieval_mode = retrieval_mode
+        self.deadline_seconds = deadline_seconds
+        self.hedge_max_workers = hedge_max_workers
+        self._hedge_executors: dict[str, ThreadPoolExecutor] = {}
+        self._hedge_executor_lock = threading.Lock()
+        # 실행 중인 SelfQuery 호출 수 상한. deadline 뒤에도 끝날 때까지 슬롯을 쥔다.
+        self._self_query_slots = threading.BoundedSemaphore(max(1, hedge_max_workers))
+        # 규칙 필터/무필터 검색에서 벡터 결과와 RRF로 합칠 BM25 역색인.
+        self.lexical_index = lexical_index
+        self.hybrid_candidate_k = hybrid_candidate_k
+        self.hybrid_rrf_k = hybrid_rrf_k
+        # 벡터 점수가 score_threshold에 못 미쳐도 BM25 점수가 이 값 이상이면 BM25 전용 결과로 받아들인다. 0이면 끈다.
+        self.hybrid_min_lexical_score = hybrid_min_lexical_score
+        # 선택도가 높은 필터는 후보 ID를 먼저 구해 ANN 대신 정확 스캔한다.
+        self.metadata_index = metadata_index
+        self.exact_scan_max_candidates = exact_scan_max_candidates
+        # 검색 후 중복 제거: 후보를 mmr_fetch_k개 가져와 MMR/문서당 상한으로 k개를 고르고 연속 청크를 합친다.
+        self.mmr_enabled = mmr_enabled
+        self.mmr_lambda = mmr_lambda
+        self.mmr_fetch_k = mmr_fetch_k
+        self.max_chunks_per_document = max_chunks_per_document
+        self.merge_adjacent = merge_adjacent
+
+        if not self_query_enabled:
+            logger.info("SelfQueryRetriever is disabled. Similarity fallback is used.")
+            return
 
         if SelfQueryRetriever is None or AttributeInfo is None:
             logger.info("SelfQueryRetriever is unavailable in this LangChain version. Similarity fallback is used.")
@@ -103,28 +213,435 @@ class ReportRetriever:
         except Exception as error:  # noqa: BLE001 - SelfQuery 구성 실패 시 fallback 검색 사용
             logger.warning("SelfQueryRetriever initialization failed. Similarity fallback is used: %s", error)
 
-    def retrieve(self, query: str, k: int | None = None) -> list[Document]:
-        limit = k or self.k
-        metadata_filter = self._build_metadata_filter(query)
+    def retrieve(
+        self,
+        query: str,
+        k: int | None = None,
+        *,
+        scope: dict[str, Any] | None = None,
+    ) -> list[Document]:
+        documents, _ = self.retrieve_with_trace(query, k=k, scope=scope)
+        return documents
+
+    def retrieve_with_trace(
+        self,
+        query: str,
+        k: int | None = None,
+        *,
+        scope: dict[str, Any] | None = None,
+    ) -> tuple[list[Document], RetrievalTrace]:
+        """`scope`(메타데이터 where 식)를 주면 SelfQuery 없이 그 범위 안에서만 검색한다. 스레드 후속 질문용."""
+        # 한 요청 안의 SelfQuery/필터/무필터 검색이 같은 질의 임베딩을 재사용하도록 요청 단위로 보관한다.
+        return self._retrieve(
+            query,
+            limit=k or self.k,
+            query_vectors=_QueryVectorMemo(self._query_embedder()),
+            scope=scope,
+        )
+
+    async def aretrieve(
+        self,
+        query: str,
+        k: int | None = None,
+        *,
+        scope: dict[str, Any] | None = None,
+    ) -> list[Document]:
+        documents, _ = await self.aretrieve_with_trace(query, k=k, scope=scope)
+        return documents
+
+    async def aretrieve_with_trace(
+        self,
+        query: str,
+        k: int | None = None,
+        *,
+        scope: dict[str, Any] | None = None,
+    ) -> tuple[list[Document], RetrievalTrace]:
+        """비동기 검색. 질의 임베딩만 비동기 API로 받는다.
+
+        나머지 `_retrieve`(로컬 인덱스 검색, 그리고 SelfQuery 경로의 동기 LLM 질의 생성 호출)는 `asyncio.to_thread`로
+        기본 스레드 풀에서 실행한다. 이벤트 루프는 막지 않지만 SelfQuery를 타는 질문은 LLM 응답을 기다리는 동안 풀의
+        스레드 하나를 쥐므로, 동시 처리량은 `SLACK_MAX_CONCURRENT_QUESTIONS`와 기본 풀 크기 중 작은 쪽에 묶인다.
+        """
+        embed_query = self._query_embedder()
+        vectors: dict[str, list[float]] = {}
+        embeddings = self.query_embeddings or getattr(self.search_store, "embeddings", None)
+        if embed_query is not None and embeddings is not None:
+            started = time.perf_counter()
+            vectors[query] = await embeddings.aembed_query(query)
+            embedding_ms = _elapsed_ms(started)
+        documents, trace = await asyncio.to_thread(
+            self._retrieve,
+            query,
+            limit=k or self.k,
+            query_vectors=_QueryVectorMemo(embed_query, vectors=vectors),
+            scope=scope,
+        )
+        if vectors:
+            trace.timings_ms["async_embedding"] = embedding_ms
+        return documents, trace
+
+    def retrieve_many(
+        self,
+        queries: list[str],
+        k: int | None = None,
+        *,
+        max_workers: int = DEFAULT_BATCH_MAX_WORKERS,
+    ) -> list[tuple[list[Document], RetrievalTrace]]:
+        """여러 질문을 한 번에 검색한다. 결과는 입력 순서를 따른다.
+
+        질의 임베딩은 중복을 제거해 배치 호출로 한 번에 계산하고, 질문별 검색은 스레드 풀에서 병렬로 실행한다.
+        배치 임베딩 시간은 각 trace의 `timings_ms["batch_embedding"]`에 공통으로 기록된다.
+        """
+        if not queries:
+            return []
+
+        embed_query = self._query_embedder()
+        started = time.perf_counter()
+        vectors = self._embed_queries(list(dict.fromkeys(queries))) if embed_query is not None else {}
+        batch_embedding_ms = _elapsed_ms(started)
 
-        if self.retriever is not None:
+        def _run(query: str) -> tuple[list[Document], RetrievalTrace]:
+            documents, trace = self._retrieve(
+                query,
+                limit=k or self.k,
+                query_vectors=_QueryVectorMemo(embed_query, vectors=vectors),
+            )
+            trace.timings_ms["batch_embedding"] = batch_embedding_ms
+            return documents, trace
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="retrieve-many") as executor:
+            results = list(executor.map(_run, queries))
+        logger.info(
+            "Batch retrieval queries=%d unique=%d batch_embedding_ms=%.1f total_ms=%.1f",
+            len(queries),
+            len(vectors),
+            batch_embedding_ms,
+            _elapsed_ms(started),
+        )
+        return results
+
+    def _embed_queries(self, texts: list[str]) -> dict[str, list[float]]:
+        embeddings = self.query_embeddings or getattr(self.search_store, "embeddings", None)
+        if embeddings is None or not hasattr(embeddings, "embed_query"):
+            return {}
+        try:
+            # 질문은 질의 모델로만 임베딩한다. 캐시 래퍼는 캐시 미스만 배치로 계산한다.
+            return dict(zip(texts, embed_query_batch(embeddings, texts), strict=True))
+        except Exception as error:  # noqa: BLE001 - 배치 임베딩이 실패하면 질문별 임베딩으로 진행한다.
+            logger.warning("Batch query embedding failed. Per-query embedding is used: %s", error)
+            return {}
+
+    def _retrieve(
+        self,
+        query: str,
+        *,
+        limit: int,
+        query_vectors: _QueryVectorMemo,
+        scope: dict[str, Any] | None = None,
+    ) -> tuple[list[Document], RetrievalTrace]:
+        started = time.perf_counter()
+        plan = self.planner.plan(query)
+        trace = RetrievalTrace(plan=plan)
+
+        fetch_limit = max(limit, self.mmr_fetch_k) if self._diversifies else limit
+        if scope is not None:
+            documents = self._run_scoped(
+                query,
+                limit=fetch_limit,
+                plan=plan,
+                scope=scope,
+                query_vectors=query_vectors,
+                trace=trace,
+            )
+        else:
+            documents = self._run_plan(query, limit=fetch_limit, plan=plan, query_vectors=query_vectors, trace=trace)
+        if self._diversifies and documents:
+            diversify_started = time.perf_counter()
+            documents = self._diversify(query, documents, limit=limit, query_vectors=query_vectors)
+            trace.timings_ms["diversify"] = _elapsed_ms(diversify_started)
+        trace.timings_ms["total"] = _elapsed_ms(started)
+        logger.info(
+            "Retrieval strategy=%s confidence=%.2f stage=%s unresolved=%s sq_cache_hit=%s "
+            "total_ms=%.1f estimated_saved_ms=%.1f",
+            plan.strategy,
+            plan.confidence,
+            trace.stage,
+            ",".join(plan.unresolved_hints) or "-",
+            trace.structured_query_cache_hit,
+            trace.timings_ms["total"],
+            trace.estimated_saved_ms,
+        )
+        return documents, trace
+
+    @property
+    def _diversifies(self) -> bool:
+        return self.mmr_enabled or self.max_chunks_per_document is not None or self.merge_adjacent
+
+    def _diversify(
+        self,
+        query: str,
+        documents: list[Document],
+        *,
+        limit: int,
+        query_vectors: _QueryVectorMemo,
+    ) -> list[Document]:
+        selected: list[Document] | None = None
+        if self.mmr_enabled and query_vectors.available:
+            vectors = self._stored_embeddings(documents)
+            if vectors is not None:
+                order = maximal_marginal_relevance(
+                    query_vectors.get(query),
+                    vectors,
+                    k=limit,
+                    lambda_mult=self.mmr_lambda,
+                    groups=[(doc.metadata or {}).get("document_id", "") for doc in documents],
+                    max_per_group=self.max_chunks_per_document,
+                )
+                selected = [documents[index] for index in order]
+
+        if selected is None:
+            capped = documents
+            if self.max_chunks_per_document is not None:
+                capped = cap_per_document(documents, self.max_chunks_per_document)
+            selected = capped[:limit]
+
+        if self.merge_adjacent:
+            selected = merge_adjacent_chunks(selected)
+        return selected
+
+    def _stored_embeddings(self, documents: list[Document]) -> np.ndarray | None:
+        """검색 결과 청크의 저장된 임베딩을 한 번에 읽는다. 하나라도 없으면 None."""
+        ids = [_document_chunk_id(doc) for doc in documents]
+        get = getattr(self.search_store, "get", None)
+        if get is None:
+            return None
+        try:
+            payload = get(ids=list(dict.fromkeys(ids)), include=["embeddings"])
+        except Exception as error:  # noqa: BLE001 - 임베딩을 못 읽으면 점수 순서를 그대로 쓴다.
+            logger.debug("Fetching stored embeddings failed: %s", error)
+            return None
+        embeddings = payload.get("embeddings")
+        if embeddings is None:
+            return None
+        vectors_by_id = {
+            str(chunk_id): vector for chunk_id, vector in zip(payload.get("ids", []), embeddings, strict=False)
+        }
+        if any(chunk_id not in vectors_by_id for chunk_id in ids):
+            return None
+        return np.asarray([vectors_by_id[chunk_id] for chunk_id in ids], dtype=np.float32)
+
+    def _run_plan(
+        self,
+        query: str,
+        *,
+        limit: int,
+        plan: QueryPlan,
+        query_vectors: _QueryVectorMemo,
+        trace: RetrievalTrace,
+    ) -> list[Document]:
+        metadata_filter = plan.metadata_filter
+
+        if self.retrieval_mode == RETRIEVAL_MODE_HEDGED and self.retriever is not None and plan.uses_self_query:
+            return self._run_hedged(query, limit=limit, plan=plan, query_vectors=query_vectors, trace=trace)
+
+        if self.retriever is not None and plan.uses_self_query:
+            started = time.perf_counter()
             try:
-                docs = self.retriever.invoke(query)
+                docs = self._self_query_search(query, k=limit, query_vectors=query_vectors, trace=trace)
                 if docs:
+                    trace.stage = "self_query"
                     return docs[:limit]
             except Exception as error:  # noqa: BLE001
                 logger.warning("SelfQuery retrieval failed. Similarity fallback is used: %s", error)
+            finally:
+                trace.timings_ms["self_query"] = _elapsed_ms(started)
+        elif self.retriever is not None:
+            # 규칙 추출로 충분한 질문은 LLM 질의 생성을 건너뛴다. 절약 시간은 최근 측정치의 이동 평균으로 추정한다.
+            trace.estimated_saved_ms = self._self_query_constructor_ms
 
         if metadata_filter:
+            started = time.perf_counter()
             filtered_docs = self._fallback_similarity_search(
                 query=query,
                 k=limit,
                 metadata_filter=metadata_filter,
+                query_vectors=query_vectors,
             )
+            trace.timings_ms["rule_filter"] = _elapsed_ms(started)
             if filtered_docs:
+                trace.stage = "rule_filter"
                 return filtered_docs
 
-        return self._fallback_similarity_search(query=query, k=limit)
+        started = time.perf_counter()
+        documents = self._fallback_similarity_search(query=query, k=limit, query_vectors=query_vectors)
+        trace.timings_ms["unfiltered"] = _elapsed_ms(started)
+        trace.stage = "unfiltered"
+        return documents
+
+    def _run_scoped(
+        self,
+        query: str,
+        *,
+        limit: int,
+        plan: QueryPlan,
+        scope: dict[str, Any],
+        query_vectors: _QueryVectorMemo,
+        trace: RetrievalTrace,
+    ) -> list[Document]:
+        # 질문에서 추출한 조건(증권사, 기간 등)은 범위 안에서 한 번 더 좁히는 데 쓴다.
+        metadata_filter = {"$and": [scope, plan.metadata_filter]} if plan.metadata_filter else scope
+        started = time.perf_counter()
+        documents = self._fallback_similarity_search(
+            query=query,
+            k=limit,
+            metadata_filter=metadata_filter,
+            query_vectors=query_vectors,
+        )
+        trace.timings_ms["scoped"] = _elapsed_ms(started)
+        trace.stage = "scoped"
+        return documents
+
+    def _run_hedged(
+        self,
+        query: str,
+        *,
+        limit: int,
+        plan: QueryPlan,
+        query_vectors: _QueryVectorMemo,
+        trace: RetrievalTrace,
+    ) -> list[Document]:
+        """SelfQuery 경로와 규칙 필터 경로를 동시에 시작해 먼저 나온 유효 결과를 반환한다.
+
+        두 경로가 모두 빈 결과면 무필터 검색을 한 번 한다. deadline이 지나면 결과 없이 반환한다.
+        버려진 SelfQuery 호출은 끝날 때까지 전용 슬롯을 차지한다. 슬롯이 모두 차 있으면 SelfQuery 없이 규칙 경로만 써서
+        새 요청이 버려진 LLM 호출 뒤에 줄 서서 deadline을 넘기지 않게 한다.
+        """
+        started = time.perf_counter()
+        path_trace = RetrievalTrace(plan=plan)
+
+        def _self_query_path() -> tuple[str, list[Document]]:
+            # 버려진 호출이 요청의 trace를 고치지 않도록 경로 전용 trace에 기록하고, 이긴 경우에만 옮긴다.
+            docs = self._self_query_search(query, k=limit, query_vectors=query_vectors, trace=path_trace)
+            return "self_query", docs[:limit]
+
+        def _rule_path() -> tuple[str, list[Document]]:
+            return "rule_filter", self._fallback_similarity_search(
+                query=query,
+                k=limit,
+                metadata_filter=plan.metadata_filter,
+                query_vectors=query_vectors,
+            )
+
+        pending: set[Future[tuple[str, list[Document]]]] = set()
+        if self._self_query_slots.acquire(blocking=False):
+            try:
+                self_query_future = self._get_hedge_executor("self_query").submit(_self_query_path)
+            except BaseException:
+                self._self_query_slots.release()
+                raise
+            # 완료 콜백은 시작 전에 취소된 작업에도 불리므로 어떤 경우에도 슬롯이 돌아온다.
+            self_query_future.add_done_callback(lambda _: self._self_query_slots.release())
+            pending.add(self_query_future)
+        else:
+            logger.info("All SelfQuery slots are busy. Hedged retrieval uses the rule path only.")
+        if plan.metadata_filter:
+            pending.add(self._get_hedge_executor("rule").submit(_rule_path))
+
+        deadline = started + self.deadline_seconds
+        try:
+            while pending:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        stage, docs = future.result()
+                    except Exception as error:  # noqa: BLE001 - 한 경로의 실패는 다른 경로 결과로 대체한다.
+                        logger.warning("Hedged retrieval path failed: %s", error)
+                        continue
+                    if docs:
+                        if stage == "self_query":
+                            trace.structured_query_cache_hit = path_trace.structured_query_cache_hit
+                        trace.stage = f"hedged_{stage}"
+                        return docs
+        finally:
+            for future in pending:
+                future.cancel()
+            trace.timings_ms["hedged"] = _elapsed_ms(started)
+
+        if pending:
+            trace.stage = "deadline_exceeded"
+            return []
+
+        # 두 경로 모두 결과가 없을 때만 조건을 버리고 검색한다.
+        fallback_started = time.perf_counter()
+        documents = self._fallback_similarity_search(query=query, k=limit, query_vectors=query_vectors)
+        trace.timings_ms["unfiltered"] = _elapsed_ms(fallback_started)
+        trace.stage = "hedged_unfiltered" if documents else "hedged_empty"
+        return documents
+
+    def _get_hedge_executor(self, path: str) -> ThreadPoolExecutor:
+        """경로별 스레드 풀. SelfQuery 풀은 슬롯 수와 크기가 같아 제출한 작업이 큐에서 기다리지 않는다."""
+        with self._hedge_executor_lock:
+            executor = self._hedge_executors.get(path)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=self.hedge_max_workers,
+                    thread_name_prefix=f"retrieval-hedge-{path}",
+                )
+                self._hedge_executors[path] = executor
+            return executor
+
+    def _self_query_search(
+        self,
+        query: str,
+        *,
+        k: int,
+        query_vectors: _QueryVectorMemo,
+        trace: RetrievalTrace | None = None,
+    ) -> list[Document]:
+        retriever = self.retriever
+        query_constructor = getattr(retriever, "query_constructor", None)
+        prepare_query = getattr(retriever, "_prepare_query", None)
+        if query_constructor is None or prepare_query is None or not query_vectors.available:
+            return retriever.invoke(query)  # type: ignore[union-attr]
+
+        cache_key = normalize_question(query)
+        cached = self._structured_query_cache.get(cache_key)
+        if cached is not None:
+            search_query, search_kwargs = cached
+            if trace is not None:
+                trace.structured_query_cache_hit = True
+        else:
+            # SelfQueryRetriever.invoke와 같은 순서로 구조화 질의를 만들되, 검색은 요청 단위 임베딩으로 수행한다.
+            started = time.perf_counter()
+            structured_query = query_constructor.invoke({"query": query})
+            search_query, search_kwargs = prepare_query(query, structured_query)
+            self._record_self_query_latency(_elapsed_ms(started))
+            # search_kwargs의 k는 SelfQueryRetriever를 만들 때 넣은 기본값이라 요청 k를 가린다.
+            # 질문에 개수가 명시된 경우(limit)만 상한으로 남긴다.
+            search_kwargs = {key: value for key, value in search_kwargs.items() if key != "k"}
+            limit = getattr(structured_query, "limit", None)
+            if limit:
+                search_kwargs["limit"] = int(limit)
+            self._structured_query_cache.put(cache_key, (search_query, search_kwargs))
+
+        return self._vector_similarity_search(
+            query_vectors.get(search_query.strip() or query),
+            k=min(k, int(search_kwargs.get("limit", k))),
+            metadata_filter=search_kwargs.get("filter"),
+            score_threshold=float(search_kwargs.get("score_threshold", self.score_threshold)),
+        )
+
+    def _record_self_query_latency(self, elapsed_ms: float) -> None:
+        if self._self_query_constructor_ms == 0.0:
+            self._self_query_constructor_ms = elapsed_ms
+            return
+        self._self_query_constructor_ms = (
+            SELF_QUERY_LATENCY_SMOOTHING * elapsed_ms
+            + (1 - SELF_QUERY_LATENCY_SMOOTHING) * self._self_query_constructor_ms
+        )
 
     def _fallback_similarity_search(
         self,
@@ -132,10 +649,21 @@ class ReportRetriever:
         query: str,
         k: int,
         metadata_filter: dict[str, Any] | None = None,
+        query_vectors: _QueryVectorMemo | None = None,
     ) -> list[Document]:
+        if query_vectors is not None and query_vectors.available:
+            if self.lexical_index is not None:
+                return self._hybrid_search(query, query_vectors.get(query), k=k, metadata_filter=metadata_filter)
+            return self._vector_similarity_search(
+                query_vectors.get(query),
+                k=k,
+                metadata_filter=metadata_filter,
+                score_threshold=self.score_threshold,
+            )
+
         with_scores = self._call_with_optional_filter(
             "similarity_search_with_relevance_scores",
-            query=query,
+            query,
             k=k,
             metadata_filter=metadata_filter,
         )
@@ -144,7 +672,7 @@ class ReportRetriever:
 
         docs = self._call_with_optional_filter(
             "similarity_search",
-            query=query,
+            query,
             k=k,
             metadata_filter=metadata_filter,
         )
@@ -152,22 +680,234 @@ class ReportRetriever:
             return docs
         return []
 
+    def _hybrid_search(
+        self,
+        query: str,
+        embedding: list[float],
+        *,
+        k: int,
+        metadata_filter: dict[str, Any] | None,
+    ) -> list[Document]:
+        """벡터 검색과 BM25 검색 결과를 RRF로 합친다.
+
+        BM25는 메타데이터 필터를 통과한 청크 안에서만 순위를 매긴다. BM25에만 걸린 청크는 저장된 벡터의 점수가
+        score_threshold 이상이거나 BM25 점수가 `hybrid_min_lexical_score` 이상일 때만 결과에 넣는다.
+        """
+        candidate_k = max(k, self.hybrid_candidate_k)
+        vector_docs = self._vector_similarity_search(
+            embedding,
+            k=candidate_k,
+            metadata_filter=metadata_filter,
+            score_threshold=self.score_threshold,
+        )
+
+        started = time.perf_counter()
+        try:
+            self.lexical_index.refresh_if_changed()  # type: ignore[union-attr]
+            allowed_ids = self._lexical_allowed_ids(metadata_filter)
+            lexical_k = (
+                candidate_k if allowed_ids is not None or not metadata_filter else candidate_k * LEXICAL_OVERFETCH
+            )
+            lexical_hits = self.lexical_index.search(query, k=lexical_k, allowed_ids=allowed_ids)  # type: ignore[union-attr]
+        except Exception as error:  # noqa: BLE001 - 역색인 오류는 벡터 결과만으로 응답한다.
+            logger.warning("Lexical search failed. Vector results are used: %s", error)
+            return vector_docs[:k]
+        lexical_ms = _elapsed_ms(started)
+
+        docs_by_id = {_document_chunk_id(doc): doc for doc in vector_docs}
+        lexical_scores = dict(lexical_hits)
+        missing = [chunk_id for chunk_id, _ in lexical_hits if chunk_id not in docs_by_id]
+        if missing:
+            # 필터를 다시 걸어 조회하므로 사전 필터를 못 쓴 경우(넉넉히 뽑은 BM25 결과)에도 조건이 지켜진다.
+            fetched = self._fetch_lexical_hits(missing, embedding, metadata_filter=metadata_filter)
+            accepted = {
+                chunk_id: document
+                for chunk_id, (document, relevance) in fetched.items()
+                if relevance >= self.score_threshold
+                or (self.hybrid_min_lexical_score > 0 and lexical_scores[chunk_id] >= self.hybrid_min_lexical_score)
+            }
+            docs_by_id.update(accepted)
+        ranked_lexical = [chunk_id for chunk_id, _ in lexical_hits if chunk_id in docs_by_id][:candidate_k]
+
+        fused = reciprocal_rank_fusion(
+            [[_document_chunk_id(doc) for doc in vector_docs], ranked_lexical],
+            k=self.hybrid_rrf_k,
+        )
+        documents = [docs_by_id[chunk_id] for chunk_id, _ in fused if chunk_id in docs_by_id][:k]
+        logger.debug(
+            "Hybrid search vector=%d lexical=%d lexical_only=%d accepted=%d lexical_ms=%.2f",
+            len(vector_docs),
+            len(lexical_hits),
+            len(missing),
+            len(docs_by_id) - len(vector_docs),
+            lexical_ms,
+        )
+        return documents
+
+    def _lexical_allowed_ids(self, metadata_filter: dict[str, Any] | None) -> set[str] | None:
+        candidate_ids = self._indexed_candidates(metadata_filter)
+        return set(candidate_ids) if candidate_ids is not None else None
+
+    def _indexed_candidates(self, metadata_filter: dict[str, Any] | None) -> list[str] | None:
+        """메타데이터 인덱스로 필터를 통과하는 청크 ID를 구한다.
+
+        인덱스가 없거나, 필터를 해석할 수 없거나, 갱신 주기가 지났거나, 후보가 하나도 없으면 None을 반환해
+        호출자가 저장소의 where 필터를 쓰게 한다. 인덱스에 아직 없는 새 청크를 빈 결과로 단정하지 않기 위해서다.
+        """
+        if not metadata_filter or self.metadata_index is None:
+            return None
+        self.metadata_index.maybe_refresh()
+        if self.metadata_index.is_stale():
+            logger.debug("Metadata index is stale. Store-side filtering is used.")
+            return None
+        candidate_ids = self.metadata_index.candidate_ids(metadata_filter)
+        return candidate_ids or None
+
+    def _fetch_lexical_hits(
+        self,
+        ids: list[str],
+        embedding: list[float],
+        *,
+        metadata_filter: dict[str, Any] | None,
+    ) -> dict[str, tuple[Document, float]]:
+        """BM25 전용 청크를 필터와 함께 조회하고, 저장된 벡터로 질의와의 relevance 점수를 계산한다."""
+        get = getattr(self.search_store, "get", None)
+        if get is None:
+            return {}
+        kwargs: dict[str, Any] = {"ids": ids, "include": ["documents", "metadatas", "embeddings"]}
+        if metadata_filter:
+            kwargs["where"] = metadata_filter
+        try:
+            payload = get(**kwargs)
+        except Exception as error:  # noqa: BLE001 - 조회 실패 시 BM25 전용 결과는 제외한다.
+            logger.debug("Fetching lexical hits by id failed: %s", error)
+            return {}
+        found_ids = [str(chunk_id) for chunk_id in payload.get("ids", [])]
+        if not found_ids:
+            return {}
+
+        embeddings = payload.get("embeddings")
+        if embeddings is not None and len(embeddings) == len(found_ids):
+            matrix = np.asarray(embeddings, dtype=np.float32)
+            query = np.asarray(embedding, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1) * max(float(np.linalg.norm(query)), 1e-12)
+            relevance = self._relevance_score_fn()
+            scores = [relevance(float(distance)) for distance in 1.0 - (matrix @ query) / np.maximum(norms, 1e-12)]
+        else:
+            # 벡터를 못 읽으면 벡터 근거가 없는 것으로 보고 BM25 점수 기준만 적용한다.
+            scores = [float("-inf")] * len(found_ids)
+        return {
+            chunk_id: (
+                Document(id=chunk_id, page_content=str(content), metadata=dict(metadata or {})),
+                score,
+            )
+            for chunk_id, content, metadata, score in zip(
+                found_ids,
+                payload.get("documents", []),
+                payload.get("metadatas", []),
+                scores,
+                strict=False,
+            )
+        }
+
+    def _vector_similarity_search(
+        self,
+        embedding: list[float],
+        *,
+        k: int,
+        metadata_filter: dict[str, Any] | None,
+        score_threshold: float,
+    ) -> list[Document]:
+        candidate_ids = self._indexed_candidates(metadata_filter)
+        if candidate_ids is not None and len(candidate_ids) <= self.exact_scan_max_candidates:
+            return self._exact_scan(embedding, candidate_ids, k=k, score_threshold=score_threshold)
+
+        with_distances = self._call_with_optional_filter(
+            "similarity_search_by_vector_with_relevance_scores",
+            embedding,
+            k=k,
+            metadata_filter=metadata_filter,
+        )
+        if with_distances is None:
+            return []
+
+        # Chroma의 벡터 검색은 거리(작을수록 유사)를 반환하므로 컬렉션 거리 함수로 relevance 점수로 바꾼다.
+        relevance = self._relevance_score_fn()
+        return [doc for doc, distance in with_distances if relevance(distance) >= score_threshold]
+
+    def _exact_scan(
+        self,
+        embedding: list[float],
+        candidate_ids: list[str],
+        *,
+        k: int,
+        score_threshold: float,
+    ) -> list[Document]:
+        """후보 청크 벡터를 직접 읽어 코사인 거리를 계산한다. 후보가 적으면 ANN보다 빠르고 recall이 정확하다."""
+        if not candidate_ids:
+            return []
+        started = time.perf_counter()
+        payload = self.search_store.get(ids=candidate_ids, include=["embeddings", "documents", "metadatas"])
+        ids = [str(item) for item in payload.get("ids", [])]
+        if not ids:
+            return []
+
+        matrix = np.asarray(payload.get("embeddings"), dtype=np.float32)
+        query = np.asarray(embedding, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * max(float(np.linalg.norm(query)), 1e-12)
+        distances = 1.0 - (matrix @ query) / np.maximum(norms, 1e-12)
+        order = np.argsort(distances)[:k]
+
+        relevance = self._relevance_score_fn()
+        contents = payload.get("documents", [])
+        metadatas = payload.get("metadatas", [])
+        documents = [
+            Document(id=ids[row], page_content=str(contents[row]), metadata=dict(metadatas[row] or {}))
+            for row in order.tolist()
+            if relevance(float(distances[row])) >= score_threshold
+        ]
+        logger.debug("Exact scan candidates=%d elapsed_ms=%.1f", len(ids), _elapsed_ms(started))
+        return documents
+
+    def _query_embedder(self) -> Callable[[str], list[float]] | None:
+        if not hasattr(self.search_store, "similarity_search_by_vector_with_relevance_scores"):
+            return None
+        embeddings = self.query_embeddings or getattr(self.search_store, "embeddings", None)
+        if embeddings is None or self._relevance_score_fn_or_none() is None:
+            return None
+        return embeddings.embed_query
+
+    def _relevance_score_fn(self) -> Callable[[float], float]:
+        return self._relevance_score_fn_or_none() or _cosine_relevance
+
+    def _relevance_score_fn_or_none(self) -> Callable[[float], float] | None:
+        if self._relevance_fn is None:
+            select = getattr(self.search_store, "_select_relevance_score_fn", None)
+            if select is None:
+                return None
+            try:
+                self._relevance_fn = select()
+            except Exception as error:  # noqa: BLE001 - 거리 함수를 알 수 없으면 텍스트 검색 경로를 쓴다.
+                logger.debug("Relevance score function is unavailable: %s", error)
+                return None
+        return self._relevance_fn
+
     def _call_with_optional_filter(
         self,
         method_name: str,
+        search_input: str | list[float],
         *,
-        query: str,
         k: int,
         metadata_filter: dict[str, Any] | None,
     ) -> Any | None:
-        method = getattr(self.vectorstore, method_name, None)
+        method = getattr(self.search_store, method_name, None)
         if method is None:
             return None
 
         if metadata_filter:
             for arg_name in ("filter", "where"):
                 try:
-                    return method(query, k=k, **{arg_name: metadata_filter})
+                    return method(search_input, k=k, **{arg_name: metadata_filter})
                 except TypeError:
                     continue
                 except Exception as error:  # noqa: BLE001
@@ -176,37 +916,10 @@ class ReportRetriever:
             return None
 
         try:
-            return method(query, k=k)
+            return method(search_input, k=k)
         except Exception as error:  # noqa: BLE001
             logger.debug("Vector similarity search failed: %s", error)
             return None
 
     def _build_metadata_filter(self, query: str) -> dict[str, Any]:
-        lowered = query.lower()
-        where: dict[str, Any] = {}
-
-        ticker_match = re.search(r"\b(\d{6})\b", query)
-        if ticker_match:
-            where["ticker"] = ticker_match.group(1)
-
-        for broker in BROKER_KEYWORDS:
-            if broker in query:
-                where["broker"] = broker
-                break
-
-        date_match = re.search(r"(20\d{2})[.\-/](\d{1,2})[.\-/](\d{1,2})", query)
-        if date_match:
-            year, month, day = date_match.groups()
-            where["date"] = f"{int(year):04d}-{int(month):02d}-{int(day):02d}"
-
-        for rating, keywords in RATING_KEYWORDS.items():
-            if any(keyword in lowered for keyword in keywords):
-                where["rating"] = rating
-                break
-
-        for report_type, keywords in REPORT_TYPE_KEYWORDS.items():
-            if any(keyword in lowered for keyword in keywords):
-                where["report_type"] = report_type
-                break
-
-        return where
+        return compile_filter(extract_constraints(query))
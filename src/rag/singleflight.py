@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True, slots=True)
+class SingleFlightStats:
+    leaders: int
+    followers: int
+    in_flight: int
+
+    @property
+    def coalesced_rate(self) -> float:
+        total = self.leaders + self.followers
+        return self.followers / total if total else 0.0
+
+
+class SingleFlight(Generic[K, V]):
+    """같은 키로 진행 중인 호출이 있으면 새로 실행하지 않고 그 결과를 함께 받는다.
+
+    먼저 들어온 호출(leader)만 실제로 실행하고, 끝나기 전에 들어온 호출(follower)은 같은 Future를 기다린다.
+    결과는 완료 즉시 잊으므로 캐시와 달리 오래된 값을 돌려주지 않는다.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[K, Future[V]] = {}
+        self._async_calls: dict[K, asyncio.Future[V]] = {}
+        self._leaders = 0
+        self._followers = 0
+
+    def do(self, key: K, fn: Callable[[], V]) -> tuple[V, bool]:
+        """`(결과, 공유 여부)`를 반환한다. leader의 예외는 follower에게도 그대로 전달된다."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._followers += 1
+                leader = False
+            else:
+                future = Future()
+                self._calls[key] = future
+                self._leaders += 1
+                leader = True
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            future.set_result(fn())
+        except BaseException as error:
+            future.set_exception(error)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+        return future.result(), False
+
+    async def ado(self, key: K, fn: Callable[[], Awaitable[V]]) -> tuple[V, bool]:
+        """`do`의 비동기 버전. 하나의 이벤트 루프 안에서 같은 키의 코루틴을 합친다."""
+        future = self._async_calls.get(key)
+        if future is not None:
+            with self._lock:
+                self._followers += 1
+            # leader가 취소돼도 follower의 대기는 취소되지 않도록 shield로 감싼다.
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._async_calls[key] = future
+        with self._lock:
+            self._leaders += 1
+        try:
+            future.set_result(await fn())
+        except BaseException as error:
+            future.set_exception(error)
+            # 기다리는 follower가 없을 때 "exception was never retrieved" 경고를 막는다.
+            future.exception()
+        finally:
+            self._async_calls.pop(key, None)
+        return future.result(), False
+
+    def stats(self) -> SingleFlightStats:
+        with self._lock:
+            return SingleFlightStats(
+                leaders=self._leaders,
+                followers=self._followers,
+                in_flight=len(self._calls) + len(self._async_calls),
+            )
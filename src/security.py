@@ -3,9 +3,14 @@ from __future__ import annotations
 import html
 import logging
 import re
+import sqlite3
+import threading
 import time
-from collections import defaultdict
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Protocol
 
 MAX_PDF_SIZE_BYTES = 50 * 1024 * 1024
 MAX_QUERY_LENGTH = 500
@@ -31,23 +36,158 @@ class SecretFilter(logging.Filter):
         return True
 
 
-class RateLimiter:
-    """사용자별 요청 빈도를 제한한다."""
+@dataclass(slots=True)
+class WindowCounter:
+    """슬라이딩 윈도 카운터 상태. 키당 정수 세 개만 유지한다."""
+
+    window: int
+    current: int = 0
+    previous: int = 0
+
+
+def sliding_window_hit(
+    state: WindowCounter | None,
+    *,
+    now: float,
+    window_seconds: float,
+    max_requests: int,
+) -> tuple[bool, WindowCounter]:
+    """직전 윈도 요청 수를 겹친 비율만큼 더해 현재 시점의 요청 수를 추정하고, 허용되면 1을 더한다."""
+    window = int(now // window_seconds)
+    if state is None or state.window < window - 1:
+        state = WindowCounter(window=window)
+    elif state.window == window - 1:
+        state = WindowCounter(window=window, previous=state.current)
+
+    elapsed = (now - window * window_seconds) / window_seconds
+    estimated = state.previous * (1.0 - elapsed) + state.current
+    if estimated >= max_requests:
+        return False, state
+    state.current += 1
+    return True, state
+
+
+class RateLimitBackend(Protocol):
+    def hit(self, key: str, *, now: float, window_seconds: float, max_requests: int) -> bool: ...
+
+
+class MemoryRateLimitBackend:
+    """프로세스 내 dict 백엔드. 최근 사용 순서를 유지해 두 윈도 넘게 쉰 키를 앞에서부터 지운다."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: OrderedDict[str, WindowCounter] = OrderedDict()
+
+    def hit(self, key: str, *, now: float, window_seconds: float, max_requests: int) -> bool:
+        with self._lock:
+            allowed, state = sliding_window_hit(
+                self._counters.get(key),
+                now=now,
+                window_seconds=window_seconds,
+                max_requests=max_requests,
+            )
+            self._counters[key] = state
+            self._counters.move_to_end(key)
+            self._evict_idle(int(now // window_seconds))
+            return allowed
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._counters)
+
+    def _evict_idle(self, window: int) -> None:
+        while self._counters:
+            key, state = next(iter(self._counters.items()))
+            if state.window >= window - 1:
+                return
+            del self._counters[key]
+
+
+class SQLiteRateLimitBackend:
+    """같은 호스트의 여러 봇 프로세스가 공유하는 SQLite 백엔드.
+
+    `BEGIN IMMEDIATE`로 쓰기 잠금을 잡고 읽기-갱신을 한 트랜잭션에서 처리하므로 프로세스 간에도 원자적이다.
+    """
+
+    EVICT_INTERVAL_SECONDS = 60.0
+
+    def __init__(self, path: str | Path, *, timeout_seconds: float = 5.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.path,
+            timeout=timeout_seconds,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "key TEXT PRIMARY KEY, window INTEGER NOT NULL, current INTEGER NOT NULL, previous INTEGER NOT NULL)"
+        )
+        self._next_eviction = 0.0
+
+    def hit(self, key: str, *, now: float, window_seconds: float, max_requests: int) -> bool:
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                row = cursor.execute(
+                    "SELECT window, current, previous FROM rate_limits WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                allowed, state = sliding_window_hit(
+                    WindowCounter(*row) if row else None,
+                    now=now,
+                    window_seconds=window_seconds,
+                    max_requests=max_requests,
+                )
+                cursor.execute(
+                    "INSERT OR REPLACE INTO rate_limits (key, window, current, previous) VALUES (?, ?, ?, ?)",
+                    (key, state.window, state.current, state.previous),
+                )
+                if now >= self._next_eviction:
+                    cursor.execute("DELETE FROM rate_limits WHERE window < ?", (state.window - 1,))
+                    self._next_eviction = now + self.EVICT_INTERVAL_SECONDS
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            return allowed
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
 
-    def __init__(self, max_requests: int = 10, window_seconds: int = 60):
+class RateLimiter:
+    """사용자별 요청 빈도를 슬라이딩 윈도 카운터로 제한한다.
+
+    키당 메모리는 상수이고, 오래 쉰 키는 백엔드가 지운다. 여러 프로세스가 한도를 공유하려면
+    `SQLiteRateLimitBackend`를 넘긴다.
+    """
+
+    def __init__(
+        self,
+        max_requests: int = 10,
+        window_seconds: float = 60,
+        *,
+        backend: RateLimitBackend | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests: dict[str, list[float]] = defaultdict(list)
+        self.backend = backend if backend is not None else MemoryRateLimitBackend()
+        self._clock = clock
 
     def is_allowed(self, user_id: str) -> bool:
-        now = time.time()
-        kept = [ts for ts in self.requests[user_id] if now - ts < self.window_seconds]
-        if len(kept) >= self.max_requests:
-            self.requests[user_id] = kept
-            return False
-
-        self.requests[user_id] = [*kept, now]
-        return True
+        return self.backend.hit(
+            user_id,
+            now=self._clock(),
+            window_seconds=self.window_seconds,
+            max_requests=self.max_requests,
+        )
 
 
 def validate_query(query: str, max_length: int = MAX_QUERY_LENGTH) -> str | None:
@@ -71,4 +211,3 @@ def validate_pdf(file_path: Path, max_size_bytes: int = MAX_PDF_SIZE_BYTES) -> b
 
 def normalize_slack_text(text: str) -> str:
     return html.unescape(text)
-
@@ -1,38 +1,216 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
 import json
 import logging
+import threading
+from collections.abc import Callable
+from typing import TYPE_CHECKING
 
+import chromadb
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
 
 from src.config import Settings, get_settings
 from src.logging_utils import configure_logging
 from src.pipeline.embedder import ReportEmbedder
+from src.pipeline.lexical_index import LexicalIndex
+from src.pipeline.metadata_index import MetadataIndex
+from src.pipeline.registry import MetadataRegistry
+from src.pipeline.two_stage import TwoStageVectorStore
+from src.rag.answer_cache import AnswerCache, RegistryGenerations
 from src.rag.chain import ReportQAChain
+from src.rag.context import ContextBuilder, TokenCounter
+from src.rag.conversation import ConversationCache, RegistryCompanyNames
+from src.rag.embedding_batcher import QueryEmbeddingBatcher
+from src.rag.embedding_cache import CachedQueryEmbeddings, QueryEmbeddingCache
 from src.rag.retriever import ReportRetriever
-from src.slack.handlers import register_handlers
+from src.rag.singleflight import SingleFlight
+from src.security import MemoryRateLimitBackend, RateLimitBackend, RateLimiter, SQLiteRateLimitBackend
+from src.slack.dedup import EventClaimStore, EventDeduplicator, MemoryEventClaimStore, SQLiteEventClaimStore
+from src.slack.handlers import register_async_handlers, register_handlers
+from src.slack.scheduler import QuestionScheduler
+from src.slack.warmup import DEFAULT_WARMUP_QUERIES, WarmupReport, awarm_up, clear_ready, mark_ready, warm_up
+
+if TYPE_CHECKING:
+    from slack_bolt.async_app import AsyncApp
 
 logger = logging.getLogger(__name__)
 
 
 def build_qa_chain(settings: Settings) -> ReportQAChain:
-    vectorstore = ReportEmbedder(
+    embedder = ReportEmbedder(
         api_key=settings.upstage_api_key or "",
         persist_directory=settings.chroma_persist_dir,
         collection_name=settings.chroma_collection_name,
         embedding_model=settings.embedding_model,
-    ).get_vectorstore()
+        hnsw_m=settings.chroma_hnsw_m,
+        hnsw_construction_ef=settings.chroma_hnsw_construction_ef,
+        hnsw_search_ef=settings.chroma_hnsw_search_ef,
+    )
+    vectorstore = embedder.get_vectorstore()
+    query_embedding_cache = QueryEmbeddingCache(
+        max_entries=settings.query_embedding_cache_size,
+        ttl_seconds=settings.query_embedding_cache_ttl_seconds,
+        path=settings.query_embedding_cache_path,
+    )
+    atexit.register(_persist_query_embedding_cache, query_embedding_cache)
+    query_embeddings = embedder.embeddings
+    if settings.query_embedding_batch_enabled:
+        # 캐시 미스만 배처로 내려가도록 캐시 안쪽에 둔다.
+        batcher = QueryEmbeddingBatcher(
+            embedder.embeddings,
+            max_batch_size=settings.query_embedding_batch_max_size,
+            max_wait_ms=settings.query_embedding_batch_wait_ms,
+        )
+        atexit.register(batcher.close)
+        query_embeddings = batcher
 
     retriever = ReportRetriever(
         vectorstore=vectorstore,
         openai_api_key=settings.openai_api_key or "",
         llm_model=settings.llm_model,
+        search_store=build_two_stage_store(settings, embedder) if settings.two_stage_enabled else None,
+        query_embeddings=CachedQueryEmbeddings(
+            query_embeddings,
+            query_embedding_cache,
+            model=settings.embedding_model,
+        ),
+        planner_confidence_threshold=settings.query_planner_confidence_threshold,
+        retrieval_mode=settings.retrieval_mode,
+        deadline_seconds=settings.retrieval_deadline_seconds,
+        lexical_index=LexicalIndex(settings.lexical_index_dir) if settings.lexical_index_enabled else None,
+        hybrid_candidate_k=settings.hybrid_candidate_k,
+        hybrid_rrf_k=settings.hybrid_rrf_k,
+        hybrid_min_lexical_score=settings.hybrid_min_lexical_score,
+        metadata_index=build_metadata_index(settings, embedder) if settings.metadata_index_enabled else None,
+        exact_scan_max_candidates=settings.exact_scan_max_candidates,
+        mmr_enabled=settings.mmr_enabled,
+        mmr_lambda=settings.mmr_lambda,
+        mmr_fetch_k=settings.mmr_fetch_k,
+        max_chunks_per_document=settings.max_chunks_per_document,
+        merge_adjacent=settings.merge_adjacent_chunks,
     )
+    answer_cache = None
+    if settings.answer_cache_enabled:
+        answer_cache = AnswerCache(
+            max_entries=settings.answer_cache_size,
+            ttl_seconds=settings.answer_cache_ttl_seconds,
+            generations=RegistryGenerations(MetadataRegistry()),
+        )
+        atexit.register(_log_answer_cache_stats, answer_cache)
     return ReportQAChain(
         retriever=retriever,
         openai_api_key=settings.openai_api_key or "",
         llm_model=settings.llm_model,
+        answer_cache=answer_cache,
+        coalescer=SingleFlight() if settings.question_coalescing_enabled else None,
+        conversations=(
+            ConversationCache(
+                max_threads=settings.conversation_cache_max_threads,
+                ttl_seconds=settings.conversation_cache_ttl_seconds,
+                known_companies=RegistryCompanyNames(MetadataRegistry()),
+            )
+            if settings.conversation_cache_enabled
+            else None
+        ),
+        context_builder=(
+            ContextBuilder(token_budget=settings.context_token_budget, counter=TokenCounter(settings.llm_model))
+            if settings.context_token_budget
+            else None
+        ),
+    )
+
+
+def build_two_stage_store(settings: Settings, embedder: ReportEmbedder) -> TwoStageVectorStore | None:
+    try:
+        return TwoStageVectorStore.open(
+            client=chromadb.PersistentClient(path=settings.chroma_persist_dir),
+            collection_name=settings.chroma_collection_name,
+            directory=settings.two_stage_dir,
+            embedding_function=embedder.embeddings,
+            candidate_k=settings.two_stage_candidate_k,
+            fallback=embedder.vectorstore,
+        )
+    except Exception as error:  # noqa: BLE001 - 인덱스가 없으면 단일 단계 검색으로 동작한다.
+        logger.warning("Two-stage index unavailable. Full-vector search is used: %s", error)
+        return None
+
+
+def build_metadata_index(settings: Settings, embedder: ReportEmbedder) -> MetadataIndex | None:
+    try:
+        return MetadataIndex.from_collection(
+            embedder.vectorstore._collection,  # type: ignore[attr-defined]
+            refresh_interval_seconds=settings.metadata_index_refresh_seconds,
+        )
+    except Exception as error:  # noqa: BLE001 - 인덱스 없이도 필터 ANN 검색으로 동작한다.
+        logger.warning("Metadata index unavailable. Filtered ANN search is used: %s", error)
+        return None
+
+
+def build_rate_limiter(settings: Settings) -> RateLimiter:
+    backend: RateLimitBackend
+    if settings.rate_limit_backend == "sqlite":
+        backend = SQLiteRateLimitBackend(settings.rate_limit_sqlite_path)
+    else:
+        if settings.rate_limit_backend != "memory":
+            logger.warning("Unknown RATE_LIMIT_BACKEND=%s. In-memory backend is used.", settings.rate_limit_backend)
+        backend = MemoryRateLimitBackend()
+    return RateLimiter(
+        max_requests=settings.rate_limit_max_requests,
+        window_seconds=settings.rate_limit_window_seconds,
+        backend=backend,
+    )
+
+
+def build_event_deduplicator(settings: Settings) -> EventDeduplicator | None:
+    if not settings.slack_event_dedup_enabled:
+        return None
+    store: EventClaimStore
+    if settings.slack_event_dedup_backend == "sqlite":
+        store = SQLiteEventClaimStore(settings.slack_event_dedup_sqlite_path)
+    else:
+        if settings.slack_event_dedup_backend != "memory":
+            logger.warning(
+                "Unknown SLACK_EVENT_DEDUP_BACKEND=%s. In-memory store is used.",
+                settings.slack_event_dedup_backend,
+            )
+        store = MemoryEventClaimStore()
+    deduplicator = EventDeduplicator(store, ttl_seconds=settings.slack_event_dedup_ttl_seconds)
+    atexit.register(_log_deduplicator_stats, deduplicator)
+    return deduplicator
+
+
+def _log_deduplicator_stats(deduplicator: EventDeduplicator) -> None:
+    stats = deduplicator.stats()
+    logger.info("Slack event dedup claimed=%d duplicates=%d", stats.claimed, stats.duplicates)
+
+
+def _persist_query_embedding_cache(cache: QueryEmbeddingCache) -> None:
+    stats = cache.stats()
+    logger.info(
+        "Query embedding cache hits=%d misses=%d hit_rate=%.2f size=%d",
+        stats.hits,
+        stats.misses,
+        stats.hit_rate,
+        stats.size,
+    )
+    try:
+        cache.save()
+    except OSError as error:
+        logger.warning("Failed to save query embedding cache: %s", error)
+
+
+def _log_answer_cache_stats(cache: AnswerCache) -> None:
+    stats = cache.stats()
+    logger.info(
+        "Answer cache hits=%d misses=%d hit_rate=%.2f size=%d evictions=%d",
+        stats.hits,
+        stats.misses,
+        stats.hit_rate,
+        stats.size,
+        stats.evictions,
     )
 
 
@@ -45,11 +223,25 @@ def create_app(settings: Settings | None = None, qa_chain: ReportQAChain | None
         token=app_settings.slack_bot_token or "",
         signing_secret=app_settings.slack_signing_secret or "",
     )
+    scheduler = None
+    if app_settings.slack_question_workers:
+        scheduler = QuestionScheduler(
+            workers=app_settings.slack_question_workers,
+            max_queue_depth=app_settings.slack_question_queue_depth,
+            max_pending_per_user=app_settings.slack_question_max_pending_per_user,
+        )
+        atexit.register(scheduler.shutdown, wait=False)
     register_handlers(
         app,
         qa_chain=chain,
         allowed_channel_ids=app_settings.allowed_channel_ids,
         allowed_user_ids=app_settings.allowed_user_ids,
+        limiter=build_rate_limiter(app_settings),
+        stream_answers=app_settings.slack_streaming_enabled,
+        stream_update_interval_seconds=app_settings.slack_stream_update_interval_seconds,
+        scheduler=scheduler,
+        deduplicator=build_event_deduplicator(app_settings),
+        thread_replies=app_settings.slack_thread_replies,
     )
     logger.info(
         "Slack app initialized allowed_channels=%d allowed_users=%d",
@@ -59,7 +251,59 @@ def create_app(settings: Settings | None = None, qa_chain: ReportQAChain | None
     return app
 
 
-def start_socket_mode(app: App, *, app_token: str) -> None:
+def create_async_app(settings: Settings | None = None, qa_chain: ReportQAChain | None = None) -> AsyncApp:
+    """이벤트 루프 하나에서 질문을 처리하는 AsyncApp을 만든다."""
+    try:
+        from slack_bolt.async_app import AsyncApp
+    except ImportError as error:
+        raise RuntimeError("SLACK_ASYNC_ENABLED=true requires aiohttp. Run `uv sync` to install it.") from error
+
+    app_settings = settings or get_settings()
+    app_settings.validate_slack_settings()
+
+    chain = qa_chain or build_qa_chain(app_settings)
+    app = AsyncApp(
+        token=app_settings.slack_bot_token or "",
+        signing_secret=app_settings.slack_signing_secret or "",
+    )
+    register_async_handlers(
+        app,
+        qa_chain=chain,
+        allowed_channel_ids=app_settings.allowed_channel_ids,
+        allowed_user_ids=app_settings.allowed_user_ids,
+        limiter=build_rate_limiter(app_settings),
+        stream_answers=app_settings.slack_streaming_enabled,
+        stream_update_interval_seconds=app_settings.slack_stream_update_interval_seconds,
+        max_concurrent_questions=app_settings.slack_max_concurrent_questions,
+        deduplicator=build_event_deduplicator(app_settings),
+        thread_replies=app_settings.slack_thread_replies,
+    )
+    logger.info(
+        "Async Slack app initialized allowed_channels=%d allowed_users=%d max_concurrent_questions=%d",
+        len(app_settings.allowed_channel_ids),
+        len(app_settings.allowed_user_ids),
+        app_settings.slack_max_concurrent_questions,
+    )
+    return app
+
+
+async def start_async_socket_mode(
+    app: AsyncApp,
+    *,
+    app_token: str,
+    on_ready: Callable[[], None] | None = None,
+) -> None:
+    from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+
+    handler = AsyncSocketModeHandler(app, app_token)
+    await handler.connect_async()
+    if on_ready is not None:
+        on_ready()
+    await asyncio.Event().wait()
+
+
+def start_socket_mode(app: App, *, app_token: str, on_ready: Callable[[], None] | None = None) -> None:
+    """Socket Mode로 연결하고 프로세스를 붙잡아 둔다. 연결이 열린 뒤 `on_ready`를 호출한다."""
     handler = SocketModeHandler(app, app_token)
 
     def _log_socket_message(message: str) -> None:
@@ -95,16 +339,65 @@ def start_socket_mode(app: App, *, app_token: str) -> None:
     handler.client.on_message_listeners.append(_log_socket_message)
     handler.client.on_error_listeners.append(_log_socket_error)
     handler.client.on_close_listeners.append(_log_socket_close)
-    handler.start()
+    handler.connect()
+    if on_ready is not None:
+        on_ready()
+    threading.Event().wait()
+
+
+def _report_ready(settings: Settings, report: WarmupReport | None) -> Callable[[], None]:
+    def _on_ready() -> None:
+        if settings.slack_ready_file:
+            mark_ready(settings.slack_ready_file, report)
+        logger.info(
+            "Slack bot ready warmup_ms=%.1f warmup_errors=%d",
+            report.total_ms if report is not None else 0.0,
+            len(report.errors) if report is not None else 0,
+        )
+
+    return _on_ready
+
+
+async def _serve_async(settings: Settings) -> None:
+    chain = build_qa_chain(settings)
+    app = create_async_app(settings=settings, qa_chain=chain)
+    report = None
+    if settings.slack_warmup_enabled:
+        report = await awarm_up(
+            chain,
+            queries=settings.slack_warmup_queries or DEFAULT_WARMUP_QUERIES,
+            answer_queries=settings.slack_warmup_answer_queries,
+        )
+    await start_async_socket_mode(
+        app,
+        app_token=settings.slack_app_token or "",
+        on_ready=_report_ready(settings, report),
+    )
 
 
 def main() -> None:
     settings = get_settings()
     settings.validate_slack_settings()
     configure_logging(level=settings.log_level)
+    # 이전 프로세스가 남긴 준비 파일을 지워 워밍업이 끝나기 전에는 준비 상태로 보이지 않게 한다.
+    if settings.slack_ready_file:
+        clear_ready(settings.slack_ready_file)
+        atexit.register(clear_ready, settings.slack_ready_file)
+
+    if settings.slack_async_enabled:
+        asyncio.run(_serve_async(settings))
+        return
 
-    app = create_app(settings=settings)
-    start_socket_mode(app, app_token=settings.slack_app_token or "")
+    chain = build_qa_chain(settings)
+    app = create_app(settings=settings, qa_chain=chain)
+    report = None
+    if settings.slack_warmup_enabled:
+        report = warm_up(
+            chain,
+            queries=settings.slack_warmup_queries or DEFAULT_WARMUP_QUERIES,
+            answer_queries=settings.slack_warmup_answer_queries,
+        )
+    start_socket_mode(app, app_token=settings.slack_app_token or "", on_ready=_report_ready(settings, report))
 
 
 if __name__ == "__main__":
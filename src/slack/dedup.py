@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+# Slack 재전송은 즉시, 1분, 5분 뒤에 오므로 그보다 넉넉히 기억한다.
+DEFAULT_CLAIM_TTL_SECONDS = 900.0
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+class EventClaimStore(Protocol):
+    def claim(self, key: str, *, now: float, ttl_seconds: float) -> bool: ...
+
+
+class MemoryEventClaimStore:
+    """프로세스 내 선점 기록. TTL이 같으므로 삽입 순서가 곧 만료 순서여서 앞에서부터 지운다."""
+
+    def __init__(self, *, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._expires_at: OrderedDict[str, float] = OrderedDict()
+
+    def claim(self, key: str, *, now: float, ttl_seconds: float) -> bool:
+        with self._lock:
+            while self._expires_at:
+                oldest, expires_at = next(iter(self._expires_at.items()))
+                if expires_at > now:
+                    break
+                del self._expires_at[oldest]
+            if key in self._expires_at:
+                return False
+            self._expires_at[key] = now + ttl_seconds
+            if len(self._expires_at) > self.max_entries:
+                self._expires_at.popitem(last=False)
+            return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._expires_at)
+
+
+class SQLiteEventClaimStore:
+    """같은 호스트의 봇 프로세스가 공유하는 선점 기록.
+
+    키가 없거나 만료된 경우에만 행을 쓰는 UPSERT 한 문장으로 선점하므로 프로세스 간에도 한 번만 성공한다.
+    """
+
+    PURGE_INTERVAL_SECONDS = 60.0
+
+    def __init__(self, path: str | Path, *, timeout_seconds: float = 5.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.path,
+            timeout=timeout_seconds,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS event_claims (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+        )
+        self._next_purge = 0.0
+
+    def claim(self, key: str, *, now: float, ttl_seconds: float) -> bool:
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO event_claims (key, expires_at) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET expires_at = excluded.expires_at "
+                "WHERE event_claims.expires_at <= ?",
+                (key, now + ttl_seconds, now),
+            )
+            claimed = cursor.rowcount == 1
+            if now >= self._next_purge:
+                self._connection.execute("DELETE FROM event_claims WHERE expires_at <= ?", (now,))
+                self._next_purge = now + self.PURGE_INTERVAL_SECONDS
+            return claimed
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+@dataclass(frozen=True, slots=True)
+class DeduplicatorStats:
+    claimed: int
+    duplicates: int
+
+
+def event_dedup_key(body: dict[str, Any]) -> str | None:
+    """재전송돼도 바뀌지 않는 이벤트 식별자. `event_id`가 없으면 채널과 메시지 시각으로 대신한다."""
+    event_id = body.get("event_id")
+    if event_id:
+        return f"event:{event_id}"
+    event = body.get("event")
+    if isinstance(event, dict) and event.get("channel") and (event.get("event_ts") or event.get("ts")):
+        return f"message:{event['channel']}:{event.get('event_ts') or event.get('ts')}"
+    return None
+
+
+class EventDeduplicator:
+    """Slack 이벤트를 한 번만 처리하도록 선점한다.
+
+    처리 전에 선점하므로 처리 도중 실패한 이벤트가 재전송돼도 다시 처리하지 않는다(최대 한 번).
+    Socket Mode 재전송은 `envelope_id`가 새로 발급되므로 키는 `event_id`를 쓴다.
+    """
+
+    def __init__(
+        self,
+        store: EventClaimStore | None = None,
+        *,
+        ttl_seconds: float = DEFAULT_CLAIM_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.store = store if store is not None else MemoryEventClaimStore()
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._claimed = 0
+        self._duplicates = 0
+
+    def claim(self, body: dict[str, Any]) -> bool:
+        """처음 본 이벤트면 True. 식별자가 없는 요청은 항상 처리한다."""
+        key = event_dedup_key(body)
+        if key is None:
+            return True
+        try:
+            claimed = self.store.claim(key, now=self._clock(), ttl_seconds=self.ttl_seconds)
+        except sqlite3.Error as error:
+            # 저장소 장애로 질문을 잃기보다는 중복 답변을 감수한다.
+            logger.warning("Event claim store failed. Event is processed without dedup key=%s: %s", key, error)
+            return True
+        with self._lock:
+            if claimed:
+                self._claimed += 1
+            else:
+                self._duplicates += 1
+        if not claimed:
+            logger.info("Skipped duplicate Slack event key=%s retry=%s", key, body.get("retry_attempt"))
+        return claimed
+
+    def stats(self) -> DeduplicatorStats:
+        with self._lock:
+            return DeduplicatorStats(claimed=self._claimed, duplicates=self._duplicates)
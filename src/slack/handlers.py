@@ -1,18 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
 import re
-from collections.abc import Callable, Iterable
-from typing import Any
+from collections.abc import Awaitable, Callable, Iterable
+from typing import TYPE_CHECKING, Any
 
 from slack_bolt import App
 
 from src.models import QAResult
 from src.rag.chain import ReportQAChain
 from src.security import MAX_QUERY_LENGTH, RateLimiter, normalize_slack_text, validate_query
+from src.slack.dedup import EventDeduplicator
+from src.slack.scheduler import QuestionScheduler
+from src.slack.streaming import DEFAULT_UPDATE_INTERVAL_SECONDS, AsyncSlackAnswerStreamer, SlackAnswerStreamer
+
+if TYPE_CHECKING:
+    from slack_bolt.async_app import AsyncApp
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_CONCURRENT_QUESTIONS = 32
+ANSWER_FAILED_MESSAGE = "죄송합니다. 답변 생성 중 오류가 발생했습니다. 잠시 후 다시 시도해 주세요."
+BUSY_MESSAGE = "지금 질문이 많아 바로 처리할 수 없습니다. 잠시 후 다시 질문해 주세요."
+
 
 def extract_question(text: str) -> str:
     cleaned = re.sub(r"<@[A-Z0-9]+>", "", text)
@@ -51,6 +63,67 @@ def format_response(result: QAResult) -> list[dict[str, Any]]:
     return blocks
 
 
+def screen_question(
+    event: dict[str, Any],
+    *,
+    allow_channels: set[str],
+    allow_users: set[str],
+    rate_limiter: RateLimiter,
+) -> tuple[str | None, str | None]:
+    """이벤트를 처리할지 판단한다.
+
+    처리할 질문이면 `(질문, None)`, 안내만 해야 하면 `(None, 안내 메시지)`, 조용히 무시하면 `(None, None)`을 반환한다.
+    """
+    if event.get("bot_id"):
+        logger.debug("Skipped bot-originated event channel=%s", event.get("channel"))
+        return None, None
+    logger.info(
+        "Processing question event_type=%s channel=%s user=%s",
+        event.get("type"),
+        event.get("channel"),
+        event.get("user"),
+    )
+
+    channel_id = event.get("channel")
+    user_id = event.get("user", "")
+    if allow_channels and channel_id not in allow_channels:
+        logger.info("Ignored event from unauthorized channel channel=%s user=%s", channel_id, user_id)
+        return None, None
+    if allow_users and user_id not in allow_users:
+        logger.info("Blocked event from unauthorized user user=%s channel=%s", user_id, channel_id)
+        return None, "이 Bot을 사용할 권한이 없습니다."
+
+    if user_id and not rate_limiter.is_allowed(user_id):
+        logger.info("Rate limited user=%s", user_id)
+        return None, "요청이 너무 많습니다. 잠시 후 다시 시도해 주세요."
+
+    question = extract_question(event.get("text", ""))
+    validation_error = validate_query(question, max_length=MAX_QUERY_LENGTH)
+    if validation_error:
+        logger.info("Validation error for user=%s: %s", user_id, validation_error)
+        return None, validation_error
+    return question, None
+
+
+def thread_context(event: dict[str, Any]) -> tuple[str | None, str | None]:
+    """답변을 달 스레드와 대화 문맥 키를 반환한다. 스레드 밖 질문은 질문 메시지를 스레드 부모로 쓴다."""
+    thread_ts = event.get("thread_ts") or event.get("ts")
+    if not thread_ts:
+        return None, None
+    return thread_ts, f"{event.get('channel', '')}:{thread_ts}"
+
+
+def _log_event(event_logger: logging.Logger, body: dict[str, Any]) -> None:
+    event = body.get("event")
+    if isinstance(event, dict):
+        event_logger.info(
+            "Slack event received type=%s channel=%s user=%s",
+            event.get("type"),
+            event.get("channel"),
+            event.get("user"),
+        )
+
+
 def register_handlers(
     app: App,
     *,
@@ -58,7 +131,19 @@ def register_handlers(
     allowed_channel_ids: Iterable[str] | None = None,
     allowed_user_ids: Iterable[str] | None = None,
     limiter: RateLimiter | None = None,
+    stream_answers: bool = False,
+    stream_update_interval_seconds: float = DEFAULT_UPDATE_INTERVAL_SECONDS,
+    scheduler: QuestionScheduler | None = None,
+    deduplicator: EventDeduplicator | None = None,
+    thread_replies: bool = False,
 ) -> None:
+    """이벤트 핸들러를 등록한다.
+
+    `thread_replies`가 켜져 있으면 답변을 질문 스레드에 달고, 스레드별 대화 문맥 키를 QA 체인에 넘긴다.
+
+    `scheduler`를 주면 질문을 워커 풀 대기열에 넣고 Bolt 스레드는 바로 반환한다.
+    `deduplicator`를 주면 재전송되거나 다른 프로세스가 이미 선점한 이벤트는 응답 확인만 하고 건너뛴다.
+    """
     allow_channels = set(allowed_channel_ids or [])
     allow_users = set(allowed_user_ids or [])
     rate_limiter = limiter or RateLimiter(max_requests=10, window_seconds=60)
@@ -69,73 +154,183 @@ def register_handlers(
         body: dict[str, Any],
         next: Callable[[], Any],  # noqa: A002
     ) -> Any:
-        event = body.get("event")
-        if isinstance(event, dict):
-            logger.info(
-                "Slack event received type=%s channel=%s user=%s",
-                event.get("type"),
-                event.get("channel"),
-                event.get("user"),
-            )
+        _log_event(logger, body)
         return next()
 
-    def _is_authorized(event: dict[str, Any], say: Callable[..., Any]) -> bool:
-        channel_id = event.get("channel")
-        user_id = event.get("user", "")
-        if allow_channels and channel_id not in allow_channels:
-            logger.info("Ignored event from unauthorized channel channel=%s user=%s", channel_id, user_id)
-            return False
-        if allow_users and user_id not in allow_users:
-            logger.info("Blocked event from unauthorized user user=%s channel=%s", user_id, channel_id)
-            say("이 Bot을 사용할 권한이 없습니다.")
-            return False
-        return True
-
-    def _handle_question(event: dict[str, Any], say: Callable[..., Any]) -> None:
-        if event.get("bot_id"):
-            logger.debug("Skipped bot-originated event channel=%s", event.get("channel"))
-            return
-        logger.info(
-            "Processing question event_type=%s channel=%s user=%s",
-            event.get("type"),
-            event.get("channel"),
-            event.get("user"),
+    if deduplicator is not None:
+
+        @app.middleware
+        def skip_duplicate_events(
+            body: dict[str, Any],
+            ack: Callable[[], Any],
+            next: Callable[[], Any],  # noqa: A002
+        ) -> Any:
+            return next() if deduplicator.claim(body) else ack()
+
+    def _handle_question(event: dict[str, Any], say: Callable[..., Any], client: Any = None) -> None:
+        thread_key = None
+        if thread_replies:
+            thread_ts, thread_key = thread_context(event)
+            if thread_ts is not None:
+                say = functools.partial(say, thread_ts=thread_ts)
+        question, reply = screen_question(
+            event,
+            allow_channels=allow_channels,
+            allow_users=allow_users,
+            rate_limiter=rate_limiter,
         )
-        if not _is_authorized(event, say):
+        if question is None:
+            if reply:
+                say(reply)
             return
 
         user_id = event.get("user", "")
-        if user_id and not rate_limiter.is_allowed(user_id):
-            logger.info("Rate limited user=%s", user_id)
-            say("요청이 너무 많습니다. 잠시 후 다시 시도해 주세요.")
+        if scheduler is None:
+            _answer(question, user_id, say, client, thread_key)
             return
 
-        question = extract_question(event.get("text", ""))
-        validation_error = validate_query(question, max_length=MAX_QUERY_LENGTH)
-        if validation_error:
-            logger.info("Validation error for user=%s: %s", user_id, validation_error)
-            say(validation_error)
-            return
+        def _job() -> None:
+            try:
+                _answer(question, user_id, say, client, thread_key)
+            except Exception as error:  # noqa: BLE001 - 워커에서의 실패도 사용자에게 알린다.
+                logger.exception("Failed to answer queued question user=%s: %s", user_id, error)
+                say(ANSWER_FAILED_MESSAGE)
+
+        if not scheduler.submit(user_id or str(event.get("channel", "")), _job):
+            say(BUSY_MESSAGE)
 
-        result = qa_chain.ask(question)
+    def _answer(
+        question: str,
+        user_id: str,
+        say: Callable[..., Any],
+        client: Any,
+        thread_key: str | None,
+    ) -> None:
+        if stream_answers and client is not None:
+            streamer = SlackAnswerStreamer(client, say, update_interval_seconds=stream_update_interval_seconds)
+            if streamer.start():
+                result = qa_chain.ask(question, on_partial_answer=streamer.update, thread_key=thread_key)
+                logger.info("Answer streamed for user=%s updates=%d", user_id, streamer.updates)
+                streamer.finish(result, format_response(result))
+                return
+
+        result = qa_chain.ask(question, thread_key=thread_key)
         logger.info("Answer generated for user=%s", user_id)
         say(text=result.answer, blocks=format_response(result))
 
     @app.event("app_mention")
-    def handle_mention(event: dict[str, Any], say: Callable[..., Any]) -> None:
+    def handle_mention(event: dict[str, Any], say: Callable[..., Any], client: Any) -> None:
         try:
-            _handle_question(event, say)
+            _handle_question(event, say, client)
         except Exception as error:  # noqa: BLE001
             logger.exception("Failed to handle app_mention: %s", error)
-            say("죄송합니다. 답변 생성 중 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.")
+            say(ANSWER_FAILED_MESSAGE)
 
     @app.event("message")
-    def handle_dm(event: dict[str, Any], say: Callable[..., Any]) -> None:
+    def handle_dm(event: dict[str, Any], say: Callable[..., Any], client: Any) -> None:
         if event.get("channel_type") != "im":
             return
 
         try:
-            _handle_question(event, say)
+            _handle_question(event, say, client)
         except Exception as error:  # noqa: BLE001
             logger.exception("Failed to handle DM message: %s", error)
             say("죄송합니다. 요청 처리 중 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.")
+
+
+def register_async_handlers(
+    app: AsyncApp,
+    *,
+    qa_chain: ReportQAChain,
+    allowed_channel_ids: Iterable[str] | None = None,
+    allowed_user_ids: Iterable[str] | None = None,
+    limiter: RateLimiter | None = None,
+    stream_answers: bool = False,
+    stream_update_interval_seconds: float = DEFAULT_UPDATE_INTERVAL_SECONDS,
+    max_concurrent_questions: int = DEFAULT_MAX_CONCURRENT_QUESTIONS,
+    deduplicator: EventDeduplicator | None = None,
+    thread_replies: bool = False,
+) -> None:
+    """`register_handlers`의 AsyncApp 버전. 동시에 처리하는 질문 수를 세마포어로 제한한다."""
+    allow_channels = set(allowed_channel_ids or [])
+    allow_users = set(allowed_user_ids or [])
+    rate_limiter = limiter or RateLimiter(max_requests=10, window_seconds=60)
+    semaphore = asyncio.Semaphore(max(1, max_concurrent_questions))
+
+    @app.middleware
+    async def log_incoming_event(
+        logger: logging.Logger,
+        body: dict[str, Any],
+        next: Callable[[], Awaitable[Any]],  # noqa: A002
+    ) -> Any:
+        _log_event(logger, body)
+        return await next()
+
+    if deduplicator is not None:
+
+        @app.middleware
+        async def skip_duplicate_events(
+            body: dict[str, Any],
+            ack: Callable[[], Awaitable[Any]],
+            next: Callable[[], Awaitable[Any]],  # noqa: A002
+        ) -> Any:
+            # SQLite 선점은 짧은 동기 쓰기이므로 이벤트 루프에서 바로 처리한다.
+            return await next() if deduplicator.claim(body) else await ack()
+
+    async def _handle_question(event: dict[str, Any], say: Callable[..., Awaitable[Any]], client: Any) -> None:
+        thread_key = None
+        if thread_replies:
+            thread_ts, thread_key = thread_context(event)
+            if thread_ts is not None:
+                say = functools.partial(say, thread_ts=thread_ts)
+        question, reply = screen_question(
+            event,
+            allow_channels=allow_channels,
+            allow_users=allow_users,
+            rate_limiter=rate_limiter,
+        )
+        if question is None:
+            if reply:
+                await say(reply)
+            return
+
+        user_id = event.get("user", "")
+        async with semaphore:
+            if stream_answers:
+                streamer = AsyncSlackAnswerStreamer(
+                    client,
+                    say,
+                    update_interval_seconds=stream_update_interval_seconds,
+                )
+                if await streamer.start():
+                    result = await qa_chain.aask(
+                        question,
+                        on_partial_answer=streamer.update,
+                        thread_key=thread_key,
+                    )
+                    logger.info("Answer streamed for user=%s updates=%d", user_id, streamer.updates)
+                    await streamer.finish(result, format_response(result))
+                    return
+
+            result = await qa_chain.aask(question, thread_key=thread_key)
+        logger.info("Answer generated for user=%s", user_id)
+        await say(text=result.answer, blocks=format_response(result))
+
+    @app.event("app_mention")
+    async def handle_mention(event: dict[str, Any], say: Callable[..., Awaitable[Any]], client: Any) -> None:
+        try:
+            await _handle_question(event, say, client)
+        except Exception as error:  # noqa: BLE001
+            logger.exception("Failed to handle app_mention: %s", error)
+            await say(ANSWER_FAILED_MESSAGE)
+
+    @app.event("message")
+    async def handle_dm(event: dict[str, Any], say: Callable[..., Awaitable[Any]], client: Any) -> None:
+        if event.get("channel_type") != "im":
+            return
+
+        try:
+            await _handle_question(event, say, client)
+        except Exception as error:  # noqa: BLE001
+            logger.exception("Failed to handle DM message: %s", error)
+            await say("죄송합니다. 요청 처리 중 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.")
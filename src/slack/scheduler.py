@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from src.metrics import latency_summary_ms
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_QUEUE_DEPTH = 50
+DEFAULT_MAX_PENDING_PER_USER = 3
+METRIC_WINDOW = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class SchedulerStats:
+    submitted: int
+    completed: int
+    failed: int
+    rejected: int
+    queued: int
+    running: int
+    queue_wait: dict[str, float] = field(default_factory=dict)
+    service_time: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class _Job:
+    user_id: str
+    run: Callable[[], None]
+    enqueued_at: float
+
+
+class QuestionScheduler:
+    """Slack 질문을 고정 개수 워커로 처리하는 스케줄러.
+
+    사용자별 대기열을 라운드로빈으로 꺼내 한 사용자의 연속 질문이 다른 사용자를 막지 않게 하고,
+    전체 대기 수가 `max_queue_depth`를 넘거나 사용자 대기 수가 `max_pending_per_user`를 넘으면 바로 거절한다.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = DEFAULT_WORKERS,
+        max_queue_depth: int = DEFAULT_MAX_QUEUE_DEPTH,
+        max_pending_per_user: int | None = DEFAULT_MAX_PENDING_PER_USER,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_queue_depth = max(1, max_queue_depth)
+        self.max_pending_per_user = max_pending_per_user
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._queues: OrderedDict[str, deque[_Job]] = OrderedDict()
+        self._queued = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._queue_waits: deque[float] = deque(maxlen=METRIC_WINDOW)
+        self._service_times: deque[float] = deque(maxlen=METRIC_WINDOW)
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"question-worker-{index}", daemon=True)
+            for index in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, user_id: str, job: Callable[[], None]) -> bool:
+        """작업을 대기열에 넣는다. 대기열이 가득 찼으면 False를 반환한다."""
+        with self._condition:
+            pending = len(self._queues.get(user_id, ()))
+            if (
+                self._closed
+                or self._queued >= self.max_queue_depth
+                or (self.max_pending_per_user is not None and pending >= self.max_pending_per_user)
+            ):
+                self._rejected += 1
+                logger.info(
+                    "Question rejected user=%s queued=%d user_pending=%d running=%d",
+                    user_id,
+                    self._queued,
+                    pending,
+                    self._running,
+                )
+                return False
+
+            self._queues.setdefault(user_id, deque()).append(_Job(user_id, job, self._clock()))
+            self._queued += 1
+            self._submitted += 1
+            self._condition.notify()
+            return True
+
+    def stats(self) -> SchedulerStats:
+        with self._condition:
+            return SchedulerStats(
+                submitted=self._submitted,
+                completed=self._completed,
+                failed=self._failed,
+                rejected=self._rejected,
+                queued=self._queued,
+                running=self._running,
+                queue_wait=latency_summary_ms(list(self._queue_waits)),
+                service_time=latency_summary_ms(list(self._service_times)),
+            )
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        """새 작업을 받지 않고, 대기 중인 작업을 마저 처리한 뒤 워커를 멈춘다."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        stats = self.stats()
+        logger.info(
+            "Question scheduler stopped submitted=%d completed=%d failed=%d rejected=%d "
+            "wait_p95_ms=%.1f service_p95_ms=%.1f",
+            stats.submitted,
+            stats.completed,
+            stats.failed,
+            stats.rejected,
+            stats.queue_wait.get("p95_ms", 0.0),
+            stats.service_time.get("p95_ms", 0.0),
+        )
+
+    def _next_job(self) -> _Job | None:
+        with self._condition:
+            while not self._queued and not self._closed:
+                self._condition.wait()
+            if not self._queued:
+                return None
+            # 가장 오래 차례를 기다린 사용자의 작업을 꺼내고, 남은 작업이 있으면 그 사용자를 맨 뒤로 보낸다.
+            user_id, queue = next(iter(self._queues.items()))
+            job = queue.popleft()
+            if queue:
+                self._queues.move_to_end(user_id)
+            else:
+                del self._queues[user_id]
+            self._queued -= 1
+            self._running += 1
+            self._queue_waits.append(self._clock() - job.enqueued_at)
+            return job
+
+    def _work(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            started = self._clock()
+            failed = False
+            try:
+                job.run()
+            except Exception as error:  # noqa: BLE001 - 작업 하나의 실패가 워커를 멈추지 않도록 한다.
+                failed = True
+                logger.exception("Question job failed user=%s: %s", job.user_id, error)
+            service_seconds = self._clock() - started
+            with self._condition:
+                self._running -= 1
+                self._service_times.append(service_seconds)
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+            logger.debug(
+                "Question job finished user=%s wait_ms=%.1f service_ms=%.1f",
+                job.user_id,
+                (started - job.enqueued_at) * 1000.0,
+                service_seconds * 1000.0,
+            )
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+from src.models import QAResult
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_TEXT = ":hourglass_flowing_sand: 리포트를 찾아 답변을 작성하고 있습니다..."
+STREAMING_CURSOR = " ▌"
+DEFAULT_UPDATE_INTERVAL_SECONDS = 1.0
+# Slack section 블록 텍스트 한도(3000자)를 넘지 않도록 중간 갱신 텍스트를 자른다.
+MAX_PARTIAL_CHARS = 2900
+
+
+class _StreamState:
+    """스트리밍 메시지 위치와 갱신 간격(throttle) 상태. 동기/비동기 스트리머가 공유한다."""
+
+    def __init__(
+        self,
+        client: Any,
+        say: Callable[..., Any],
+        *,
+        update_interval_seconds: float = DEFAULT_UPDATE_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.client = client
+        self.say = say
+        self.update_interval_seconds = update_interval_seconds
+        self._clock = clock
+        self._channel: str | None = None
+        self._ts: str | None = None
+        self._last_update_at = 0.0
+        self._last_text = ""
+        self.updates = 0
+
+    @property
+    def started(self) -> bool:
+        return self._ts is not None
+
+    def _placeholder_posted(self, response: Any) -> None:
+        self._channel = response["channel"]
+        self._ts = response["ts"]
+        self._last_update_at = self._clock()
+
+    def _next_partial_text(self, partial_answer: str) -> str | None:
+        """지금 보낼 중간 갱신 텍스트. 간격이 안 됐거나 바뀐 내용이 없으면 None."""
+        if not self.started or not partial_answer.strip():
+            return None
+        now = self._clock()
+        if now - self._last_update_at < self.update_interval_seconds or partial_answer == self._last_text:
+            return None
+        self._last_update_at = now
+        self._last_text = partial_answer
+        return partial_answer[:MAX_PARTIAL_CHARS] + STREAMING_CURSOR
+
+
+class SlackAnswerStreamer(_StreamState):
+    """자리표시 메시지를 먼저 올리고 `chat.update`로 답변을 점진적으로 채우는 헬퍼.
+
+    중간 갱신은 `update_interval_seconds` 간격으로만 보내 Slack API 호출 한도를 지키고,
+    `finish`에서 출처 블록을 포함한 최종 메시지로 교체한다.
+    """
+
+    def start(self) -> bool:
+        """자리표시 메시지를 올린다. 실패하면 False를 반환해 호출자가 일반 응답으로 처리하게 한다."""
+        try:
+            self._placeholder_posted(self.say(text=PLACEHOLDER_TEXT))
+        except Exception as error:  # noqa: BLE001 - 자리표시 실패 시 스트리밍 없이 답변한다.
+            logger.warning("Failed to post streaming placeholder: %s", error)
+            return False
+        return True
+
+    def update(self, partial_answer: str) -> None:
+        text = self._next_partial_text(partial_answer)
+        if text is not None:
+            self._update(text=text)
+
+    def finish(self, result: QAResult, blocks: list[dict[str, Any]]) -> None:
+        if not self.started or not self._update(text=result.answer, blocks=blocks):
+            self.say(text=result.answer, blocks=blocks)
+
+    def _update(self, **kwargs: Any) -> bool:
+        try:
+            self.client.chat_update(channel=self._channel, ts=self._ts, **kwargs)
+        except Exception as error:  # noqa: BLE001 - 갱신 실패가 답변 생성을 멈추지 않도록 한다.
+            logger.warning("Failed to update streaming message ts=%s: %s", self._ts, error)
+            return False
+        self.updates += 1
+        return True
+
+
+class AsyncSlackAnswerStreamer(_StreamState):
+    """`SlackAnswerStreamer`의 비동기 버전. AsyncApp의 `say`/`client`를 사용한다."""
+
+    async def start(self) -> bool:
+        try:
+            self._placeholder_posted(await self.say(text=PLACEHOLDER_TEXT))
+        except Exception as error:  # noqa: BLE001 - 자리표시 실패 시 스트리밍 없이 답변한다.
+            logger.warning("Failed to post streaming placeholder: %s", error)
+            return False
+        return True
+
+    async def update(self, partial_answer: str) -> None:
+        text = self._next_partial_text(partial_answer)
+        if text is not None:
+            await self._update(text=text)
+
+    async def finish(self, result: QAResult, blocks: list[dict[str, Any]]) -> None:
+        if not self.started or not await self._update(text=result.answer, blocks=blocks):
+            await self.say(text=result.answer, blocks=blocks)
+
+    async def _update(self, **kwargs: Any) -> bool:
+        try:
+            await self.client.chat_update(channel=self._channel, ts=self._ts, **kwargs)
+        except Exception as error:  # noqa: BLE001 - 갱신 실패가 답변 생성을 멈추지 않도록 한다.
+            logger.warning("Failed to update streaming message ts=%s: %s", self._ts, error)
+            return False
+        self.updates += 1
+        return True
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from src.rag.chain import ReportQAChain
+from src.rag.embedding_cache import CachedQueryEmbeddings
+
+logger = logging.getLogger(__name__)
+
+# 종목 필터(규칙 경로), 증권사/기간 필터, 필터 없는 주제 질문(SelfQuery 경로)을 한 번씩 거치도록 고른다.
+DEFAULT_WARMUP_QUERIES = (
+    "삼성전자 목표주가",
+    "최근 한 달 미래에셋증권 SK하이닉스 리포트",
+    "반도체 업황에 대한 증권사 의견",
+)
+DEFAULT_ANSWER_QUERIES = 1
+
+
+@dataclass(slots=True)
+class WarmupReport:
+    timings_ms: dict[str, float] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.timings_ms.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total_ms": round(self.total_ms, 1),
+            "timings_ms": {name: round(value, 1) for name, value in self.timings_ms.items()},
+            "errors": dict(self.errors),
+        }
+
+
+def warm_up(
+    chain: ReportQAChain,
+    *,
+    queries: Sequence[str] = DEFAULT_WARMUP_QUERIES,
+    answer_queries: int = DEFAULT_ANSWER_QUERIES,
+) -> WarmupReport:
+    """첫 질문 전에 지연 초기화되는 자원을 미리 연다.
+
+    벡터 컬렉션을 열고, 질의 임베딩 캐시를 건너뛰어 임베딩 API 연결을 연 다음,
+    예시 질의로 검색(HNSW 세그먼트 로드, SelfQuery 연결, 보조 인덱스)을 한 번씩 돌린 뒤,
+    앞의 `answer_queries`개는 답변까지 생성해 LLM 연결을 연다. 단계가 실패해도 기록만 하고 계속한다.
+    """
+    report = WarmupReport()
+    _run_step(report, "vector_index", lambda: _touch_vector_index(chain))
+    embeddings = _uncached_query_embeddings(chain)
+    if embeddings is not None:
+        _run_step(report, "embedding_client", lambda: embeddings.embed_query(_warmup_text(queries)))
+    for index, query in enumerate(queries):
+        _run_step(report, f"retrieve[{index}]", lambda query=query: chain.retriever.retrieve(query))
+    for index, query in enumerate(queries[: max(0, answer_queries)]):
+        _run_step(report, f"answer[{index}]", lambda query=query: chain.ask(query))
+    _log_report(report)
+    return report
+
+
+async def awarm_up(
+    chain: ReportQAChain,
+    *,
+    queries: Sequence[str] = DEFAULT_WARMUP_QUERIES,
+    answer_queries: int = DEFAULT_ANSWER_QUERIES,
+) -> WarmupReport:
+    """`warm_up`의 비동기 버전. 비동기 HTTP 클라이언트는 이벤트 루프에 묶이므로 서빙할 루프 안에서 호출한다."""
+    report = WarmupReport()
+    _run_step(report, "vector_index", lambda: _touch_vector_index(chain))
+    embeddings = _uncached_query_embeddings(chain)
+    if embeddings is not None:
+        await _arun_step(report, "embedding_client", lambda: embeddings.aembed_query(_warmup_text(queries)))
+    for index, query in enumerate(queries):
+        await _arun_step(report, f"retrieve[{index}]", lambda query=query: chain.retriever.aretrieve(query))
+    for index, query in enumerate(queries[: max(0, answer_queries)]):
+        await _arun_step(report, f"answer[{index}]", lambda query=query: chain.aask(query))
+    _log_report(report)
+    return report
+
+
+def mark_ready(path: str | Path, report: WarmupReport | None = None) -> None:
+    """준비 완료 파일을 쓴다. 헬스 체크가 반쯤 쓴 파일을 읽지 않도록 임시 파일을 바꿔치기한다."""
+    ready_path = Path(path)
+    ready_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "ready_at": datetime.now(UTC).isoformat(),
+        "pid": os.getpid(),
+        "warmup": report.to_dict() if report is not None else None,
+    }
+    temp_path = ready_path.with_name(f"{ready_path.name}.tmp")
+    temp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    temp_path.replace(ready_path)
+
+
+def clear_ready(path: str | Path) -> None:
+    Path(path).unlink(missing_ok=True)
+
+
+def _touch_vector_index(chain: ReportQAChain) -> None:
+    collection = getattr(chain.retriever.vectorstore, "_collection", None)
+    if collection is not None:
+        logger.info("Vector collection opened count=%d", collection.count())
+
+
+def _uncached_query_embeddings(chain: ReportQAChain) -> Any | None:
+    """질의 임베딩 캐시 안쪽의 임베딩 객체. 재시작 후 캐시 적중으로 API 연결이 열리지 않는 일을 막는다."""
+    retriever = chain.retriever
+    embeddings = getattr(retriever, "query_embeddings", None) or getattr(retriever.vectorstore, "embeddings", None)
+    while isinstance(embeddings, CachedQueryEmbeddings):
+        embeddings = embeddings.embeddings
+    return embeddings
+
+
+def _warmup_text(queries: Sequence[str]) -> str:
+    return queries[0] if queries else DEFAULT_WARMUP_QUERIES[0]
+
+
+def _run_step(report: WarmupReport, name: str, step: Callable[[], Any]) -> None:
+    started = time.perf_counter()
+    try:
+        step()
+    except Exception as error:  # noqa: BLE001 - 워밍업 실패로 봇 기동을 막지 않는다.
+        logger.warning("Warm-up step failed step=%s: %s", name, error)
+        report.errors[name] = str(error)
+    report.timings_ms[name] = (time.perf_counter() - started) * 1000.0
+
+
+async def _arun_step(report: WarmupReport, name: str, step: Callable[[], Awaitable[Any]]) -> None:
+    started = time.perf_counter()
+    try:
+        await step()
+    except Exception as error:  # noqa: BLE001 - 워밍업 실패로 봇 기동을 막지 않는다.
+        logger.warning("Warm-up step failed step=%s: %s", name, error)
+        report.errors[name] = str(error)
+    report.timings_ms[name] = (time.perf_counter() - started) * 1000.0
+
+
+def _log_report(report: WarmupReport) -> None:
+    logger.info(
+        "Warm-up finished total_ms=%.1f steps=%s errors=%d",
+        report.total_ms,
+        " ".join(f"{name}={value:.0f}" for name, value in report.timings_ms.items()),
+        len(report.errors),
+    )
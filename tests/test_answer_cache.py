@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+from src.models import QAResult
+from src.pipeline.registry import MetadataRegistry
+from src.rag.answer_cache import AnswerCache, RegistryGenerations
+
+
+def _chunk(document_id: str, chunk_index: int) -> Document:
+    return Document(
+        id=f"{document_id}::chunk_{chunk_index}",
+        page_content="본문",
+        metadata={"document_id": document_id, "chunk_index": chunk_index},
+    )
+
+
+def test_answer_cache_keys_on_question_chunks_and_generation() -> None:
+    generations = {"doc_a": 1, "doc_b": 1}
+    cache = AnswerCache(max_entries=8, generations=lambda: dict(generations))
+    documents = [_chunk("doc_a", 0), _chunk("doc_b", 3)]
+    result = QAResult(answer="목표주가는 12만원입니다.")
+
+    cache.put("삼성전자 목표주가?", documents, result)
+
+    assert cache.get("  삼성전자   목표주가 ", list(reversed(documents))) is result
+    assert cache.get("삼성전자 목표주가", [_chunk("doc_a", 0)]) is None
+
+    generations["doc_b"] = 2
+    assert cache.get("삼성전자 목표주가", documents) is None
+    assert cache.stats().size == 0
+    assert cache.stats().hits == 1
+
+
+def test_mark_indexed_bumps_registry_generation(tmp_path: Path) -> None:
+    registry = MetadataRegistry(path=tmp_path / "metadata.json")
+    generations = RegistryGenerations(registry, check_interval_seconds=0)
+
+    registry.mark_indexed("doc_a", file_hash="sha256:1")
+    assert generations() == {"doc_a": 1}
+
+    registry.mark_indexed("doc_a", file_hash="sha256:2")
+    stat = registry.path.stat()
+    os.utime(registry.path, (stat.st_atime, stat.st_mtime + 10))
+    assert generations() == {"doc_a": 2}
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+from slack_bolt.async_app import AsyncApp
+from slack_bolt.authorization import AuthorizeResult
+from slack_bolt.request.async_request import AsyncBoltRequest
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
+
+from src.models import QAResult
+from src.rag.chain import ReportQAChain
+from src.rag.retriever import ReportRetriever
+from src.slack.dedup import EventDeduplicator
+from src.slack.handlers import register_async_handlers
+
+
+class _AsyncEmbeddings:
+    def __init__(self) -> None:
+        self.sync_calls: list[str] = []
+        self.async_calls: list[str] = []
+
+    def embed_query(self, text: str) -> list[float]:
+        self.sync_calls.append(text)
+        return [1.0, 0.0]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        self.async_calls.append(text)
+        return [1.0, 0.0]
+
+
+class _VectorSearchStore:
+    def __init__(self) -> None:
+        self.embeddings = _AsyncEmbeddings()
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self, embedding: list[float], k: int, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        return [(Document(page_content="HBM 수요 확대", metadata={"document_id": "doc_a"}), 0.1)]
+
+    def _select_relevance_score_fn(self):
+        return lambda distance: 1.0 - distance
+
+
+@pytest.mark.asyncio
+async def test_aretrieve_uses_async_query_embedding() -> None:
+    store = _VectorSearchStore()
+    retriever = ReportRetriever(
+        vectorstore=store,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+        self_query_enabled=False,
+    )
+
+    documents, trace = await retriever.aretrieve_with_trace("HBM 전망")
+
+    assert [document.page_content for document in documents] == ["HBM 수요 확대"]
+    assert store.embeddings.async_calls == ["HBM 전망"]
+    assert store.embeddings.sync_calls == []
+    assert "async_embedding" in trace.timings_ms
+
+
+class _AsyncRetriever:
+    async def aretrieve(self, query: str) -> list[Document]:
+        return [Document(page_content="목표주가 12만원", metadata={"broker": "미래에셋증권", "document_id": "doc_a"})]
+
+
+@pytest.mark.asyncio
+async def test_aask_streams_partial_answers_to_async_callback() -> None:
+    chain = ReportQAChain(retriever=_AsyncRetriever(), openai_api_key="test-key")  # type: ignore[arg-type]
+    chain.chain = RunnableLambda(lambda inputs: f"{inputs['question']} → 12만원")
+    partials: list[str] = []
+
+    async def on_partial(text: str) -> None:
+        partials.append(text)
+
+    result = await chain.aask("목표주가?", on_partial_answer=on_partial)
+
+    assert result.answer == "목표주가? → 12만원"
+    assert partials[-1] == result.answer
+    assert result.sources[0]["broker"] == "미래에셋증권"
+
+
+class _CountingAsyncChain:
+    def __init__(self) -> None:
+        self.questions: list[str] = []
+
+    async def aask(self, question: str, **_: Any) -> QAResult:
+        self.questions.append(question)
+        return QAResult(answer="답변", sources=[], retrieved_documents=[])
+
+
+async def _authorize(**_: Any) -> AuthorizeResult:
+    return AuthorizeResult(enterprise_id=None, team_id="T1", bot_token="xoxb-test", bot_user_id="UBOT", bot_id="B1")
+
+
+@pytest.mark.asyncio
+async def test_async_handlers_answer_mentions_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[tuple[str, dict[str, Any]]] = []
+
+    async def api_call(self: AsyncWebClient, api_method: str, **kwargs: Any) -> AsyncSlackResponse:
+        calls.append((api_method, kwargs.get("json") or kwargs.get("params") or {}))
+        return AsyncSlackResponse(
+            client=self,
+            http_verb="POST",
+            api_url=api_method,
+            req_args={},
+            data={"ok": True, "ts": "1.0", "channel": "C1"},
+            headers={},
+            status_code=200,
+        )
+
+    monkeypatch.setattr(AsyncWebClient, "api_call", api_call)
+    app = AsyncApp(
+        signing_secret="secret",
+        request_verification_enabled=False,
+        process_before_response=True,
+        authorize=_authorize,
+    )
+    chain = _CountingAsyncChain()
+    register_async_handlers(app, qa_chain=chain, deduplicator=EventDeduplicator())  # type: ignore[arg-type]
+    body = {
+        "type": "event_callback",
+        "team_id": "T1",
+        "event_id": "Ev1",
+        "event": {
+            "type": "app_mention",
+            "user": "U1",
+            "channel": "C1",
+            "text": "<@UBOT> 삼성전자 목표주가",
+            "ts": "1.0",
+        },
+    }
+
+    for _ in range(2):
+        response = await app.async_dispatch(
+            AsyncBoltRequest(body=json.dumps(body), headers={"content-type": ["application/json"]})
+        )
+        assert response.status == 200
+
+    assert chain.questions == ["삼성전자 목표주가"]
+    assert [method for method, _ in calls] == ["chat.postMessage"]
+    assert calls[0][1]["text"] == "답변"
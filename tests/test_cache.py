@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.rag.cache import LRUTTLCache, normalize_question
+from src.rag.embedding_cache import CachedQueryEmbeddings, QueryEmbeddingCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _CountingEmbeddings:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def embed_query(self, text: str) -> list[float]:
+        self.calls.append(text)
+        return [float(len(text)), 1.0]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        raise AssertionError("질문을 문서(passage) 모델로 임베딩했다")
+
+
+def test_normalize_question_ignores_spacing_case_and_trailing_punctuation() -> None:
+    assert normalize_question("  삼성전자   목표주가?? ") == normalize_question("삼성전자 목표주가")
+    assert normalize_question("ＫＢ증권 Report") == "kb증권 report"
+
+
+def test_lru_ttl_cache_evicts_and_expires() -> None:
+    clock = _Clock()
+    cache: LRUTTLCache[str, int] = LRUTTLCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    clock.now += 11
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.expirations == 1
+    assert stats.hits == 1
+
+
+def test_query_embedding_cache_skips_repeat_calls_and_persists(tmp_path: Path) -> None:
+    path = tmp_path / "query_embeddings.npz"
+    embeddings = _CountingEmbeddings()
+    cached = CachedQueryEmbeddings(
+        embeddings,  # type: ignore[arg-type]
+        QueryEmbeddingCache(path=path),
+        model="embedding-query",
+    )
+
+    first = cached.embed_query("삼성전자 목표주가")
+    assert cached.embed_query("삼성전자  목표주가?") == first
+    assert len(embeddings.calls) == 1
+    assert cached.cache.stats().hit_rate == 0.5
+    cached.cache.save()
+
+    restarted = CachedQueryEmbeddings(
+        embeddings,  # type: ignore[arg-type]
+        QueryEmbeddingCache(path=path),
+        model="embedding-query",
+    )
+    assert restarted.embed_query("삼성전자 목표주가") == first
+    assert len(embeddings.calls) == 1
+
+    other_model = CachedQueryEmbeddings(
+        embeddings,  # type: ignore[arg-type]
+        QueryEmbeddingCache(path=path),
+        model="other-model",
+    )
+    other_model.embed_query("삼성전자 목표주가")
+    assert len(embeddings.calls) == 2
+
+
+def test_cached_query_embeddings_batches_only_cache_misses() -> None:
+    embeddings = _CountingEmbeddings()
+    cached = CachedQueryEmbeddings(embeddings, QueryEmbeddingCache(max_entries=8), model="m")  # type: ignore[arg-type]
+
+    cached.embed_query("삼성전자")
+    vectors = cached.embed_queries(["삼성전자?", "SK하이닉스", "SK하이닉스"])
+
+    assert embeddings.calls == ["삼성전자", "SK하이닉스"]
+    assert vectors == [[4.0, 1.0], [6.0, 1.0], [6.0, 1.0]]
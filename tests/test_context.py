@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from langchain_core.documents import Document
+
+from src.rag.context import ContextBuilder, TokenCounter
+
+
+def _chunk(document_id: str, chunk_index: int, text: str) -> Document:
+    return Document(
+        id=f"{document_id}::chunk_{chunk_index}",
+        page_content=text,
+        metadata={
+            "document_id": document_id,
+            "chunk_index": chunk_index,
+            "broker": "미래에셋증권",
+            "company_name": "삼성전자",
+            "date": "2026-02-10",
+            "source_file": f"{document_id}.pdf",
+        },
+    )
+
+
+def test_context_builder_compacts_headers_and_fits_budget() -> None:
+    counter = TokenCounter()
+    documents = [
+        _chunk("doc_a", 0, "HBM 수요가 늘고 있다. " * 20),
+        _chunk("doc_a", 5, "목표주가 12만원 유지. " * 20),
+        _chunk("doc_b", 1, "파운드리 적자 축소. " * 20),
+        _chunk("doc_c", 2, "배당 확대 기대. " * 200),
+    ]
+    budget = sum(counter.count(document.page_content) for document in documents[:3]) + 200
+
+    built = ContextBuilder(token_budget=budget, counter=counter).build(documents)
+
+    assert built.text.count("[출처") == len({document.metadata["document_id"] for document in built.documents})
+    assert built.text.count("doc_a.pdf") == 1
+    assert [document.id for document in built.documents[:3]] == [document.id for document in documents[:3]]
+    assert built.dropped + built.trimmed >= 1
+    assert counter.count(built.text) <= budget
+
+
+def test_context_builder_merges_adjacent_chunks_and_trims_first_chunk() -> None:
+    overlap = "겹치는 문장이 충분히 길게 이어진다 " * 2
+    documents = [
+        _chunk("doc_a", 0, "첫 번째 청크 본문. " + overlap),
+        _chunk("doc_a", 1, overlap + "두 번째 청크 본문."),
+    ]
+
+    merged = ContextBuilder(token_budget=1000).build(documents)
+    assert merged.merged == 1
+    assert merged.text.count(overlap) == 1
+
+    trimmed = ContextBuilder(token_budget=10).build([_chunk("doc_z", 0, "긴 본문 " * 100)])
+    assert len(trimmed.documents) == 1
+    assert trimmed.trimmed == 1
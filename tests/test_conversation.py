@@ -0,0 +1,153 @@
+from typing import Any
+
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+
+from src.pipeline.registry import MetadataRegistry
+from src.rag.chain import ReportQAChain
+from src.rag.conversation import (
+    SCOPE_OTHER_BROKERS,
+    SCOPE_SAME_COMPANY,
+    SCOPE_SAME_DOCUMENTS,
+    ConversationCache,
+    RegistryCompanyNames,
+    ThreadContext,
+    plan_follow_up,
+)
+
+
+def _doc(document_id: str, broker: str, ticker: str = "005930", company_name: str = "삼성전자") -> Document:
+    return Document(
+        page_content=f"{company_name} {broker} 리포트 본문",
+        metadata={
+            "document_id": document_id,
+            "chunk_index": 0,
+            "broker": broker,
+            "ticker": ticker,
+            "company_name": company_name,
+            "date": "2024-11-01",
+        },
+    )
+
+
+CONTEXT = ThreadContext.from_documents(
+    "삼성전자 HBM 전망 알려줘",
+    [_doc("doc-a", "미래에셋증권"), _doc("doc-b", "KB증권"), _doc("doc-a", "미래에셋증권")],
+)
+
+
+def test_thread_context_collects_entities() -> None:
+    assert CONTEXT.tickers == ("005930",)
+    assert CONTEXT.company_names == ("삼성전자",)
+    assert CONTEXT.brokers == ("미래에셋증권", "KB증권")
+    assert CONTEXT.document_ids == ("doc-a", "doc-b")
+
+
+def test_short_follow_up_stays_within_previous_reports() -> None:
+    follow_up = plan_follow_up("그럼 목표주가는?", CONTEXT)
+
+    assert follow_up is not None
+    assert follow_up.scope == SCOPE_SAME_DOCUMENTS
+    assert follow_up.metadata_filter == {"document_id": {"$in": ["doc-a", "doc-b"]}}
+    assert follow_up.query == "삼성전자 그럼 목표주가는?"
+    assert "삼성전자 HBM 전망" in follow_up.prompt_question
+
+
+def test_short_question_naming_a_new_company_is_a_new_topic() -> None:
+    known = {"삼성전자", "SK하이닉스", "카카오"}
+
+    assert plan_follow_up("SK하이닉스 전망은?", CONTEXT, known_companies=known) is None
+    assert plan_follow_up("카카오 목표주가?", CONTEXT, known_companies=known) is None
+    assert plan_follow_up("삼성전자 목표주가?", CONTEXT, known_companies=known) is not None
+    assert plan_follow_up("그럼 목표주가는?", CONTEXT, known_companies=known) is not None
+
+
+def test_registry_company_names_feed_the_conversation_cache(tmp_path) -> None:
+    registry = MetadataRegistry(tmp_path / "metadata.json")
+    data = registry.load()
+    data["documents"] = {
+        "doc-a": {"metadata": {"company_name": "삼성전자"}},
+        "doc-c": {"metadata": {"company_name": "카카오"}},
+        "doc-x": {},
+    }
+    registry.save(data)
+    cache = ConversationCache(known_companies=RegistryCompanyNames(registry, check_interval_seconds=0))
+    cache.remember("C1:1.0", "삼성전자 HBM 전망 알려줘", [_doc("doc-a", "미래에셋증권")])
+
+    assert cache.plan("C1:1.0", "카카오 목표주가?") is None
+    assert cache.plan("C1:1.0", "목표주가는?") is not None
+
+
+def test_other_broker_follow_up_excludes_previous_brokers() -> None:
+    follow_up = plan_follow_up("다른 증권사 의견은?", CONTEXT)
+
+    assert follow_up is not None
+    assert follow_up.scope == SCOPE_OTHER_BROKERS
+    assert follow_up.metadata_filter == {
+        "$and": [{"ticker": "005930"}, {"broker": {"$nin": ["미래에셋증권", "KB증권"]}}]
+    }
+
+
+def test_new_broker_or_topic_changes_scope() -> None:
+    follow_up = plan_follow_up("삼성증권은 어떻게 봐?", CONTEXT)
+    assert follow_up is not None
+    assert follow_up.scope == SCOPE_SAME_COMPANY
+    assert follow_up.metadata_filter == {"ticker": "005930"}
+
+    assert plan_follow_up("000660 목표주가는?", CONTEXT) is None
+    assert plan_follow_up("SK하이닉스 HBM3E 양산 일정과 수율 개선 전망을 알려줘", CONTEXT) is None
+
+
+def test_conversation_cache_expires_and_caps_threads() -> None:
+    now = [0.0]
+    cache = ConversationCache(max_threads=2, ttl_seconds=60, clock=lambda: now[0])
+    for key in ("t1", "t2", "t3"):
+        cache.remember(key, "삼성전자 전망", [_doc("doc-a", "KB증권")])
+    cache.remember("t4", "결과 없음", [])
+
+    assert cache.get("t1") is None
+    assert cache.get("t4") is None
+    assert cache.get("t3") is not None
+    now[0] = 61.0
+    assert cache.get("t3") is None
+
+
+class _ScopedRetriever:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, Any]] = []
+
+    def retrieve(self, query: str, k: int | None = None, *, scope: Any = None) -> list[Document]:
+        self.calls.append((query, scope))
+        if scope is None:
+            return [_doc("doc-a", "미래에셋증권"), _doc("doc-b", "KB증권")]
+        if "$and" in scope:
+            return []
+        return [_doc("doc-a", "미래에셋증권")]
+
+
+def test_chain_answers_follow_up_within_thread_context() -> None:
+    retriever = _ScopedRetriever()
+    chain = ReportQAChain(
+        retriever=retriever,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+        conversations=ConversationCache(),
+    )
+    chain.chain = RunnableLambda(lambda inputs: inputs["question"])
+
+    chain.ask("삼성전자 HBM 전망 알려줘", thread_key="C1:1.0")
+    result = chain.ask("그럼 목표주가는?", thread_key="C1:1.0")
+    assert retriever.calls[1] == ("삼성전자 그럼 목표주가는?", {"document_id": {"$in": ["doc-a", "doc-b"]}})
+    assert result.answer.startswith("(이전 질문: 삼성전자 HBM 전망 알려줘)")
+
+    # 범위 검색 결과가 없으면 원래 질문으로 전체 검색한다.
+    chain.ask("다른 증권사 의견은?", thread_key="C1:1.0")
+    assert retriever.calls[-2:] == [
+        ("삼성전자 다른 증권사 의견은?", {"$and": [{"ticker": "005930"}, {"broker": {"$nin": ["미래에셋증권"]}}]}),
+        ("다른 증권사 의견은?", None),
+    ]
+    # 전체 검색으로 답했으므로 이전 종목명을 붙인 질의가 아니라 원래 질문을 기억한다.
+    assert chain.conversations.get("C1:1.0").question == "다른 증권사 의견은?"  # type: ignore[union-attr]
+
+    # 다른 스레드는 문맥을 공유하지 않는다.
+    chain.ask("그럼 목표주가는?", thread_key="C2:2.0")
+    assert retriever.calls[-1] == ("그럼 목표주가는?", None)
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import chromadb
+from langchain_core.documents import Document
+
+from src.rag.diversify import cap_per_document, maximal_marginal_relevance, merge_adjacent_chunks
+from src.rag.retriever import ReportRetriever
+
+
+def _chunk(document_id: str, chunk_index: int, text: str) -> Document:
+    return Document(page_content=text, metadata={"document_id": document_id, "chunk_index": chunk_index})
+
+
+def test_mmr_skips_near_duplicates_and_respects_group_cap() -> None:
+    query = [1.0, 0.2]
+    vectors = [[1.0, 0.2], [0.99, 0.21], [0.7, 0.7], [0.98, 0.19]]
+
+    assert maximal_marginal_relevance(query, vectors, k=2, lambda_mult=0.5) == [0, 2]
+    assert maximal_marginal_relevance(
+        query,
+        vectors,
+        k=3,
+        lambda_mult=1.0,
+        groups=["a", "a", "b", "c"],
+        max_per_group=1,
+    ) == [0, 3, 2]
+
+
+def test_cap_per_document_keeps_rank_order() -> None:
+    documents = [_chunk("a", 0, "a0"), _chunk("a", 5, "a5"), _chunk("b", 0, "b0"), _chunk("a", 9, "a9")]
+
+    assert [doc.page_content for doc in cap_per_document(documents, 2)] == ["a0", "a5", "b0"]
+
+
+def test_merge_adjacent_chunks_removes_overlap_text() -> None:
+    overlap = "영업이익은 전년 대비 35% 증가한 6.6조원으로 추정된다."
+    documents = [
+        _chunk("a", 4, f"HBM 출하 확대로 {overlap}"),
+        _chunk("b", 0, "다른 리포트"),
+        _chunk("a", 3, f"4분기 메모리 가격 상승. {overlap[:10]}"),
+        _chunk("a", 5, f"{overlap} 목표주가 유지."),
+    ]
+
+    merged = merge_adjacent_chunks(documents)
+
+    assert [doc.metadata.get("merged_chunk_indexes") for doc in merged] == [[3, 4, 5], None]
+    assert merged[0].page_content.count(overlap) == 1
+    assert merged[0].page_content.endswith("목표주가 유지.")
+
+
+class _CollectionStore:
+    def __init__(self) -> None:
+        self.collection = chromadb.EphemeralClient().get_or_create_collection(
+            "diversify_test", metadata={"hnsw:space": "cosine"}
+        )
+        self.collection.upsert(
+            ids=["a::chunk_0", "a::chunk_1", "b::chunk_0"],
+            embeddings=[[1.0, 0.0], [0.99, 0.01], [0.8, 0.6]],
+            documents=["a0", "a1", "b0"],
+            metadatas=[
+                {"document_id": "a", "chunk_index": 0},
+                {"document_id": "a", "chunk_index": 1},
+                {"document_id": "b", "chunk_index": 0},
+            ],
+        )
+        self.embeddings = self
+
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0]
+
+    def similarity_search_by_vector_with_relevance_scores(self, embedding, k, **kwargs):
+        result = self.collection.query(query_embeddings=[embedding], n_results=k)
+        return [
+            (Document(id=chunk_id, page_content=content, metadata=metadata), distance)
+            for chunk_id, content, metadata, distance in zip(
+                result["ids"][0], result["documents"][0], result["metadatas"][0], result["distances"][0], strict=True
+            )
+        ]
+
+    def _select_relevance_score_fn(self):
+        return lambda distance: 1.0 - distance
+
+    def get(self, **kwargs) -> dict:
+        return self.collection.get(**kwargs)
+
+
+def test_retriever_diversifies_results_with_stored_embeddings() -> None:
+    retriever = ReportRetriever(
+        vectorstore=_CollectionStore(),  # type: ignore[arg-type]
+        openai_api_key="test-key",
+        k=2,
+        score_threshold=0.3,
+        mmr_enabled=True,
+        max_chunks_per_document=1,
+    )
+
+    assert [doc.id for doc in retriever.retrieve("일반 질의")] == ["a::chunk_0", "b::chunk_0"]
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.embeddings import Embeddings
+from langchain_upstage import UpstageEmbeddings
+
+from src.rag.embedding_batcher import QueryEmbeddingBatcher
+from src.rag.embedding_cache import CachedQueryEmbeddings, QueryEmbeddingCache, embed_query_batch
+
+
+class _RecordingEmbeddings(Embeddings):
+    def __init__(self, *, fail: bool = False) -> None:
+        self.batches: list[list[str]] = []
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        with self._lock:
+            self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("embedding api down")
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_queries([text])[0]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        raise AssertionError("질문을 문서(passage) 모델로 임베딩했다")
+
+
+class _QueryOnlyEmbeddings(Embeddings):
+    def __init__(self) -> None:
+        self.queries: list[str] = []
+        self._lock = threading.Lock()
+
+    def embed_query(self, text: str) -> list[float]:
+        with self._lock:
+            self.queries.append(text)
+        return [float(len(text)), 0.0]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        raise AssertionError("질문을 문서(passage) 모델로 임베딩했다")
+
+
+def test_concurrent_queries_share_one_batched_call() -> None:
+    embeddings = _RecordingEmbeddings()
+    batcher = QueryEmbeddingBatcher(embeddings, max_batch_size=8, max_wait_ms=200)
+    queries = ["삼성전자", "SK하이닉스 HBM", "삼성전자", "NAVER 광고", "카카오"]
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        vectors = list(executor.map(batcher.embed_query, queries))
+    batcher.close()
+
+    assert vectors == [[float(len(query)), 1.0] for query in queries]
+    assert len(embeddings.batches) < len(queries)
+    stats = batcher.stats()
+    assert stats.requests == len(queries)
+    assert stats.embedded_texts == sum(len(batch) for batch in embeddings.batches)
+
+
+def test_batch_size_limit_and_error_propagation() -> None:
+    embeddings = _RecordingEmbeddings(fail=True)
+    batcher = QueryEmbeddingBatcher(embeddings, max_batch_size=2, max_wait_ms=200)
+
+    futures = [batcher.submit(f"질문 {index}") for index in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="embedding api down"):
+            future.result(timeout=5)
+    batcher.close()
+
+    assert max(len(batch) for batch in embeddings.batches) <= 2
+
+
+def test_requests_racing_close_are_answered_or_rejected() -> None:
+    embeddings = _RecordingEmbeddings()
+    batcher = QueryEmbeddingBatcher(embeddings, max_batch_size=4, max_wait_ms=1)
+    start = threading.Barrier(9)
+    outcomes: list[object] = []
+
+    def _submit(index: int) -> None:
+        start.wait()
+        try:
+            outcomes.append(batcher.submit(f"질문 {index}"))
+        except RuntimeError:
+            outcomes.append("rejected")
+
+    threads = [threading.Thread(target=_submit, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    batcher.close()
+    for thread in threads:
+        thread.join()
+
+    futures = [outcome for outcome in outcomes if outcome != "rejected"]
+    assert len(outcomes) == 8
+    assert all(future.result(timeout=5) for future in futures)  # type: ignore[union-attr]
+
+
+def test_batched_dispatch_never_uses_document_embeddings() -> None:
+    embeddings = _QueryOnlyEmbeddings()
+    batcher = QueryEmbeddingBatcher(embeddings, max_batch_size=8, max_wait_ms=200)
+    queries = ["삼성전자", "SK하이닉스 HBM", "NAVER 광고", "카카오"]
+
+    futures = [batcher.submit(query) for query in queries]
+    vectors = [future.result(timeout=5) for future in futures]
+    batcher.close()
+
+    assert vectors == [[float(len(query)), 0.0] for query in queries]
+    assert batcher.stats().max_batch_size > 1
+    assert sorted(embeddings.queries) == sorted(queries)
+
+
+def test_upstage_batch_goes_to_query_model() -> None:
+    calls: list[tuple[list[str], dict]] = []
+
+    class _Client:
+        def create(self, input: list[str], **params: object) -> SimpleNamespace:
+            calls.append((list(input), dict(params)))
+            return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text))]) for text in input])
+
+    embeddings = UpstageEmbeddings(api_key="test", model="embedding")
+    embeddings.client = _Client()
+
+    assert embed_query_batch(embeddings, ["삼성전자", "카카오"]) == [[4.0], [3.0]]
+    assert [params["model"] for _, params in calls] == ["embedding-query"]
+
+
+def test_cached_misses_reach_batcher_as_one_query_batch() -> None:
+    embeddings = _RecordingEmbeddings()
+    batcher = QueryEmbeddingBatcher(embeddings, max_batch_size=8, max_wait_ms=200)
+    cached = CachedQueryEmbeddings(batcher, QueryEmbeddingCache(max_entries=8), model="m")
+
+    vectors = cached.embed_queries(["삼성전자", "카카오", "삼성전자"])
+    batcher.close()
+
+    assert vectors == [[4.0, 1.0], [3.0, 1.0], [4.0, 1.0]]
+    assert embeddings.batches == [["삼성전자", "카카오"]]
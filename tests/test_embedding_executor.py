@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from src.pipeline.embedding_executor import EmbeddingExecutor
+
+
+class _RecordingEmbeddings:
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        with self._lock:
+            self.batches.append(list(texts))
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        time.sleep(0.02)
+        with self._lock:
+            self._in_flight -= 1
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return [float(len(text))]
+
+
+def test_executor_batches_by_token_budget_and_preserves_order() -> None:
+    embeddings = _RecordingEmbeddings()
+    executor = EmbeddingExecutor(
+        embeddings,  # type: ignore[arg-type]
+        max_batch_tokens=10,
+        max_batch_size=100,
+        max_concurrency=4,
+        token_counter=len,
+    )
+    texts = ["a" * (index % 5 + 1) for index in range(20)]
+
+    vectors = executor.embed(texts)
+
+    assert vectors == [[float(len(text))] for text in texts]
+    assert all(sum(len(text) for text in batch) <= 10 for batch in embeddings.batches)
+    assert embeddings.max_in_flight > 1
+    assert executor.last_stats.total_texts == 20
+    assert len(executor.last_stats.batches) == len(embeddings.batches)
+    assert executor.metrics()["texts"] == 20.0
@@ -0,0 +1,125 @@
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+from slack_bolt import App, BoltRequest
+from slack_bolt.authorization import AuthorizeResult
+from slack_sdk import WebClient
+from slack_sdk.web import SlackResponse
+
+from src.models import QAResult
+from src.slack.dedup import (
+    EventDeduplicator,
+    MemoryEventClaimStore,
+    SQLiteEventClaimStore,
+    event_dedup_key,
+)
+from src.slack.handlers import register_handlers
+
+
+def _body(event_id: str = "Ev1") -> dict[str, Any]:
+    return {
+        "type": "event_callback",
+        "team_id": "T1",
+        "event_id": event_id,
+        "event": {
+            "type": "app_mention",
+            "user": "U1",
+            "channel": "C1",
+            "text": "<@UBOT> 삼성전자 목표주가",
+            "ts": "1700000000.000100",
+            "event_ts": "1700000000.000100",
+        },
+    }
+
+
+def test_event_dedup_key_prefers_event_id() -> None:
+    assert event_dedup_key(_body("Ev9")) == "event:Ev9"
+    body = _body()
+    del body["event_id"]
+    assert event_dedup_key(body) == "message:C1:1700000000.000100"
+    assert event_dedup_key({"type": "block_actions"}) is None
+
+
+def test_memory_store_expires_and_caps_entries() -> None:
+    store = MemoryEventClaimStore(max_entries=2)
+    assert store.claim("a", now=0.0, ttl_seconds=10)
+    assert not store.claim("a", now=5.0, ttl_seconds=10)
+    assert store.claim("a", now=10.0, ttl_seconds=10)
+
+    assert store.claim("b", now=11.0, ttl_seconds=10)
+    assert store.claim("c", now=12.0, ttl_seconds=10)
+    assert len(store) == 2
+
+
+def test_sqlite_store_claims_once_across_replicas(tmp_path: Path) -> None:
+    path = tmp_path / "claims.sqlite3"
+    replicas = [EventDeduplicator(SQLiteEventClaimStore(path), ttl_seconds=60) for _ in range(4)]
+    results: list[bool] = []
+    lock = threading.Lock()
+
+    def deliver(deduplicator: EventDeduplicator) -> None:
+        claimed = deduplicator.claim(_body())
+        with lock:
+            results.append(claimed)
+
+    threads = [threading.Thread(target=deliver, args=(replica,)) for replica in replicas for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+    assert sum(replica.stats().duplicates for replica in replicas) == 11
+    assert replicas[0].claim(_body("Ev2"))
+
+
+class CountingChain:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def ask(self, question: str, **_: Any) -> QAResult:
+        self.calls += 1
+        return QAResult(answer="답변", sources=[], retrieved_documents=[])
+
+
+def test_redelivered_event_is_answered_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+
+    def api_call(self: WebClient, api_method: str, **_: Any) -> SlackResponse:
+        calls.append(api_method)
+        data = {"ok": True, "ts": "1.0", "channel": "C1"}
+        return SlackResponse(
+            client=self,
+            http_verb="POST",
+            api_url=api_method,
+            req_args={},
+            data=data,
+            headers={},
+            status_code=200,
+        )
+
+    monkeypatch.setattr(WebClient, "api_call", api_call)
+    app = App(
+        signing_secret="secret",
+        request_verification_enabled=False,
+        process_before_response=True,
+        authorize=lambda **_: AuthorizeResult(
+            enterprise_id=None,
+            team_id="T1",
+            bot_token="xoxb-test",
+            bot_user_id="UBOT",
+            bot_id="B1",
+        ),
+    )
+    chain = CountingChain()
+    register_handlers(app, qa_chain=chain, deduplicator=EventDeduplicator())  # type: ignore[arg-type]
+
+    for _ in range(3):
+        response = app.dispatch(BoltRequest(body=json.dumps(_body()), headers={"content-type": ["application/json"]}))
+        assert response.status == 200
+
+    assert chain.calls == 1
+    assert calls == ["chat.postMessage"]
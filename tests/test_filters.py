@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from datetime import date
+
+from src.rag.filters import QueryConstraints, compile_filter, extract_constraints
+
+TODAY = date(2026, 3, 15)
+
+
+def test_compile_filter_uses_single_clause_without_and() -> None:
+    assert compile_filter(QueryConstraints(tickers=("005930",))) == {"ticker": "005930"}
+    assert compile_filter(QueryConstraints()) == {}
+
+
+def test_extracts_quarter_range_and_multiple_tickers() -> None:
+    constraints = extract_constraints("2024년 4분기 005930 000660 비교", today=TODAY)
+
+    assert compile_filter(constraints) == {
+        "$and": [
+            {"ticker": {"$in": ["005930", "000660"]}},
+            {"date_int": {"$gte": 20241001}},
+            {"date_int": {"$lte": 20241231}},
+        ]
+    }
+
+
+def test_extracts_recent_months_and_target_price_range() -> None:
+    constraints = extract_constraints("최근 3개월 목표주가 10만원 이상 리포트", today=TODAY)
+
+    assert constraints.date_from == date(2025, 12, 15)
+    assert constraints.date_to == TODAY
+    assert constraints.target_price_min == 100_000
+    assert constraints.resolves("date")
+    assert constraints.resolves("target_price")
+    assert not constraints.resolves("ticker")
+
+
+def test_report_type_is_filtered_only_when_named_explicitly() -> None:
+    assert compile_filter(extract_constraints("삼성전자 그럼 목표주가는?", today=TODAY)) == {}
+    assert compile_filter(extract_constraints("SK하이닉스 실적 컨센서스", today=TODAY)) == {}
+    assert compile_filter(extract_constraints("삼성전자 기업분석 리포트", today=TODAY)) == {"report_type": "기업분석"}
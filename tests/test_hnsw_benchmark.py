@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.bench.hnsw import HnswParams, exact_top_k, recall_at_k, run_hnsw_benchmark, synthetic_corpus
+
+
+def test_exact_search_has_perfect_recall() -> None:
+    corpus, queries = synthetic_corpus(num_vectors=200, dim=16, num_queries=10, seed=7)
+    exact = exact_top_k(corpus, queries, k=5)
+    assert recall_at_k([row.tolist() for row in exact], exact, k=5) == 1.0
+
+
+def test_hnsw_benchmark_reports_recall_latency_and_size(tmp_path: Path) -> None:
+    corpus, queries = synthetic_corpus(num_vectors=300, dim=16, num_queries=20, seed=7)
+    grid = [HnswParams.parse("16:100:10"), HnswParams.parse("32:200:100")]
+
+    results = run_hnsw_benchmark(corpus, queries, grid, k=5, workdir=tmp_path)
+
+    assert [result.params for result in results] == grid
+    for result in results:
+        assert 0.0 < result.recall_at_k <= 1.0
+        assert result.p99_ms >= result.p50_ms > 0.0
+        assert result.build_seconds > 0.0
+        assert result.disk_bytes > 0
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.pipeline.lexical_index import LexicalIndex, tokenize
+from src.rag.hybrid import reciprocal_rank_fusion
+
+
+def test_tokenize_uses_hangul_bigrams_and_whole_alnum_tokens() -> None:
+    tokens = tokenize("삼성전자의 HBM 목표주가 85,000원 (005930)")
+
+    assert {"삼성", "성전", "전자", "hbm", "85000", "005930"} <= set(tokens)
+    assert "원" in tokens
+
+
+def test_lexical_index_updates_per_document_and_survives_reload(tmp_path: Path) -> None:
+    index = LexicalIndex(tmp_path)
+    index.upsert_document(
+        "doc-a", [("doc-a::chunk_0", "삼성전자 HBM 공급 확대"), ("doc-a::chunk_1", "반도체 업황 회복")]
+    )
+    index.upsert_document("doc-b", [("doc-b::chunk_0", "SK하이닉스 HBM3E 양산")])
+
+    assert index.search("삼성전자 HBM", k=2)[0][0] == "doc-a::chunk_0"
+    index.save()
+
+    reopened = LexicalIndex(tmp_path)
+    assert len(reopened) == 3
+    assert reopened.search("삼성전자", k=1)[0][0] == "doc-a::chunk_0"
+
+    reopened.upsert_document("doc-a", [("doc-a::chunk_0", "LG에너지솔루션 배터리")])
+    assert all(chunk_id.startswith("doc-b") for chunk_id, _ in reopened.search("HBM 반도체", k=5))
+    reopened.save()
+
+    final = LexicalIndex(tmp_path)
+    assert len(final) == 2
+    assert final.search("배터리", k=1)[0][0] == "doc-a::chunk_0"
+    assert final.search("반도체", k=5) == []
+
+
+def test_reciprocal_rank_fusion_prefers_items_ranked_by_both_lists() -> None:
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]], k=60)
+
+    assert fused[0][0] == "c"
+    assert [item_id for item_id, _ in fused] == ["c", "a", "b", "d"]
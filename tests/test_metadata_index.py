@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import chromadb
+from langchain_core.documents import Document
+
+from src.pipeline.metadata_index import MetadataIndex
+from src.rag.retriever import ReportRetriever
+
+
+def _collection():
+    collection = chromadb.EphemeralClient().get_or_create_collection("metadata_index_test")
+    collection.upsert(
+        ids=["a::chunk_0", "a::chunk_1", "b::chunk_0", "c::chunk_0"],
+        embeddings=[[1.0, 0.0], [0.9, 0.1], [0.0, 1.0], [0.5, 0.5]],
+        documents=["a0", "a1", "b0", "c0"],
+        metadatas=[
+            {"document_id": "a", "ticker": "005930", "broker": "KB증권", "date_int": 20241105},
+            {"document_id": "a", "ticker": "005930", "broker": "KB증권", "date_int": 20241105},
+            {"document_id": "b", "ticker": "000660", "broker": "KB증권", "date_int": 20240210},
+            {"document_id": "c", "ticker": "035420", "broker": "삼성증권", "date_int": 20241220},
+        ],
+    )
+    return collection
+
+
+def test_metadata_index_resolves_compound_filters_to_candidate_ids() -> None:
+    index = MetadataIndex.from_collection(_collection())
+
+    assert len(index) == 4
+    assert index.candidate_ids({"ticker": "005930"}) == ["a::chunk_0", "a::chunk_1"]
+    assert index.candidate_ids(
+        {"$and": [{"broker": {"$in": ["KB증권", "삼성증권"]}}, {"date_int": {"$gte": 20241001}}]}
+    ) == ["a::chunk_0", "a::chunk_1", "c::chunk_0"]
+    assert index.candidate_ids({"ticker": "999999"}) == []
+    assert index.candidate_ids({"analyst": "홍길동"}) is None
+
+    index.delete_document("a")
+    index.upsert(["d::chunk_0"], [{"document_id": "d", "ticker": "005930"}])
+    assert index.candidate_ids({"ticker": "005930"}) == ["d::chunk_0"]
+
+
+class _ExactScanStore:
+    def __init__(self, collection) -> None:
+        self.collection = collection
+        self.embeddings = self
+        self.ann_calls = 0
+
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0]
+
+    def similarity_search_by_vector_with_relevance_scores(self, embedding, k, **kwargs):
+        self.ann_calls += 1
+        return []
+
+    def _select_relevance_score_fn(self):
+        return lambda distance: 1.0 - distance
+
+    def get(self, **kwargs) -> dict:
+        return self.collection.get(**kwargs)
+
+
+def test_retriever_scans_small_candidate_sets_exactly() -> None:
+    collection = _collection()
+    store = _ExactScanStore(collection)
+    retriever = ReportRetriever(
+        vectorstore=store,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+        score_threshold=0.3,
+        metadata_index=MetadataIndex.from_collection(collection, refresh_interval_seconds=0),
+    )
+
+    docs = retriever.retrieve("KB증권 005930 리포트")
+
+    assert [doc.id for doc in docs] == ["a::chunk_0", "a::chunk_1"]
+    assert isinstance(docs[0], Document)
+    assert store.ann_calls == 0
+
+
+def test_retriever_falls_back_to_filtered_ann_when_index_has_no_candidates() -> None:
+    collection = _collection()
+    store = _ExactScanStore(collection)
+    retriever = ReportRetriever(
+        vectorstore=store,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+        score_threshold=0.3,
+        metadata_index=MetadataIndex.from_collection(collection, refresh_interval_seconds=0),
+    )
+
+    # 다른 프로세스가 인덱스 갱신 전에 적재한 리포트는 인덱스에 없으므로 저장소 필터로 찾아야 한다.
+    retriever.retrieve("KB증권 005380 리포트")
+
+    assert store.ann_calls > 0
+
+
+def test_stale_metadata_index_is_not_authoritative() -> None:
+    collection = _collection()
+    index = MetadataIndex.from_collection(collection, refresh_interval_seconds=3600)
+    assert not index.is_stale()
+
+    index._refreshed_at -= 3600
+    assert index.is_stale()
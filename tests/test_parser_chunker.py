@@ -67,3 +67,4 @@ def test_chunker_keeps_table_with_neighbor_context() -> None:
 
     text_chunks = [chunk for chunk in chunks if chunk.metadata.get("chunk_type") == "text"]
     assert any("추가 본문 문단입니다." in chunk.page_content for chunk in text_chunks)
+    assert all(chunk.metadata["date_int"] == 20260210 for chunk in chunks)
@@ -121,6 +121,9 @@ class _FakeEmbedder:
     def restore_snapshot(self, *, document_id: str, snapshot: dict) -> None:
         self.restore_called = True
 
+    def flush(self) -> None:
+        return None
+
 
 def test_runner_rolls_back_registry_and_vector_snapshot_on_index_failure(tmp_path: Path) -> None:
     pdf_path = tmp_path / "mirae_samsung_elec_20260210.pdf"
@@ -153,3 +156,44 @@ def test_runner_rolls_back_registry_and_vector_snapshot_on_index_failure(tmp_pat
     entry = data["documents"][document_id]
     assert entry["status"] == "indexed"
     assert entry["pipeline_history"][-1]["rolled_back"] is True
+
+
+class _FakeBulkEmbedder(_FakeEmbedder):
+    def __init__(self) -> None:
+        super().__init__()
+        self.bulk_calls: list[list[Document]] = []
+        self.snapshot_calls: list[str] = []
+
+    def snapshot_document(self, document_id: str) -> dict:
+        self.snapshot_calls.append(document_id)
+        return super().snapshot_document(document_id)
+
+    def bulk_upsert(self, documents: list[Document]) -> int:
+        self.bulk_calls.append(documents)
+        return len(documents)
+
+
+def test_runner_bulk_mode_batches_new_documents_without_snapshots(tmp_path: Path) -> None:
+    pdf_paths = [tmp_path / f"mirae_samsung_elec_2026021{idx}.pdf" for idx in range(3)]
+    for idx, pdf_path in enumerate(pdf_paths):
+        _write_pdf(pdf_path, tail=f"report-{idx}".encode())
+
+    registry = MetadataRegistry(path=tmp_path / "metadata.json")
+    fake_embedder = _FakeBulkEmbedder()
+    runner = PipelineRunner(
+        parser=_FakeParser(),  # type: ignore[arg-type]
+        metadata_extractor=_FakeMetadataExtractor(),  # type: ignore[arg-type]
+        chunker=_FakeChunker(),  # type: ignore[arg-type]
+        embedder=fake_embedder,  # type: ignore[arg-type]
+        registry=registry,
+        parsed_dir=tmp_path / "parsed",
+        bulk_chunk_batch_size=2,
+    )
+
+    result = runner.run(pdf_paths=pdf_paths, bulk=True)
+    assert result.success_count == 3
+    assert fake_embedder.snapshot_calls == []
+    assert [len(batch) for batch in fake_embedder.bulk_calls] == [2, 1]
+
+    data = json.loads((tmp_path / "metadata.json").read_text(encoding="utf-8"))
+    assert {entry["status"] for entry in data["documents"].values()} == {"indexed"}
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from src.bench.retrieval import HashingEmbeddings, load_golden_set, run_retrieval_benchmark, synthetic_reports
+
+
+def test_hashing_embeddings_are_deterministic_and_normalized() -> None:
+    embeddings = HashingEmbeddings(dim=64)
+    first = embeddings.embed_query("삼성전자 HBM 전망")
+
+    assert first == HashingEmbeddings(dim=64).embed_query("삼성전자 HBM 전망")
+    assert abs(sum(value * value for value in first) - 1.0) < 1e-5
+
+
+def test_retrieval_benchmark_reports_quality_and_stage_latency(tmp_path: Path) -> None:
+    reports = synthetic_reports(30, seed=3)
+    golden = tmp_path / "golden.jsonl"
+    golden.write_text(
+        json.dumps(
+            {"question": reports[0].metadata["company_name"], "expected_document_ids": [reports[0].document_id]},
+            ensure_ascii=False,
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    assert len(load_golden_set(golden)) == 1
+
+    report = run_retrieval_benchmark(num_reports=30, num_questions=12, k=5, seed=3, lexical=True)
+
+    assert report.num_documents == 30 and report.num_questions == 12
+    assert 0.0 < report.recall_at_k <= 1.0
+    assert 0.0 < report.mrr <= 1.0
+    assert abs(sum(report.stage_hit_rates.values()) - 1.0) < 1e-9
+    assert report.latency_ms["total"]["p99"] >= report.latency_ms["total"]["p50"] > 0.0
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import threading
+import time
+
 from langchain_core.documents import Document
 
 from src.rag.retriever import ReportRetriever
@@ -44,9 +47,337 @@ def test_retriever_applies_heuristic_metadata_filter() -> None:
 
     retriever.retrieve("미래에셋증권 005930 2026.02.10 매수 리포트")
     last_call = vectorstore.calls[-1]
-    metadata_filter = last_call.get("filter", {})
+    clauses = last_call.get("filter", {}).get("$and", [])
+
+    assert {"broker": "미래에셋증권"} in clauses
+    assert {"ticker": "005930"} in clauses
+    assert {"date_int": 20260210} in clauses
+    assert {"rating": "매수"} in clauses
+
+
+class _CountingEmbeddings:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def embed_query(self, text: str) -> list[float]:
+        self.calls.append(text)
+        return [1.0, 0.0]
+
+
+class _FakeVectorSearchStore:
+    def __init__(self) -> None:
+        self.embeddings = _CountingEmbeddings()
+        self.calls: list[dict] = []
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self, embedding: list[float], k: int, **kwargs
+    ) -> list[tuple[Document, float]]:
+        self.calls.append({"embedding": embedding, "k": k, **kwargs})
+        if kwargs.get("filter"):
+            return []
+        return [
+            (Document(page_content="close", metadata={}), 0.1),
+            (Document(page_content="far", metadata={}), 0.9),
+        ]
+
+    def _select_relevance_score_fn(self):
+        return lambda distance: 1.0 - distance
+
+
+class _FakeSelfQuery:
+    def __init__(self) -> None:
+        self.query_constructor = self
+        self.constructed: list[str] = []
+
+    def invoke(self, payload: dict) -> dict:
+        self.constructed.append(payload["query"])
+        return {"structured": payload["query"]}
+
+    def _prepare_query(self, query: str, structured_query: dict) -> tuple[str, dict]:
+        return query, {"k": 5, "filter": {"ticker": "000000"}}
+
+
+def test_retriever_embeds_query_once_across_fallbacks() -> None:
+    vectorstore = _FakeVectorSearchStore()
+    retriever = ReportRetriever(
+        vectorstore=vectorstore,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+        score_threshold=0.3,
+    )
+    retriever.retriever = _FakeSelfQuery()
+
+    docs = retriever.retrieve("미래에셋증권 최근 005930 리포트")
+
+    assert [doc.page_content for doc in docs] == ["close"]
+    assert len(vectorstore.calls) == 3
+    assert vectorstore.embeddings.calls == ["미래에셋증권 최근 005930 리포트"]
+
+
+def test_self_query_search_uses_requested_k_over_default_search_kwargs() -> None:
+    vectorstore = _SelfQueryFilterStore()
+    retriever = ReportRetriever(
+        vectorstore=vectorstore,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+    )
+    retriever.retriever = _FakeSelfQuery()
+
+    retriever.retrieve("최근 반도체 업종 애널리스트 의견", k=8)
+
+    assert [call["k"] for call in vectorstore.calls if call.get("filter") == {"ticker": "000000"}] == [8]
+
+
+def test_planner_skips_self_query_when_rules_cover_the_question() -> None:
+    vectorstore = _FakeVectorSearchStore()
+    retriever = ReportRetriever(
+        vectorstore=vectorstore,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+    )
+    self_query = _FakeSelfQuery()
+    retriever.retriever = self_query
+
+    _, trace = retriever.retrieve_with_trace("미래에셋증권 005930 리포트")
+
+    assert self_query.constructed == []
+    assert trace.plan is not None and trace.plan.strategy == "rule_filter"
+    assert trace.stage == "unfiltered"
+
+
+def test_structured_query_is_cached_by_normalized_question() -> None:
+    vectorstore = _FakeVectorSearchStore()
+    retriever = ReportRetriever(
+        vectorstore=vectorstore,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+    )
+    self_query = _FakeSelfQuery()
+    retriever.retriever = self_query
+
+    retriever.retrieve("최근 반도체 업종 애널리스트 의견")
+    _, trace = retriever.retrieve_with_trace("최근  반도체 업종 애널리스트 의견?")
+
+    assert self_query.constructed == ["최근 반도체 업종 애널리스트 의견"]
+    assert trace.structured_query_cache_hit is True
+
+
+class _SlowSelfQuery(_FakeSelfQuery):
+    def __init__(self, delay_seconds: float) -> None:
+        super().__init__()
+        self.delay_seconds = delay_seconds
+
+    def invoke(self, payload: dict) -> dict:
+        time.sleep(self.delay_seconds)
+        return super().invoke(payload)
+
+
+class _SelfQueryFilterStore(_FakeVectorSearchStore):
+    """SelfQuery가 만든 필터에만 결과가 있는 저장소."""
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self, embedding: list[float], k: int, **kwargs
+    ) -> list[tuple[Document, float]]:
+        if kwargs.get("filter") == {"ticker": "000000"}:
+            self.calls.append({"embedding": embedding, "k": k, **kwargs})
+            return [(Document(page_content="self-query-hit", metadata={}), 0.1)]
+        return super().similarity_search_by_vector_with_relevance_scores(embedding, k, **kwargs)
+
+
+def test_hedged_mode_lets_self_query_win_before_unfiltered_search() -> None:
+    vectorstore = _SelfQueryFilterStore()
+    retriever = ReportRetriever(
+        vectorstore=vectorstore,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+        retrieval_mode="hedged",
+        deadline_seconds=2.0,
+    )
+    retriever.retriever = _SlowSelfQuery(delay_seconds=0.1)
+
+    docs, trace = retriever.retrieve_with_trace("최근 반도체 업종 애널리스트 의견")
+
+    assert [doc.page_content for doc in docs] == ["self-query-hit"]
+    assert trace.stage == "hedged_self_query"
+    assert all(call.get("filter") for call in vectorstore.calls)
+
+
+def test_hedged_mode_searches_unfiltered_only_after_both_paths_are_empty() -> None:
+    vectorstore = _FakeVectorSearchStore()
+    retriever = ReportRetriever(
+        vectorstore=vectorstore,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+        retrieval_mode="hedged",
+        deadline_seconds=2.0,
+    )
+    retriever.retriever = _SlowSelfQuery(delay_seconds=0.1)
+
+    docs, trace = retriever.retrieve_with_trace("최근 반도체 업종 애널리스트 의견")
+
+    assert [doc.page_content for doc in docs] == ["close"]
+    assert trace.stage == "hedged_unfiltered"
+    assert [bool(call.get("filter")) for call in vectorstore.calls][-1] is False
+    assert sum(not call.get("filter") for call in vectorstore.calls) == 1
+
+
+def test_abandoned_self_query_does_not_delay_next_request() -> None:
+    vectorstore = _FakeVectorSearchStore()
+    retriever = ReportRetriever(
+        vectorstore=vectorstore,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+        retrieval_mode="hedged",
+        deadline_seconds=0.1,
+        hedge_max_workers=1,
+    )
+    retriever.retriever = _SlowSelfQuery(delay_seconds=0.5)
+
+    _, first = retriever.retrieve_with_trace("최근 반도체 업종 애널리스트 의견")
+    started = time.perf_counter()
+    docs, second = retriever.retrieve_with_trace("최근 2차전지 업종 애널리스트 의견")
+
+    assert first.stage == "deadline_exceeded"
+    assert second.stage == "hedged_unfiltered"
+    assert [doc.page_content for doc in docs] == ["close"]
+    assert time.perf_counter() - started < 0.3
+
+
+def test_self_query_slot_is_returned_when_queued_call_is_cancelled() -> None:
+    vectorstore = _FakeVectorSearchStore()
+    retriever = ReportRetriever(
+        vectorstore=vectorstore,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+        retrieval_mode="hedged",
+        deadline_seconds=0.1,
+        hedge_max_workers=1,
+    )
+    retriever.retriever = _SlowSelfQuery(delay_seconds=0.0)
+    release = threading.Event()
+    # SelfQuery 풀의 유일한 작업자를 막아 두어 제출된 작업이 큐에서 기다리다 취소되게 한다.
+    blocker = retriever._get_hedge_executor("self_query").submit(release.wait)
+
+    try:
+        _, trace = retriever.retrieve_with_trace("최근 반도체 업종 애널리스트 의견")
+        assert trace.stage == "deadline_exceeded"
+        assert retriever._self_query_slots.acquire(blocking=False)
+        retriever._self_query_slots.release()
+    finally:
+        release.set()
+        blocker.result(timeout=5)
+
+
+def test_hedged_mode_is_bounded_by_deadline() -> None:
+    vectorstore = _FakeVectorSearchStore()
+    vectorstore.embeddings.embed_query = lambda text: time.sleep(0.5) or [1.0, 0.0]  # type: ignore[method-assign]
+    retriever = ReportRetriever(
+        vectorstore=vectorstore,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+        retrieval_mode="hedged",
+        deadline_seconds=0.1,
+    )
+    retriever.retriever = _SlowSelfQuery(delay_seconds=0.5)
+
+    started = time.perf_counter()
+    docs, trace = retriever.retrieve_with_trace("최근 반도체 업종 애널리스트 의견")
+
+    assert docs == []
+    assert trace.stage == "deadline_exceeded"
+    assert time.perf_counter() - started < 0.3
+
+
+class _FakeHybridStore(_FakeVectorSearchStore):
+    def similarity_search_by_vector_with_relevance_scores(
+        self, embedding: list[float], k: int, **kwargs
+    ) -> list[tuple[Document, float]]:
+        self.calls.append({"embedding": embedding, "k": k, **kwargs})
+        return [(Document(id="doc-x::chunk_0", page_content="의미상 가까운 청크", metadata={}), 0.1)]
+
+    def __init__(self, stored_vector: list[float] | None = None) -> None:
+        super().__init__()
+        self.get_calls: list[dict] = []
+        self.stored_vector = stored_vector or [1.0, 0.0]
+
+    def get(self, *, ids: list[str], include: list[str], where: dict | None = None) -> dict:
+        self.get_calls.append({"ids": ids, "where": where})
+        return {
+            "ids": ids,
+            "documents": [f"{chunk_id}-content" for chunk_id in ids],
+            "metadatas": [{}] * len(ids),
+            "embeddings": [self.stored_vector] * len(ids),
+        }
+
+
+def test_retriever_fuses_lexical_hits_with_vector_results(tmp_path) -> None:
+    from src.pipeline.lexical_index import LexicalIndex
+
+    lexical_index = LexicalIndex(tmp_path)
+    lexical_index.upsert_document("doc-y", [("doc-y::chunk_0", "HBM3E 12단 양산 일정")])
+    store = _FakeHybridStore()
+    retriever = ReportRetriever(
+        vectorstore=store,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+        score_threshold=0.3,
+        lexical_index=lexical_index,
+    )
+
+    docs = retriever.retrieve("HBM3E 양산 일정")
+
+    assert {doc.id for doc in docs} == {"doc-x::chunk_0", "doc-y::chunk_0"}
+    assert store.get_calls == [{"ids": ["doc-y::chunk_0"], "where": None}]
+
+
+def test_lexical_only_hit_without_vector_support_is_dropped(tmp_path) -> None:
+    from src.pipeline.lexical_index import LexicalIndex
+
+    lexical_index = LexicalIndex(tmp_path)
+    lexical_index.upsert_document("doc-y", [("doc-y::chunk_0", "HBM3E 12단 양산 일정")])
+    store = _FakeHybridStore(stored_vector=[0.0, 1.0])
+    retriever = ReportRetriever(
+        vectorstore=store,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+        score_threshold=0.3,
+        lexical_index=lexical_index,
+    )
+
+    assert [doc.id for doc in retriever.retrieve("HBM3E 양산 일정")] == ["doc-x::chunk_0"]
+
+    retriever.hybrid_min_lexical_score = 0.1
+    assert {doc.id for doc in retriever.retrieve("HBM3E 양산 일정")} == {"doc-x::chunk_0", "doc-y::chunk_0"}
+
+
+def test_lexical_search_ranks_only_allowed_chunks(tmp_path) -> None:
+    from src.pipeline.lexical_index import LexicalIndex
+
+    lexical_index = LexicalIndex(tmp_path)
+    lexical_index.upsert_document("doc-a", [(f"doc-a::chunk_{index}", "HBM 양산 HBM 양산") for index in range(5)])
+    lexical_index.upsert_document("doc-b", [("doc-b::chunk_0", "HBM 관련 언급")])
+
+    assert "doc-b::chunk_0" not in [chunk_id for chunk_id, _ in lexical_index.search("HBM 양산", k=2)]
+    hits = lexical_index.search("HBM 양산", k=2, allowed_ids={"doc-b::chunk_0"})
+    assert [chunk_id for chunk_id, _ in hits] == ["doc-b::chunk_0"]
+
+
+class _BatchEmbeddings(_CountingEmbeddings):
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: list[list[str]] = []
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(list(texts))
+        return [[1.0, 0.0] for _ in texts]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        raise AssertionError("질문을 문서(passage) 모델로 임베딩했다")
+
+
+def test_retrieve_many_embeds_in_one_batch_and_keeps_input_order() -> None:
+    vectorstore = _FakeVectorSearchStore()
+    vectorstore.embeddings = _BatchEmbeddings()
+    retriever = ReportRetriever(
+        vectorstore=vectorstore,  # type: ignore[arg-type]
+        openai_api_key="test-key",
+        score_threshold=0.3,
+    )
+
+    queries = ["첫 번째 질의", "두 번째 질의", "첫 번째 질의"]
+    results = retriever.retrieve_many(queries, max_workers=3)
 
-    assert metadata_filter.get("broker") == "미래에셋증권"
-    assert metadata_filter.get("ticker") == "005930"
-    assert metadata_filter.get("date") == "2026-02-10"
-    assert metadata_filter.get("rating") == "매수"
+    assert [trace.plan.strategy for _, trace in results] == ["rule_filter"] * 3
+    assert [[doc.page_content for doc in docs] for docs, _ in results] == [["close"]] * 3
+    assert vectorstore.embeddings.batches == [["첫 번째 질의", "두 번째 질의"]]
+    assert vectorstore.embeddings.calls == []
+    assert all("batch_embedding" in trace.timings_ms for _, trace in results)
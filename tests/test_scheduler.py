@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import threading
+
+from src.slack.scheduler import QuestionScheduler
+
+
+def test_scheduler_round_robins_users_and_rejects_when_full() -> None:
+    scheduler = QuestionScheduler(workers=1, max_queue_depth=4, max_pending_per_user=3)
+    gate = threading.Event()
+    started = threading.Event()
+    order: list[str] = []
+
+    def _blocker() -> None:
+        started.set()
+        gate.wait(timeout=5)
+
+    assert scheduler.submit("U_BLOCK", _blocker)
+    assert started.wait(timeout=5)
+    for name in ("A1", "A2", "A3"):
+        assert scheduler.submit("UA", lambda name=name: order.append(name))
+    assert not scheduler.submit("UA", lambda: order.append("A4"))
+    assert scheduler.submit("UB", lambda: order.append("B1"))
+    assert not scheduler.submit("UC", lambda: order.append("C1"))
+
+    gate.set()
+    scheduler.shutdown()
+
+    assert order == ["A1", "B1", "A2", "A3"]
+    stats = scheduler.stats()
+    assert (stats.submitted, stats.completed, stats.rejected, stats.queued) == (5, 5, 2, 0)
+    assert stats.queue_wait["p95_ms"] >= 0.0
+
+
+def test_scheduler_counts_failed_jobs_and_keeps_running() -> None:
+    scheduler = QuestionScheduler(workers=2)
+    done = threading.Event()
+
+    def _fail() -> None:
+        raise RuntimeError("llm down")
+
+    assert scheduler.submit("UA", _fail)
+    assert scheduler.submit("UA", done.set)
+    assert done.wait(timeout=5)
+    scheduler.shutdown()
+
+    assert scheduler.stats().failed == 1
+    assert scheduler.stats().completed == 1
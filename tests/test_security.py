@@ -1,7 +1,14 @@
+import threading
 import time
 from pathlib import Path
 
-from src.security import RateLimiter, validate_pdf, validate_query
+from src.security import (
+    MemoryRateLimitBackend,
+    RateLimiter,
+    SQLiteRateLimitBackend,
+    validate_pdf,
+    validate_query,
+)
 
 
 def test_validate_query() -> None:
@@ -20,6 +27,61 @@ def test_rate_limiter() -> None:
     assert limiter.is_allowed("U123")
 
 
+def test_rate_limiter_weights_previous_window() -> None:
+    now = [100.0]
+    limiter = RateLimiter(max_requests=4, window_seconds=10, clock=lambda: now[0])
+    assert all(limiter.is_allowed("U1") for _ in range(4))
+    assert not limiter.is_allowed("U1")
+
+    # 다음 윈도 25% 지점: 직전 윈도 4건 중 3건이 아직 창 안에 있다고 본다.
+    now[0] = 112.5
+    assert limiter.is_allowed("U1")
+    assert not limiter.is_allowed("U1")
+    assert limiter.is_allowed("U2")
+
+
+def test_memory_backend_evicts_idle_keys() -> None:
+    now = [0.0]
+    backend = MemoryRateLimitBackend()
+    limiter = RateLimiter(max_requests=1, window_seconds=10, backend=backend, clock=lambda: now[0])
+    for index in range(100):
+        limiter.is_allowed(f"U{index}")
+    assert len(backend) == 100
+
+    now[0] = 25.0
+    assert limiter.is_allowed("U0")
+    assert len(backend) == 1
+
+
+def test_memory_backend_is_thread_safe() -> None:
+    limiter = RateLimiter(max_requests=50, window_seconds=60, clock=lambda: 1000.0)
+    allowed: list[bool] = []
+    lock = threading.Lock()
+
+    def hammer() -> None:
+        results = [limiter.is_allowed("U1") for _ in range(20)]
+        with lock:
+            allowed.extend(results)
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(allowed) == 50
+
+
+def test_sqlite_backend_shares_quota_between_instances(tmp_path: Path) -> None:
+    path = tmp_path / "limits.sqlite3"
+    first = RateLimiter(max_requests=2, window_seconds=60, backend=SQLiteRateLimitBackend(path))
+    second = RateLimiter(max_requests=2, window_seconds=60, backend=SQLiteRateLimitBackend(path))
+    assert first.is_allowed("U1")
+    assert second.is_allowed("U1")
+    assert not first.is_allowed("U1")
+    assert not second.is_allowed("U1")
+    assert second.is_allowed("U2")
+
+
 def test_validate_pdf_magic_bytes(tmp_path: Path) -> None:
     good_pdf = tmp_path / "sample.pdf"
     good_pdf.write_bytes(b"%PDF-1.7 content")
@@ -28,4 +90,3 @@ def test_validate_pdf_magic_bytes(tmp_path: Path) -> None:
     bad_pdf = tmp_path / "bad.pdf"
     bad_pdf.write_bytes(b"not-pdf")
     assert not validate_pdf(bad_pdf)
-
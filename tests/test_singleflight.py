@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+
+from src.rag.chain import ReportQAChain
+from src.rag.singleflight import SingleFlight
+
+
+class _SlowRetriever:
+    def __init__(self) -> None:
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def retrieve(self, query: str) -> list[Document]:
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.2)
+        return [Document(page_content="HBM 수요 확대", metadata={"broker": "미래에셋증권"})]
+
+
+def test_identical_in_flight_questions_share_one_answer() -> None:
+    retriever = _SlowRetriever()
+    chain = ReportQAChain(retriever=retriever, openai_api_key="test-key", coalescer=SingleFlight())  # type: ignore[arg-type]
+    chain.chain = RunnableLambda(lambda inputs: "HBM 수요가 늘고 있습니다.")
+
+    questions = ["삼성전자 HBM 전망?", "삼성전자  HBM 전망", "삼성전자 HBM 전망!"]
+    with ThreadPoolExecutor(max_workers=len(questions)) as executor:
+        results = list(executor.map(chain.ask, questions))
+
+    assert retriever.calls == 1
+    assert {result.answer for result in results} == {"HBM 수요가 늘고 있습니다."}
+    assert chain.coalescer is not None
+    assert chain.coalescer.stats().followers == 2
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight_propagates_leader_error() -> None:
+    flight: SingleFlight[str, str] = SingleFlight()
+    calls = 0
+
+    async def _fail() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        raise RuntimeError("llm down")
+
+    outcomes = await asyncio.gather(flight.ado("q", _fail), flight.ado("q", _fail), return_exceptions=True)
+
+    assert calls == 1
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert flight.stats().in_flight == 0
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import Any
+
+from src.models import QAResult
+from src.slack.streaming import PLACEHOLDER_TEXT, STREAMING_CURSOR, SlackAnswerStreamer
+
+
+class _FakeClient:
+    def __init__(self) -> None:
+        self.updates: list[dict[str, Any]] = []
+
+    def chat_update(self, **kwargs: Any) -> None:
+        self.updates.append(kwargs)
+
+
+def test_streamer_posts_placeholder_throttles_updates_and_finishes_with_blocks() -> None:
+    posted: list[dict[str, Any]] = []
+    now = [0.0]
+
+    def say(**kwargs: Any) -> dict[str, str]:
+        posted.append(kwargs)
+        return {"channel": "C1", "ts": "111.222"}
+
+    client = _FakeClient()
+    streamer = SlackAnswerStreamer(client, say, update_interval_seconds=1.0, clock=lambda: now[0])
+
+    assert streamer.start()
+    assert posted == [{"text": PLACEHOLDER_TEXT}]
+
+    streamer.update("삼성전자")
+    now[0] = 1.5
+    streamer.update("삼성전자 목표주가는")
+    streamer.update("삼성전자 목표주가는 12만원")
+    assert [update["text"] for update in client.updates] == ["삼성전자 목표주가는" + STREAMING_CURSOR]
+
+    blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": "최종"}}]
+    streamer.finish(QAResult(answer="최종"), blocks)
+    assert client.updates[-1] == {"channel": "C1", "ts": "111.222", "text": "최종", "blocks": blocks}
+    assert len(posted) == 1
+
+
+def test_streamer_falls_back_to_new_message_when_placeholder_fails() -> None:
+    posted: list[dict[str, Any]] = []
+
+    def say(**kwargs: Any) -> dict[str, str]:
+        posted.append(kwargs)
+        if len(posted) == 1:
+            raise RuntimeError("slack down")
+        return {"channel": "C1", "ts": "1"}
+
+    streamer = SlackAnswerStreamer(_FakeClient(), say)
+
+    assert not streamer.start()
+    streamer.finish(QAResult(answer="답변"), [])
+    assert posted[-1] == {"text": "답변", "blocks": []}
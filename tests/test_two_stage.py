@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import chromadb
+import numpy as np
+
+from src.bench.hnsw import synthetic_corpus
+from src.pipeline.two_stage import (
+    FullVectorStore,
+    TwoStageVectorStore,
+    VectorProjector,
+    build_two_stage_index,
+    measure_two_stage_footprint,
+    measure_two_stage_recall,
+)
+
+
+def test_full_vector_store_reads_rows_by_id(tmp_path: Path) -> None:
+    vectors = np.eye(4, dtype=np.float32)
+    store = FullVectorStore.write(tmp_path, ["a", "b", "c", "d"], vectors)
+
+    found, rows = FullVectorStore(tmp_path).get(["c", "missing", "a"])
+
+    assert found == ["c", "a"]
+    assert np.allclose(rows, vectors[[2, 0]])
+    assert len(store) == 4
+
+
+def test_projector_round_trip(tmp_path: Path) -> None:
+    corpus, _ = synthetic_corpus(num_vectors=100, dim=32, num_queries=1)
+    projector = VectorProjector.fit(corpus, 8)
+    projector.save(tmp_path / "projector.npz")
+
+    loaded = VectorProjector.load(tmp_path / "projector.npz")
+    assert loaded.output_dim == 8
+    assert np.allclose(loaded.project(corpus[:3]), projector.project(corpus[:3]))
+
+
+def test_two_stage_search_keeps_recall_with_reduced_vectors(tmp_path: Path) -> None:
+    corpus, queries = synthetic_corpus(num_vectors=400, dim=64, num_queries=30, seed=3)
+    client = chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+    source = client.create_collection("reports_source", metadata={"hnsw:space": "cosine"}, embedding_function=None)
+    source.add(
+        ids=[f"doc{index % 20}::chunk_{index}" for index in range(len(corpus))],
+        documents=[f"chunk {index}" for index in range(len(corpus))],
+        metadatas=[{"document_id": f"doc{index % 20}"} for index in range(len(corpus))],
+        embeddings=corpus,
+    )
+
+    build_two_stage_index(
+        client=client,
+        source_collection=source,
+        collection_name="reports_source",
+        directory=tmp_path / "two_stage",
+        reduced_dim=16,
+    )
+    store = TwoStageVectorStore.open(
+        client=client,
+        collection_name="reports_source",
+        directory=tmp_path / "two_stage",
+        embedding_function=None,  # type: ignore[arg-type]
+        candidate_k=50,
+    )
+
+    results = store.similarity_search_by_vector_with_relevance_scores(queries[0].tolist(), k=5)
+    assert len(results) == 5
+    assert [distance for _, distance in results] == sorted(distance for _, distance in results)
+    assert measure_two_stage_recall(store, queries, k=5) >= 0.9
+
+    filtered = store.similarity_search_by_vector_with_relevance_scores(
+        queries[0].tolist(),
+        k=5,
+        filter={"document_id": "doc3"},
+    )
+    assert filtered
+    assert {document.metadata["document_id"] for document, _ in filtered} == {"doc3"}
+
+
+def test_full_vector_store_upsert_and_delete_are_visible_to_open_reader(tmp_path: Path) -> None:
+    vectors = np.eye(4, dtype=np.float32)
+    FullVectorStore.write(tmp_path, ["a", "b"], vectors[:2])
+    reader = FullVectorStore(tmp_path)
+    assert len(reader) == 2
+
+    writer = FullVectorStore(tmp_path)
+    writer.upsert(["b", "c"], vectors[[3, 2]])
+    writer.delete(["a"])
+
+    found, rows = reader.get(["a", "b", "c"])
+    assert found == ["b", "c"]
+    assert np.allclose(rows, vectors[[3, 2]])
+    assert len(reader) == 2
+
+
+def test_full_vector_store_compacts_tombstoned_rows(tmp_path: Path) -> None:
+    vectors = np.eye(8, dtype=np.float32)
+    FullVectorStore.write(tmp_path, list("abcdefgh"), vectors)
+    reader = FullVectorStore(tmp_path)
+    assert len(reader) == 8
+    writer = FullVectorStore(tmp_path, compact_tombstone_ratio=0.3)
+
+    writer.delete(["a", "b"])
+    assert writer.file_bytes == 8 * 8 * 4
+    writer.delete(["c"])
+
+    assert writer.file_bytes == 5 * 8 * 4
+    assert len(list(tmp_path.glob("full_vectors*.f32"))) == 1
+    found, rows = reader.get(["c", "d", "h"])
+    assert found == ["d", "h"]
+    assert np.allclose(rows, vectors[[3, 7]])
+    writer.upsert(["i"], np.ones((1, 8), dtype=np.float32))
+    assert reader.get(["i"])[0] == ["i"]
+    assert writer.compact() == 0
+
+
+class _CountingFallback:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def similarity_search_by_vector_with_relevance_scores(self, embedding, k=4, filter=None, **kwargs):  # noqa: A002
+        self.calls += 1
+        return []
+
+
+def _build_small_two_stage(tmp_path: Path) -> tuple[chromadb.api.ClientAPI, object, np.ndarray]:
+    corpus, _ = synthetic_corpus(num_vectors=60, dim=32, num_queries=1, seed=5)
+    client = chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+    source = client.create_collection("reports", metadata={"hnsw:space": "cosine"}, embedding_function=None)
+    source.add(
+        ids=[f"doc{index % 6}::chunk_{index}" for index in range(len(corpus))],
+        documents=[f"chunk {index}" for index in range(len(corpus))],
+        metadatas=[{"document_id": f"doc{index % 6}"} for index in range(len(corpus))],
+        embeddings=corpus,
+    )
+    build_two_stage_index(
+        client=client,
+        source_collection=source,
+        collection_name="reports",
+        directory=tmp_path / "two_stage",
+        reduced_dim=8,
+    )
+    return client, source, corpus
+
+
+def test_two_stage_store_follows_ingestion_updates(tmp_path: Path) -> None:
+    client, source, corpus = _build_small_two_stage(tmp_path)
+    fallback = _CountingFallback()
+    store = TwoStageVectorStore.open(
+        client=client,
+        collection_name="reports",
+        directory=tmp_path / "two_stage",
+        embedding_function=None,  # type: ignore[arg-type]
+        fallback=fallback,
+    )
+
+    new_vector = corpus[0] * -1.0
+    source.upsert(ids=["new::chunk_0"], documents=["new"], metadatas=[{"document_id": "new"}], embeddings=[new_vector])
+    store.upsert(ids=["new::chunk_0"], documents=["new"], metadatas=[{"document_id": "new"}], embeddings=[new_vector])
+
+    results = store.similarity_search_by_vector_with_relevance_scores(new_vector.tolist(), k=1)
+    assert [document.id for document, _ in results] == ["new::chunk_0"]
+    payload = store.get(ids=["new::chunk_0"], include=["embeddings", "metadatas"])
+    assert payload["metadatas"] == [{"document_id": "new"}]
+    assert np.allclose(payload["embeddings"][0], new_vector / np.linalg.norm(new_vector), atol=1e-6)
+
+    source.delete(where={"document_id": "doc1"})
+    store.delete(where={"document_id": "doc1"})
+    results = store.similarity_search_by_vector_with_relevance_scores(corpus[1].tolist(), k=5)
+    assert all(document.metadata["document_id"] != "doc1" for document, _ in results)
+    assert store.in_sync()
+    assert fallback.calls == 0
+
+
+def test_two_stage_store_falls_back_when_source_collection_diverges(tmp_path: Path) -> None:
+    client, source, corpus = _build_small_two_stage(tmp_path)
+    fallback = _CountingFallback()
+    store = TwoStageVectorStore.open(
+        client=client,
+        collection_name="reports",
+        directory=tmp_path / "two_stage",
+        embedding_function=None,  # type: ignore[arg-type]
+        fallback=fallback,
+    )
+
+    source.upsert(
+        ids=["late::chunk_0"], documents=["late"], metadatas=[{"document_id": "late"}], embeddings=[corpus[0]]
+    )
+
+    assert not store.in_sync()
+    store.similarity_search_by_vector_with_relevance_scores(corpus[0].tolist(), k=3)
+    assert fallback.calls == 1
+
+
+def test_two_stage_footprint_reports_index_and_memmap_sizes(tmp_path: Path) -> None:
+    client, _, corpus = _build_small_two_stage(tmp_path)
+    store = TwoStageVectorStore.open(
+        client=client,
+        collection_name="reports",
+        directory=tmp_path / "two_stage",
+        embedding_function=None,  # type: ignore[arg-type]
+        candidate_k=10,
+    )
+
+    footprint = measure_two_stage_footprint(store, persist_directory=tmp_path / "chroma")
+
+    assert (footprint.vectors, footprint.full_dim, footprint.reduced_dim) == (len(corpus), 32, 8)
+    assert footprint.full_vectors_bytes == len(corpus) * 32 * 4
+    assert footprint.rescoring_bytes_per_query == 10 * 32 * 4
+    assert footprint.full_index_bytes is not None and footprint.reduced_index_bytes is not None
+    assert footprint.reduced_index_bytes < footprint.full_index_bytes
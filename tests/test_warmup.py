@@ -0,0 +1,116 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from src.models import QAResult
+from src.rag.embedding_cache import CachedQueryEmbeddings, QueryEmbeddingCache
+from src.slack.warmup import awarm_up, clear_ready, mark_ready, warm_up
+
+
+class FakeCollection:
+    def __init__(self) -> None:
+        self.counts = 0
+
+    def count(self) -> int:
+        self.counts += 1
+        return 3
+
+
+class FakeEmbeddings(Embeddings):
+    def __init__(self) -> None:
+        self.queries: list[str] = []
+
+    def embed_query(self, text: str) -> list[float]:
+        self.queries.append(text)
+        return [1.0, 0.0]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+class FakeRetriever:
+    def __init__(self, failing: set[str] | None = None) -> None:
+        self.vectorstore = type("Store", (), {"_collection": FakeCollection()})()
+        self.embeddings = FakeEmbeddings()
+        cache = QueryEmbeddingCache(max_entries=8)
+        # 재시작 후 디스크에서 읽은 캐시처럼 워밍업 질의가 이미 들어 있다.
+        cache.get_or_embed("a", lambda text: [0.0, 1.0], model="m")
+        self.query_embeddings = CachedQueryEmbeddings(self.embeddings, cache, model="m")
+        self.queries: list[str] = []
+        self.failing = failing or set()
+
+    def retrieve(self, query: str) -> list[Any]:
+        self.queries.append(query)
+        if query in self.failing:
+            raise RuntimeError("embedding API unavailable")
+        return []
+
+    async def aretrieve(self, query: str) -> list[Any]:
+        return self.retrieve(query)
+
+
+class FakeChain:
+    def __init__(self, retriever: FakeRetriever) -> None:
+        self.retriever = retriever
+        self.asked: list[str] = []
+
+    def ask(self, question: str) -> QAResult:
+        self.asked.append(question)
+        return QAResult(answer="답변", sources=[], retrieved_documents=[])
+
+    async def aask(self, question: str) -> QAResult:
+        return self.ask(question)
+
+
+def test_warm_up_touches_index_retrieves_and_answers() -> None:
+    chain = FakeChain(FakeRetriever(failing={"b"}))
+    report = warm_up(chain, queries=["a", "b", "c"], answer_queries=1)  # type: ignore[arg-type]
+
+    assert chain.retriever.vectorstore._collection.counts == 1
+    assert chain.retriever.queries == ["a", "b", "c"]
+    assert chain.asked == ["a"]
+    assert list(report.timings_ms) == [
+        "vector_index",
+        "embedding_client",
+        "retrieve[0]",
+        "retrieve[1]",
+        "retrieve[2]",
+        "answer[0]",
+    ]
+    assert report.errors == {"retrieve[1]": "embedding API unavailable"}
+    assert not report.ok
+
+
+def test_warm_up_calls_embedding_client_past_a_warm_cache() -> None:
+    chain = FakeChain(FakeRetriever())
+    warm_up(chain, queries=["a"], answer_queries=0)  # type: ignore[arg-type]
+
+    assert chain.retriever.embeddings.queries == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_awarm_up_uses_async_paths() -> None:
+    chain = FakeChain(FakeRetriever())
+    report = await awarm_up(chain, queries=["a", "b"], answer_queries=2)  # type: ignore[arg-type]
+
+    assert chain.retriever.embeddings.queries == ["a"]
+    assert chain.retriever.queries == ["a", "b"]
+    assert chain.asked == ["a", "b"]
+    assert report.ok
+
+
+def test_ready_file_is_written_and_cleared(tmp_path: Path) -> None:
+    path = tmp_path / "state" / "bot.ready"
+    report = warm_up(FakeChain(FakeRetriever()), queries=["a"], answer_queries=0)  # type: ignore[arg-type]
+    mark_ready(path, report)
+
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    assert payload["warmup"]["errors"] == {}
+    assert set(payload["warmup"]["timings_ms"]) == {"vector_index", "embedding_client", "retrieve[0]"}
+
+    clear_ready(path)
+    clear_ready(path)
+    assert not path.exists()